@@ -1,16 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import codecs
+from concurrent.futures import Future, ThreadPoolExecutor
 import json
 import os
 import re
-import ssl
 import operator
-import urllib.error
+import queue
+import threading
 
 from html.parser import HTMLParser
 from typing import Any, Annotated, TypedDict
 from urllib.parse import parse_qs, unquote, urlencode, urlparse
-from urllib.request import Request, urlopen
+
+import httpx
 
 from langchain_experimental.utilities import PythonREPL
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
@@ -22,18 +26,30 @@ from langgraph.prebuilt.tool_node import ToolNode
 
 from datetime import datetime, timezone
 
+from content_extract import ContentExtractor
+from http_cache import CachedResponse, HTTPCache, get_http_cache
+from http_client import get_http_client
+
 from dotenv import load_dotenv
 load_dotenv()
 
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
 DEFAULT_SEARCH_RESULTS = 5
 DEFAULT_SCRAPE_CHARS = 3500
+# "content": main content and tables only; "text": every visible text node
+DEFAULT_SCRAPE_MODE = os.getenv("WEB_SCRAPE_MODE", "content")
 WEB_VERIFY_SSL = os.getenv("WEB_VERIFY_SSL", "true").lower() in {"1", "true", "yes", "y"}
 
 MCP_BASE_URL = os.getenv("MCP_BASE_URL", "http://localhost:8000").rstrip("/")
 MCP_TIMEOUT_SECONDS = float(os.getenv("MCP_TIMEOUT_SECONDS", "15"))
 MCP_VERIFY_SSL = os.getenv("MCP_VERIFY_SSL", "false").lower() in {"1", "true", "yes", "y"}
 
+# Questions answered at once by answer_questions
+NFL_MAX_PARALLEL = int(os.getenv("NFL_MAX_PARALLEL", "4"))
+# Threads parsing content-mode pages while they download
+SCRAPE_PARSE_WORKERS = int(os.getenv("SCRAPE_PARSE_WORKERS", "4"))
+_PARSE_POOL = ThreadPoolExecutor(max_workers=SCRAPE_PARSE_WORKERS, thread_name_prefix="nfl-parse")
+
 class NflAgentState(TypedDict, total=False):
     messages: Annotated[list, operator.add]
     final_answer: str
@@ -63,6 +79,227 @@ class _TextExtractor(HTMLParser):
         return " ".join(self._texts)
 
 
+class _StreamingTextExtractor(HTMLParser):
+    """
+    Visible page text built while the HTML is still arriving.
+
+    Gives the same text as _TextExtractor followed by whitespace collapsing
+    and truncation to max_chars, but normalises each text node as it is
+    completed and sets done once more than max_chars characters are kept,
+    so the caller can stop reading the page.
+    """
+
+    _IGNORE = {"script", "style", "noscript"}
+    CHUNK_CHARS = 64 * 1024
+
+    def __init__(self, max_chars: int) -> None:
+        super().__init__()
+        self.max_chars = max_chars
+        self.done = False
+        self._parts: list[str] = []
+        self._length = 0
+        # Data of one text node can arrive over several feed() calls
+        self._pending: list[str] = []
+        self._ignore_depth = 0
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        text = " ".join("".join(self._pending).split())
+        self._pending = []
+        if text and not self.done:
+            self._length += len(text) + (1 if self._parts else 0)
+            self._parts.append(text)
+            self.done = self._length > self.max_chars
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self._flush()
+        if tag in self._IGNORE:
+            self._ignore_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        self._flush()
+        if tag in self._IGNORE and self._ignore_depth:
+            self._ignore_depth -= 1
+
+    def handle_comment(self, data: str) -> None:
+        self._flush()
+
+    def handle_data(self, data: str) -> None:
+        if not self._ignore_depth:
+            self._pending.append(data)
+
+    def feed_text(self, text: str) -> bool:
+        """Feed the next piece of the page; True once enough text is kept"""
+        if not self.done:
+            self.feed(text)
+        return self.done
+
+    def get_text(self) -> str:
+        self._flush()
+        text = " ".join(self._parts)
+        if len(text) > self.max_chars:
+            text = text[:self.max_chars].rstrip() + "..."
+        return text
+
+
+class _StreamReader:
+    """Decodes body chunks for an extractor (_StreamingTextExtractor or
+    ContentExtractor) and keeps the raw bytes, so a page read to the end can
+    still be stored in the HTTP cache.
+
+    consume is passed to the shared HTTP client and runs on its event loop.
+    With background=True chunks are handed to a parse worker through a
+    queue instead of being parsed there, so a slow parse neither holds up
+    other requests on that loop nor counts against the request deadline.
+    Reading pauses (without blocking the loop) while more than
+    PARSE_BACKLOG_BYTES are waiting to be parsed, and the stream stops as
+    soon as the worker reports the extractor done. finish() waits for the
+    worker and must be called (or end(), on errors) once the stream is over.
+    """
+
+    PARSE_BACKLOG_BYTES = 256 * 1024
+
+    def __init__(
+        self,
+        extractor: _StreamingTextExtractor | ContentExtractor,
+        background: bool = False,
+        max_bytes: int | None = None,
+    ) -> None:
+        self.extractor = extractor
+        self.background = background
+        self.max_bytes = max_bytes
+        self.chunks: list[bytes] = []
+        self.bytes_read = 0
+        self.encoding: str | None = None
+        self.stopped = False
+        self._decoder = None
+        self._queue: queue.SimpleQueue[bytes | None] | None = None
+        self._worker: Future | None = None
+        # Written only by the parse worker; bytes_read only by the loop
+        self._bytes_parsed = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._progress: asyncio.Event | None = None
+        self.consume = self._afeed if background else self.feed
+
+    def feed(self, response: httpx.Response, chunk: bytes) -> bool:
+        if self._decoder is None:
+            self.encoding = response.charset_encoding
+            try:
+                self._decoder = codecs.getincrementaldecoder(self.encoding or "utf-8")(errors="ignore")
+            except LookupError:
+                self.encoding = None
+                self._decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        self.chunks.append(chunk)
+        self.bytes_read += len(chunk)
+        if self.background:
+            if self._queue is None:
+                self._queue = queue.SimpleQueue()
+                self._worker = _PARSE_POOL.submit(self._parse)
+            self._queue.put(chunk)
+            self.stopped = self.extractor.done or (
+                self.max_bytes is not None and self.bytes_read >= self.max_bytes
+            )
+        else:
+            self.stopped = self.extractor.feed_text(self._decoder.decode(chunk))
+        return self.stopped
+
+    async def _afeed(self, response: httpx.Response, chunk: bytes) -> bool:
+        if self._progress is None:
+            self._loop = asyncio.get_running_loop()
+            self._progress = asyncio.Event()
+        if self.feed(response, chunk):
+            return True
+        while (
+            self.bytes_read - self._bytes_parsed > self.PARSE_BACKLOG_BYTES
+            and not self.extractor.done
+            and not self._worker.done()
+        ):
+            self._progress.clear()
+            await self._progress.wait()
+        self.stopped = self.extractor.done
+        return self.stopped
+
+    def _parse(self) -> None:
+        # Parse worker: feeds queued chunks until the body ends or the
+        # extractor has enough; chunks after that are left unparsed
+        try:
+            while True:
+                chunk = self._queue.get()
+                final = chunk is None
+                text = self._decoder.decode(b"" if final else chunk, final=final)
+                self._bytes_parsed += 0 if final else len(chunk)
+                if self.extractor.feed_text(text) or final:
+                    return
+                self._notify()
+        finally:
+            self._notify()
+
+    def _notify(self) -> None:
+        if self._loop is not None and self._progress is not None:
+            self._loop.call_soon_threadsafe(self._progress.set)
+
+    def end(self) -> None:
+        """Let the parse worker finish; safe to call more than once"""
+        if self._queue is not None:
+            self._queue.put(None)
+
+    def complete(self, response: httpx.Response) -> bool:
+        """Whether the whole body was read, even if extraction stopped early"""
+        if not self.stopped:
+            return True
+        length = response.headers.get("content-length")
+        return (
+            "content-encoding" not in response.headers
+            and length is not None
+            and length.isdigit()
+            and int(length) == self.bytes_read
+        )
+
+    def finish(self) -> None:
+        if self.background:
+            self.end()
+            if self._worker is not None:
+                self._worker.result()
+        elif self._decoder is not None and not self.extractor.done:
+            self.extractor.feed_text(self._decoder.decode(b"", final=True))
+        if not self.extractor.done:
+            self.extractor.close()
+
+
+def _make_extractor(url: str, max_chars: int, mode: str) -> _StreamingTextExtractor | ContentExtractor:
+    if mode == "text":
+        return _StreamingTextExtractor(max_chars)
+    return ContentExtractor(url, max_chars)
+
+
+def _make_reader(url: str, max_chars: int, mode: str) -> _StreamReader:
+    extractor = _make_extractor(url, max_chars, mode)
+    if isinstance(extractor, ContentExtractor):
+        # Building the tree is too slow for the event loop. The extractor
+        # stops at max_input_chars characters; the byte cap (UTF-8 needs at
+        # most 4 bytes a character) only bounds what is buffered while the
+        # worker catches up
+        return _StreamReader(extractor, background=True, max_bytes=4 * extractor.max_input_chars)
+    return _StreamReader(extractor)
+
+
+def _feed_html(html: str, extractor: _StreamingTextExtractor | ContentExtractor) -> None:
+    """Parse an HTML string already in memory only as far as the extractor needs"""
+    step = _StreamingTextExtractor.CHUNK_CHARS
+    for start in range(0, len(html), step):
+        if extractor.feed_text(html[start:start + step]):
+            break
+    else:
+        extractor.close()
+
+
+def _extract_text(html: str, extractor: _StreamingTextExtractor | ContentExtractor) -> str:
+    """Page text from an HTML string already in memory (e.g. a cache hit)"""
+    _feed_html(html, extractor)
+    return extractor.get_text()
+
+
 class _DuckDuckGoParser(HTMLParser):
     def __init__(self, max_results: int) -> None:
         super().__init__()
@@ -108,13 +345,207 @@ def _clean_ddg_url(raw_url: str) -> str:
 
 
 
+def _decode(response: httpx.Response) -> str:
+    return response.content.decode(response.charset_encoding or "utf-8", errors="ignore")
+
+
+def _cached_text(entry: CachedResponse) -> str:
+    return entry.body.decode(entry.encoding or "utf-8", errors="ignore")
+
+
+def _request_headers(entry: CachedResponse | None) -> dict[str, str]:
+    headers = {"User-Agent": USER_AGENT}
+    if entry is not None and entry.revalidatable:
+        headers.update(entry.conditional_headers())
+    return headers
+
+
+def _from_response(
+    cache: HTTPCache | None,
+    entry: CachedResponse | None,
+    url: str,
+    response: httpx.Response,
+) -> str:
+    if cache is None:
+        return _decode(response)
+    if response.status_code == 304 and entry is not None:
+        return _cached_text(cache.revalidated(entry, response.headers))
+    cache.record_miss()
+    cache.store(url, response.content, response.charset_encoding, response.headers)
+    return _decode(response)
+
+
 def _fetch_url(url: str, timeout: float) -> str:
-    request = Request(url, headers={"User-Agent": USER_AGENT})
-    context = None
-    if url.startswith("https") and not WEB_VERIFY_SSL:
-        context = ssl._create_unverified_context()
-    with urlopen(request, timeout=timeout, context=context) as response:
-        return response.read().decode("utf-8", errors="ignore")
+    cache = get_http_cache()
+    entry = cache.lookup(url) if cache is not None else None
+    if entry is not None and entry.fresh:
+        cache.record_hit(entry)
+        return _cached_text(entry)
+
+    response = get_http_client().get(
+        url, timeout=timeout, verify=WEB_VERIFY_SSL, headers=_request_headers(entry)
+    )
+    return _from_response(cache, entry, url, response)
+
+
+def _lookup(url: str) -> tuple[HTTPCache | None, CachedResponse | None]:
+    cache = get_http_cache()
+    return cache, cache.lookup(url) if cache is not None else None
+
+
+async def _afetch_url(url: str, timeout: float) -> str:
+    # Cache reads and writes are SQLite I/O; keep them off the caller's loop
+    cache, entry = await asyncio.to_thread(_lookup, url)
+    if entry is not None and entry.fresh:
+        cache.record_hit(entry)
+        return _cached_text(entry)
+
+    response = await get_http_client().aget(
+        url, timeout=timeout, verify=WEB_VERIFY_SSL, headers=_request_headers(entry)
+    )
+    return await asyncio.to_thread(_from_response, cache, entry, url, response)
+
+
+def _search_url(query: str) -> str:
+    encoded = urlencode({"q": query})
+    return f"https://duckduckgo.com/html/?{encoded}"
+
+
+def _search_payload(query: str, html: str, max_results: int) -> str:
+    parser = _DuckDuckGoParser(max_results=max_results)
+    parser.feed(html)
+    payload = {"query": query, "results": parser.results}
+    return json.dumps(payload, ensure_ascii=True)
+
+
+def _scrape_key(url: str, max_chars: int, mode: str) -> str:
+    """Cache key for a scrape result, as opposed to the page itself"""
+    return f"{url}#web_scrape:{mode}:{max_chars}"
+
+
+def _scrape_entries(
+    url: str, max_chars: int, mode: str
+) -> tuple[HTTPCache | None, CachedResponse | None, CachedResponse | None]:
+    """The cache, the stored page and the stored scrape result for url"""
+    cache = get_http_cache()
+    if cache is None:
+        return None, None, None
+    return cache, cache.lookup(url), cache.lookup(_scrape_key(url, max_chars, mode))
+
+
+def _scrape_from_stream(
+    cache: HTTPCache | None,
+    entry: CachedResponse | None,
+    url: str,
+    response: httpx.Response,
+    reader: _StreamReader,
+    max_chars: int,
+    mode: str,
+) -> str:
+    if response.status_code == 304 and entry is not None:
+        entry = cache.revalidated(entry, response.headers)
+        if entry.url != url:
+            return _cached_text(entry)
+        return _extract_text(_cached_text(entry), _make_extractor(url, max_chars, mode))
+    reader.finish()
+    text = reader.extractor.get_text()
+    if cache is not None:
+        cache.record_miss()
+        if reader.complete(response):
+            cache.store(url, b"".join(reader.chunks), reader.encoding, response.headers)
+        else:
+            # Reading stopped early, so the page can't be stored; keep the
+            # result instead, with the page's freshness and validators, so a
+            # repeat scrape of a large stats page is a hit (or a 304)
+            key = _scrape_key(url, max_chars, mode)
+            cache.store(key, text.encode("utf-8"), "utf-8", response.headers)
+    return text
+
+
+def _scrape_hit(
+    cache: HTTPCache | None,
+    page: CachedResponse | None,
+    result: CachedResponse | None,
+) -> tuple[CachedResponse | None, CachedResponse | None]:
+    """(fresh entry to answer from, entry to revalidate otherwise)"""
+    for entry in (page, result):
+        if entry is not None and entry.fresh:
+            cache.record_hit(entry)
+            return entry, None
+    if page is not None and page.revalidatable:
+        return None, page
+    return None, result
+
+
+def _scrape_text(url: str, timeout: float, max_chars: int, mode: str = DEFAULT_SCRAPE_MODE) -> str:
+    cache, page, result = _scrape_entries(url, max_chars, mode)
+    hit, entry = _scrape_hit(cache, page, result)
+    if hit is not None:
+        if hit is result:
+            return _cached_text(hit)
+        return _extract_text(_cached_text(hit), _make_extractor(url, max_chars, mode))
+
+    reader = _make_reader(url, max_chars, mode)
+    try:
+        response = get_http_client().stream(
+            url,
+            timeout=timeout,
+            consume=reader.consume,
+            verify=WEB_VERIFY_SSL,
+            headers=_request_headers(entry),
+        )
+    finally:
+        reader.end()
+    return _scrape_from_stream(cache, entry, url, response, reader, max_chars, mode)
+
+
+async def _ascrape_text(url: str, timeout: float, max_chars: int, mode: str = DEFAULT_SCRAPE_MODE) -> str:
+    # Cache reads and parsing are blocking; keep them off the caller's event loop
+    cache, page, result = await asyncio.to_thread(_scrape_entries, url, max_chars, mode)
+    hit, entry = _scrape_hit(cache, page, result)
+    if hit is not None:
+        if hit is result:
+            return _cached_text(hit)
+        extractor = _make_extractor(url, max_chars, mode)
+        return await asyncio.to_thread(_extract_text, _cached_text(hit), extractor)
+
+    reader = _make_reader(url, max_chars, mode)
+    try:
+        response = await get_http_client().astream(
+            url,
+            timeout=timeout,
+            consume=reader.consume,
+            verify=WEB_VERIFY_SSL,
+            headers=_request_headers(entry),
+        )
+    finally:
+        reader.end()
+    return await asyncio.to_thread(_scrape_from_stream, cache, entry, url, response, reader, max_chars, mode)
+
+
+def _scrape_error(error: Exception) -> str:
+    if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 403:
+        # Handle HTTP 403: Forbidden
+        error_message = {
+            "error": "HTTP Error 403: Forbidden",
+            "message": "The website blocked your request. Please ensure the page is publicly accessible and try again."
+        }
+        return json.dumps(error_message, ensure_ascii=True)
+
+    # Handle other errors like network issues, etc.
+    error_message = {
+        "error": str(error) or type(error).__name__,
+        "message": "An error occurred while scraping the webpage."
+    }
+    return json.dumps(error_message, ensure_ascii=True)
+
+
+def _mcp_url(endpoint: str, params: dict | None) -> str:
+    query = urlencode(params or {})
+    url = f"{MCP_BASE_URL}{endpoint}"
+    if query:
+        url += f"?{query}"
+    return url
 
 
 @tool("web_search")
@@ -150,18 +581,18 @@ def web_search(query: str, max_results: int = DEFAULT_SEARCH_RESULTS) -> str:
         - Results are best-effort and may change if the page structure changes.
         - Intended for general information lookup, not guaranteed real-time accuracy.
     """
-    encoded = urlencode({"q": query})
-    url = f"https://duckduckgo.com/html/?{encoded}"
-    html = _fetch_url(url, timeout=15)
-    parser = _DuckDuckGoParser(max_results=max_results)
-    parser.feed(html)
-    payload = {"query": query, "results": parser.results}
-    print(payload)
-    return json.dumps(payload, ensure_ascii=True)
+    html = _fetch_url(_search_url(query), timeout=15)
+    return _search_payload(query, html, max_results)
+
+
+async def aweb_search(query: str, max_results: int = DEFAULT_SEARCH_RESULTS) -> str:
+    """Async web_search over the shared connection pool."""
+    html = await _afetch_url(_search_url(query), timeout=15)
+    return _search_payload(query, html, max_results)
 
 
 @tool("web_scrape")
-def web_scrape(url: str, max_chars: int = DEFAULT_SCRAPE_CHARS) -> str:
+def web_scrape(url: str, max_chars: int = DEFAULT_SCRAPE_CHARS, mode: str = DEFAULT_SCRAPE_MODE) -> str:
     """
     Scrapes a webpage and returns the extracted text in JSON format.
 
@@ -169,45 +600,36 @@ def web_scrape(url: str, max_chars: int = DEFAULT_SCRAPE_CHARS) -> str:
     - url (str): The URL of the webpage to scrape.
     - max_chars (int, optional): The maximum number of characters to extract from the webpage's text.
       If the extracted text exceeds this length, it will be truncated. Default is `DEFAULT_SCRAPE_CHARS`.
+    - mode (str, optional): "content" (default) returns the page title, its stat tables as CSV and the
+      main article text, leaving out navigation, footers and other boilerplate. "text" returns all
+      visible text in page order.
 
     Returns:
     - str: A JSON-encoded string containing the following:
         - "url": The URL of the page that was scraped.
         - "content": The extracted text from the webpage, truncated to the specified `max_chars` length.
 
-    This function fetches the content of the given URL, extracts the text from the HTML, and cleans it by
-    removing extra whitespace. If the text length exceeds the specified `max_chars`, it will be truncated
-    with "..." appended to indicate more content. If the page is blocked (HTTP 403 error), a message is returned.
+    This function streams the content of the given URL, extracts the text from the HTML, and cleans it by
+    removing extra whitespace. In "content" mode the page is scored for its main content block and tables
+    are picked per site (Pro Football Reference, NFL.com, ESPN); in "text" mode the download stops once
+    more than `max_chars` characters have been collected.
+    If the text length exceeds the specified `max_chars`, it will be truncated with "..." appended to
+    indicate more content. If the page is blocked (HTTP 403 error), a message is returned.
     """
     try:
-        html = _fetch_url(url, timeout=20)
-        parser = _TextExtractor()
-        parser.feed(html)
-        text = re.sub(r"\s+", " ", parser.get_text()).strip()
-
-        # Truncate text if it exceeds the specified max_chars
-        if len(text) > max_chars:
-            text = text[:max_chars].rstrip() + "..."
-
-        payload = {"url": url, "content": text}
-        return json.dumps(payload, ensure_ascii=True)
-
-    except urllib.error.HTTPError as e:
-        if e.code == 403:
-            # Handle HTTP 403: Forbidden
-            error_message = {
-                "error": "HTTP Error 403: Forbidden",
-                "message": "The website blocked your request. Please ensure the page is publicly accessible and try again."
-            }
-            return json.dumps(error_message, ensure_ascii=True)
+        text = _scrape_text(url, timeout=20, max_chars=max_chars, mode=mode)
+    except Exception as e:
+        return _scrape_error(e)
+    return json.dumps({"url": url, "content": text}, ensure_ascii=True)
+
 
+async def aweb_scrape(url: str, max_chars: int = DEFAULT_SCRAPE_CHARS, mode: str = DEFAULT_SCRAPE_MODE) -> str:
+    """Async web_scrape over the shared connection pool."""
+    try:
+        text = await _ascrape_text(url, timeout=20, max_chars=max_chars, mode=mode)
     except Exception as e:
-        # Handle other errors like network issues, etc.
-        error_message = {
-            "error": str(e),
-            "message": "An error occurred while scraping the webpage."
-        }
-        return json.dumps(error_message, ensure_ascii=True)
+        return _scrape_error(e)
+    return json.dumps({"url": url, "content": text}, ensure_ascii=True)
 
 @tool("mcp_nfl_query")
 def mcp_nfl_query(endpoint: str, params: dict | None = None) -> str:
@@ -225,20 +647,31 @@ def mcp_nfl_query(endpoint: str, params: dict | None = None) -> str:
     Returns:
         str: JSON-encoded response from the MCP server.
     """
-    params = params or {}
-    query = urlencode(params)
-    url = f"{MCP_BASE_URL}{endpoint}"
-    if query:
-        url += f"?{query}"
+    response = get_http_client().get(
+        _mcp_url(endpoint, params),
+        timeout=MCP_TIMEOUT_SECONDS,
+        verify=MCP_VERIFY_SSL,
+        headers={"User-Agent": USER_AGENT},
+    )
+    return response.content.decode("utf-8")
 
-    request = Request(url, headers={"User-Agent": USER_AGENT})
-    context = None
-    if url.startswith("https") and not MCP_VERIFY_SSL:
-        context = ssl._create_unverified_context()
 
-    with urlopen(request, timeout=MCP_TIMEOUT_SECONDS, context=context) as response:
-        payload = response.read().decode("utf-8")
-        return payload
+async def amcp_nfl_query(endpoint: str, params: dict | None = None) -> str:
+    """Async mcp_nfl_query over the shared connection pool."""
+    response = await get_http_client().aget(
+        _mcp_url(endpoint, params),
+        timeout=MCP_TIMEOUT_SECONDS,
+        verify=MCP_VERIFY_SSL,
+        headers={"User-Agent": USER_AGENT},
+    )
+    return response.content.decode("utf-8")
+
+
+# With a coroutine attached, ToolNode awaits these when the graph runs via
+# ainvoke, so several tool calls in one turn fetch concurrently
+web_search.coroutine = aweb_search
+web_scrape.coroutine = aweb_scrape
+mcp_nfl_query.coroutine = amcp_nfl_query
 
 @tool("current_datetime")
 def current_datetime(tz: str = "UTC", iso: bool = True) -> str:
@@ -273,16 +706,17 @@ def current_datetime(tz: str = "UTC", iso: bool = True) -> str:
 
     return json.dumps(payload, ensure_ascii=True)
 
-def build_agent() -> any:
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY is required to run the NFL multi-agent graph.")
-    
-    model = ChatOpenAI(
-        api_key=api_key,
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.2,
-    )
+def build_agent(model: Any | None = None) -> any:
+    if model is None:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY is required to run the NFL multi-agent graph.")
+
+        model = ChatOpenAI(
+            api_key=api_key,
+            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+            temperature=0.2,
+        )
 
     tools = [
         web_search,
@@ -363,23 +797,85 @@ def build_agent() -> any:
 
     return graph.compile()
 
+_agent = None
+_agent_lock = threading.Lock()
+
+
+def get_agent() -> any:
+    """The compiled agent graph, built on first use and shared afterwards.
+
+    Reusing it keeps the ChatOpenAI client (and its connection pool) and the
+    compiled graph alive across questions; the graph holds no per-question
+    state, so concurrent invocations are safe.
+    """
+    global _agent
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                _agent = build_agent()
+    return _agent
+
+
 def answer_question(question: str) -> str:
-    graph = build_agent()
+    graph = get_agent()
     result = graph.invoke({"messages": [HumanMessage(content=question)]})
     return result.get("final_answer", "").strip()
 
 
+async def aanswer_question(question: str) -> str:
+    graph = get_agent()
+    result = await graph.ainvoke({"messages": [HumanMessage(content=question)]})
+    return result.get("final_answer", "").strip()
+
+
+def answer_questions(questions: list[str], max_parallel: int = NFL_MAX_PARALLEL) -> list[str]:
+    """
+    Answer several questions concurrently on the shared agent.
+
+    At most max_parallel questions run at once. Answers come back in the
+    order of the questions; a question that fails yields an error line
+    instead of failing the whole batch.
+    """
+    graph = get_agent()
+    results = graph.batch(
+        [{"messages": [HumanMessage(content=question)]} for question in questions],
+        config={"max_concurrency": max(1, max_parallel)},
+        return_exceptions=True,
+    )
+    answers = []
+    for result in results:
+        if isinstance(result, Exception):
+            answers.append(f"Could not answer: {result}")
+        else:
+            answers.append(result.get("final_answer", "").strip())
+    return answers
+
+
 if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description="NFL multi-agent tool runner.")
     parser.add_argument(
         "question",
-        nargs="?",
-        default="Who is the passing leader?",
-        help="Question for the multi-agent system.",
+        nargs="*",
+        default=["Who is the passing leader?"],
+        help="Question(s) for the multi-agent system; several are answered concurrently.",
+    )
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        default=NFL_MAX_PARALLEL,
+        help="Questions answered at once.",
     )
     args = parser.parse_args()
-    print(answer_question(args.question))
+    if len(args.question) == 1:
+        print(answer_question(args.question[0]))
+    else:
+        for question, answer in zip(args.question, answer_questions(args.question, args.max_parallel)):
+            print(f"Q: {question}\n{answer}\n")
+
+    cache = get_http_cache()
+    if cache is not None:
+        print(cache.summary())
 
 
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import statistics
+import time
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+import agent
+
+# Per-question overhead of the NFL agent before and after reusing the
+# compiled graph. No network calls are made: setup cost uses a real
+# ChatOpenAI client (construction only) and the end-to-end runs use a stub
+# model that answers at once, so the timings are pure framework overhead.
+#
+#   python bench_agent.py --questions 50
+
+
+class _StubModel(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+def _stub_model() -> _StubModel:
+    return _StubModel(messages=itertools.repeat(AIMessage(content="stub answer")))
+
+
+def _timings(fn, runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(label: str, timings: list[float]) -> None:
+    print(f"{label:<44} p50 {statistics.median(timings):7.2f} ms   mean {statistics.mean(timings):7.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark NFL agent per-question overhead")
+    parser.add_argument("--questions", type=int, default=30)
+    args = parser.parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench-not-used")
+    question = {"messages": [HumanMessage(content="Who is the passing leader?")]}
+
+    print(f"{args.questions} questions\n")
+    _report("setup: build_agent() per question (before)", _timings(agent.build_agent, args.questions))
+    agent.get_agent()
+    _report("setup: get_agent() per question (after)", _timings(agent.get_agent, args.questions))
+
+    _report(
+        "stub run: build + invoke (before)",
+        _timings(lambda: agent.build_agent(_stub_model()).invoke(question), args.questions),
+    )
+    graph = agent.build_agent(_stub_model())
+    _report("stub run: reused graph invoke (after)", _timings(lambda: graph.invoke(question), args.questions))
+
+
+if __name__ == "__main__":
+    main()
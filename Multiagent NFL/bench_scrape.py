@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import inspect
+from pathlib import Path
+import random
+import re
+import tempfile
+import time
+from types import SimpleNamespace
+import tracemalloc
+
+import agent
+
+# Compare web_scrape's old whole-page text extraction with the streaming,
+# early-terminating extractor and with content mode (main content plus CSV
+# tables) on large HTML files. The page is read from disk in network-sized
+# chunks, so "bytes read" is what would come off the socket. "data rows"
+# counts table rows that made it into the max_chars budget.
+#
+#   python bench_scrape.py                       # generated stats pages
+#   python bench_scrape.py --fixtures saved_pages/ --max-chars 3500
+
+CHUNK_BYTES = 64 * 1024
+
+
+def generate_fixture(path: Path, megabytes: float, seed: int) -> None:
+    """A stats-site-like page: head scripts, nav, then a very long table"""
+    rng = random.Random(seed)
+    names = ["Allen", "Mahomes", "Burrow", "Hurts", "Jackson", "Stroud", "Love", "Goff"]
+    parts = [
+        "<html><head><title>2025 NFL Passing</title>",
+        "<script>" + "var cfg = {a: 1};" * 5000 + "</script><style>td{padding:0}</style></head><body>",
+        "<nav>" + "".join(f"<a href='/t/{i}'>Team {i}</a>" for i in range(32)) + "</nav>",
+        "<h1>2025 NFL Passing Leaders</h1><p>Players ranked by passing yards.</p><table>",
+    ]
+    size = sum(len(part) for part in parts)
+    row = 0
+    while size < megabytes * 1024 * 1024:
+        row += 1
+        cells = [str(row), rng.choice(names), str(rng.randint(100, 5000)), str(rng.randint(0, 50))]
+        line = "<tr>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>\n"
+        parts.append(line)
+        size += len(line)
+    parts.append("</table><footer>Copyright</footer></body></html>")
+    path.write_text("".join(parts), encoding="utf-8")
+
+
+def old_extract(path: Path, max_chars: int) -> tuple[str, int]:
+    raw = path.read_bytes()
+    parser = agent._TextExtractor()
+    parser.feed(raw.decode("utf-8", errors="ignore"))
+    text = re.sub(r"\s+", " ", parser.get_text()).strip()
+    if len(text) > max_chars:
+        text = text[:max_chars].rstrip() + "..."
+    return text, len(raw)
+
+
+def streaming_extract(path: Path, max_chars: int, mode: str = "text") -> tuple[str, int]:
+    reader = agent._make_reader(path.as_uri(), max_chars, mode)
+    response = SimpleNamespace(charset_encoding="utf-8")
+
+    async def read() -> None:
+        # Drive consume the way SharedHTTPClient does, awaiting it when the
+        # reader paces the download
+        with path.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(CHUNK_BYTES), b""):
+                stop = reader.consume(response, chunk)
+                if inspect.isawaitable(stop):
+                    stop = await stop
+                if stop:
+                    break
+
+    try:
+        asyncio.run(read())
+    finally:
+        reader.finish()
+    return reader.extractor.get_text(), reader.bytes_read
+
+
+def content_extract(path: Path, max_chars: int) -> tuple[str, int]:
+    return streaming_extract(path, max_chars, mode="content")
+
+
+def data_rows(text: str) -> int:
+    return len(re.findall(r"\b\d+\W+(?:Allen|Mahomes|Burrow|Hurts|Jackson|Stroud|Love|Goff)\b", text))
+
+
+def measure(fn, path: Path, max_chars: int) -> tuple[str, int, float, float]:
+    start = time.process_time()
+    text, bytes_read = fn(path, max_chars)
+    cpu = time.process_time() - start
+    # Separate run: tracemalloc slows allocation-heavy parsing a lot
+    tracemalloc.start()
+    fn(path, max_chars)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return text, bytes_read, cpu, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark web_scrape text extraction")
+    parser.add_argument("--fixtures", help="directory of saved .html pages (default: generate)")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 4, 16], help="generated page MB")
+    parser.add_argument("--max-chars", type=int, default=agent.DEFAULT_SCRAPE_CHARS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.fixtures:
+            paths = sorted(Path(args.fixtures).glob("*.htm*"))
+        else:
+            paths = []
+            for i, megabytes in enumerate(args.sizes):
+                path = Path(tmp) / f"stats_{megabytes:g}mb.html"
+                generate_fixture(path, megabytes, seed=i)
+                paths.append(path)
+
+        print(f"max_chars={args.max_chars}\n")
+        print(f"{'page':<22} {'mode':<10} {'bytes read':>12} {'CPU ms':>9} {'peak MB':>9} {'data rows':>10}")
+        for path in paths:
+            results = {}
+            for mode, fn in (("whole", old_extract), ("streaming", streaming_extract), ("content", content_extract)):
+                text, bytes_read, cpu, peak = measure(fn, path, args.max_chars)
+                results[mode] = text
+                print(
+                    f"{path.name[:22]:<22} {mode:<10} {bytes_read:>12,} {cpu * 1000:>9.1f} "
+                    f"{peak / 1e6:>9.1f} {data_rows(text):>10}"
+                )
+            if results["whole"] != results["streaming"]:
+                print(f"{'':<22} warning: extracted text differs")
+
+
+if __name__ == "__main__":
+    main()
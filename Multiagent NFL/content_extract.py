@@ -0,0 +1,530 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from html.parser import HTMLParser
+import io
+import os
+import re
+from urllib.parse import urlparse
+
+# Pages are read up to this many characters in content mode; the main
+# article and leader tables of stats pages sit well inside it
+CONTENT_MAX_INPUT_CHARS = int(os.getenv("CONTENT_MAX_INPUT_CHARS", "500000"))
+# Parsing also stops once this many times max_chars of visible text is in
+# the tree: plenty to score the main block and fill the leader tables
+CONTENT_TEXT_MULTIPLE = float(os.getenv("CONTENT_TEXT_MULTIPLE", "8"))
+TABLE_MAX_ROWS = int(os.getenv("TABLE_MAX_ROWS", "15"))
+
+_SKIP = {"script", "style", "noscript", "svg", "template", "iframe", "form", "button", "select"}
+_VOID = {"br", "img", "hr", "input", "meta", "link", "source", "wbr", "area", "col", "base", "embed", "param", "track"}
+_BOILERPLATE_TAGS = {"nav", "footer", "header", "aside"}
+_BLOCKS = {
+    "p", "div", "section", "article", "main", "li", "ul", "ol", "pre", "blockquote",
+    "h1", "h2", "h3", "h4", "h5", "h6", "table", "tr", "dl", "dt", "dd", "figure", "figcaption",
+    "body", "html", "address", "details", "summary", "hgroup", "center",
+} | _BOILERPLATE_TAGS
+_HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+# Elements whose text is kept apart from their neighbours'
+_SEPARATED = _BLOCKS | {"td", "th", "br"}
+# Tags that implicitly close an open element of the same family
+_IMPLIED_CLOSE = {
+    "p": {"p"},
+    "li": {"li"},
+    "dt": {"dt", "dd"},
+    "dd": {"dt", "dd"},
+    "tr": {"tr", "td", "th"},
+    "td": {"td", "th"},
+    "th": {"td", "th"},
+}
+_POSITIVE = re.compile(r"article|body|content|entry|main|page|post|story|text|stats|leader", re.I)
+_NEGATIVE = re.compile(
+    r"ad-|ads|banner|breadcrumb|comment|cookie|footer|header|masthead|menu|modal|nav|"
+    r"newsletter|popup|promo|related|share|sidebar|social|sponsor|subscribe|widget",
+    re.I,
+)
+
+
+class _Node:
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: dict[str, str], parent: _Node | None) -> None:
+        self.tag = tag
+        self.attrs = attrs
+        self.children: list[_Node | str] = []
+        self.parent = parent
+
+    def classes(self) -> str:
+        return f"{self.attrs.get('class', '')} {self.attrs.get('id', '')}"
+
+    def iter(self, tag: str | None = None):
+        for child in self.children:
+            if isinstance(child, _Node):
+                if tag is None or child.tag == tag:
+                    yield child
+                yield from child.iter(tag)
+
+
+class _TreeBuilder(HTMLParser):
+    """Forgiving HTML -> _Node tree, dropping scripts, styles and forms.
+
+    With uncomment=True, markup hidden in comments (Pro-Football-Reference
+    ships most of its tables that way) is parsed into the tree too.
+    """
+
+    def __init__(self, uncomment: bool = False) -> None:
+        super().__init__()
+        self.uncomment = uncomment
+        self.root = _Node("root", {}, None)
+        self.title = ""
+        # Visible characters added to the tree so far
+        self.text_chars = 0
+        self._current = self.root
+        self._skip_depth = 0
+        self._in_title = False
+
+    def _close(self, tag: str) -> None:
+        node = self._current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self._current = node.parent
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "title":
+            self._in_title = True
+        if tag in _SKIP:
+            self._skip_depth += 1
+            return
+        if self._skip_depth or tag in _VOID:
+            if tag == "br" and not self._skip_depth:
+                self._current.children.append("\n")
+            return
+        implied = _IMPLIED_CLOSE.get(tag)
+        if implied:
+            node = self._current
+            while node is not self.root and node.tag not in ("table", "ul", "ol", "dl", "div"):
+                if node.tag in implied:
+                    self._current = node.parent
+                    break
+                node = node.parent
+        node = _Node(tag, {key: value or "" for key, value in attrs}, self._current)
+        self._current.children.append(node)
+        self._current = node
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title":
+            self._in_title = False
+        if tag in _SKIP:
+            if self._skip_depth:
+                self._skip_depth -= 1
+            return
+        if not self._skip_depth and tag not in _VOID:
+            self._close(tag)
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth:
+            self._current.children.append(data)
+            self.text_chars += len(data.strip())
+
+    def handle_comment(self, data: str) -> None:
+        if self.uncomment and "<table" in data:
+            inner = _TreeBuilder()
+            inner.feed(data)
+            inner.close()
+            self.text_chars += inner.text_chars
+            for child in inner.root.children:
+                if isinstance(child, _Node):
+                    child.parent = self._current
+                self._current.children.append(child)
+
+
+def _gap(previous: _Node | str | None, child: _Node | str) -> str:
+    """Space between adjacent elements with no text in between when one is a
+    link, so menus and link rows don't run together ("ScoresTeamsPlayers")"""
+    if isinstance(previous, _Node) and isinstance(child, _Node) and "a" in (previous.tag, child.tag):
+        return " "
+    return ""
+
+
+def _text(node: _Node | str) -> str:
+    if isinstance(node, str):
+        return node
+    parts = []
+    previous = None
+    for child in node.children:
+        text = _text(child)
+        if isinstance(child, _Node) and child.tag in _SEPARATED:
+            text = f" {text} "
+        parts.append(_gap(previous, child) + text)
+        previous = child
+    return "".join(parts)
+
+
+def _clean(text: str) -> str:
+    return " ".join(text.split())
+
+
+class _Stats:
+    """Text and link-text lengths per node, computed once bottom-up"""
+
+    def __init__(self, root: _Node) -> None:
+        self.text: dict[int, int] = {}
+        self.links: dict[int, int] = {}
+        self._walk(root, in_link=False)
+
+    def _walk(self, node: _Node, in_link: bool) -> tuple[int, int]:
+        in_link = in_link or node.tag == "a"
+        text = links = 0
+        for child in node.children:
+            if isinstance(child, str):
+                length = len(child.strip())
+                text += length
+                links += length if in_link else 0
+            else:
+                child_text, child_links = self._walk(child, in_link)
+                text += child_text
+                links += child_links
+        self.text[id(node)] = text
+        self.links[id(node)] = links
+        return text, links
+
+    def link_density(self, node: _Node) -> float:
+        text = self.text[id(node)]
+        return self.links[id(node)] / text if text else 0.0
+
+
+def _is_boilerplate(node: _Node, stats: _Stats) -> bool:
+    if node.tag in _BOILERPLATE_TAGS:
+        return True
+    hints = node.classes()
+    if node.tag not in ("table", "tr", "td", "th") and _NEGATIVE.search(hints) and not _POSITIVE.search(hints):
+        return True
+    # Link lists (menus, "more stories") rather than prose
+    return node.tag in ("div", "ul", "ol", "section") and stats.text[id(node)] > 0 and stats.link_density(node) > 0.5
+
+
+def _table_rows(table: _Node, max_rows: int) -> list[list[str]]:
+    rows: list[list[str]] = []
+    header_seen = False
+
+    def walk(node: _Node) -> None:
+        nonlocal header_seen
+        for child in node.children:
+            if len(rows) > max_rows:
+                return
+            if not isinstance(child, _Node) or child.tag == "table":
+                continue
+            if child.tag != "tr":
+                walk(child)
+                continue
+            classes = child.attrs.get("class", "")
+            if "over_header" in classes:
+                continue
+            cells = [_clean(_text(cell)) for cell in child.children if isinstance(cell, _Node) and cell.tag in ("td", "th")]
+            if not any(cells):
+                continue
+            is_header = all(cell.tag == "th" for cell in child.children if isinstance(cell, _Node) and cell.tag in ("td", "th"))
+            # Stats sites repeat the header row every few rows
+            if (is_header and header_seen) or "thead" in classes.split():
+                continue
+            header_seen = header_seen or is_header
+            if len(rows) <= max_rows:
+                rows.append(cells)
+
+    walk(table)
+    return rows
+
+
+def _table_caption(table: _Node) -> str:
+    for child in table.children:
+        if isinstance(child, _Node) and child.tag == "caption":
+            return _clean(_text(child))
+    # Nearest heading or title-like element before the table
+    node = table
+    while node.parent is not None:
+        siblings = node.parent.children
+        for sibling in reversed(siblings[:siblings.index(node)]):
+            if isinstance(sibling, _Node):
+                if sibling.tag in _HEADINGS or re.search(r"title|caption|header", sibling.attrs.get("class", ""), re.I):
+                    return _clean(_text(sibling))[:80]
+                break
+        node = node.parent
+        if node.tag in ("section", "article", "body"):
+            break
+    return table.attrs.get("aria-label") or table.attrs.get("id", "")
+
+
+def render_rows(rows: list[list[str]], caption: str = "", max_rows: int = TABLE_MAX_ROWS) -> str:
+    """Table rows as compact CSV, headed by its caption"""
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerows(rows[:max_rows + 1])
+    text = out.getvalue().rstrip("\n")
+    if len(rows) > max_rows + 1:
+        text += "\n..."
+    return f"Table: {caption}\n{text}" if caption else text
+
+
+def render_table(table: _Node, max_rows: int = TABLE_MAX_ROWS) -> str:
+    return render_rows(_table_rows(table, max_rows + 1), _table_caption(table), max_rows)
+
+
+@dataclass(frozen=True)
+class ExtractionProfile:
+    """Where a site keeps its leader/stats tables.
+
+    Tables whose id is in table_ids, or whose class (or an ancestor's, for
+    container_classes) has one of the given tokens, are rendered first.
+    """
+
+    name: str
+    domains: tuple[str, ...]
+    table_ids: tuple[str, ...] = ()
+    table_classes: tuple[str, ...] = ()
+    container_classes: tuple[str, ...] = ()
+    uncomment: bool = False
+    # ESPN renders names and numbers as two side-by-side tables
+    merge_split_tables: bool = False
+    max_tables: int = 6
+
+    def matches(self, url: str) -> bool:
+        host = urlparse(url).netloc.lower().split(":")[0]
+        return any(host == domain or host.endswith("." + domain) for domain in self.domains)
+
+    def wants(self, table: _Node) -> bool:
+        if table.attrs.get("id") in self.table_ids:
+            return True
+        if set(table.attrs.get("class", "").split()) & set(self.table_classes):
+            return True
+        node = table.parent
+        while node is not None and self.container_classes:
+            if set(node.attrs.get("class", "").split()) & set(self.container_classes):
+                return True
+            node = node.parent
+        return False
+
+
+PROFILES = (
+    ExtractionProfile(
+        name="pro-football-reference",
+        domains=("pro-football-reference.com",),
+        table_ids=(
+            "passing", "rushing", "receiving", "defense", "kicking", "returns", "scoring",
+            "team_stats", "AFC", "NFC", "games", "player_stats",
+        ),
+        container_classes=("data_grid_box",),
+        uncomment=True,
+    ),
+    ExtractionProfile(
+        name="nfl.com",
+        domains=("nfl.com",),
+        table_classes=("d3-o-table",),
+    ),
+    ExtractionProfile(
+        name="espn",
+        domains=("espn.com",),
+        table_classes=("Table",),
+        merge_split_tables=True,
+    ),
+)
+
+
+def profile_for(url: str) -> ExtractionProfile | None:
+    for profile in PROFILES:
+        if profile.matches(url):
+            return profile
+    return None
+
+
+def _profile_tables(root: _Node, profile: ExtractionProfile, used: set[int]) -> list[str]:
+    """Render the profile's tables, adding the ids of tables consumed to used"""
+    tables = [table for table in root.iter("table") if profile.wants(table)]
+    rendered: list[str] = []
+    for table in tables:
+        if id(table) in used:
+            continue
+        used.add(id(table))
+        rows = _table_rows(table, TABLE_MAX_ROWS + 1)
+        if profile.merge_split_tables and "fixed-left" in table.attrs.get("class", ""):
+            partner = next(
+                (other for other in tables if id(other) not in used and _shares_container(table, other)),
+                None,
+            )
+            if partner is not None:
+                used.add(id(partner))
+                rows = [left + right for left, right in zip(rows, _table_rows(partner, TABLE_MAX_ROWS + 1))]
+        if rows:
+            rendered.append(render_rows(rows, _table_caption(table)))
+        if len(rendered) >= profile.max_tables:
+            break
+    return rendered
+
+
+def _shares_container(left: _Node, right: _Node) -> bool:
+    ancestors = set()
+    node = left.parent
+    for _ in range(4):
+        if node is None:
+            break
+        ancestors.add(id(node))
+        node = node.parent
+    node = right.parent
+    for _ in range(4):
+        if node is None:
+            return False
+        if id(node) in ancestors:
+            return True
+        node = node.parent
+    return False
+
+
+def _main_candidate(root: _Node, stats: _Stats) -> _Node:
+    """Readability-style: paragraphs and tables score their parent (and half
+    for the grandparent); class/id hints and link density adjust the score"""
+    scores: dict[int, float] = {}
+    nodes: dict[int, _Node] = {}
+
+    def credit(node: _Node | None, points: float) -> None:
+        if node is None or node.tag == "root":
+            return
+        nodes[id(node)] = node
+        if id(node) not in scores:
+            hints = node.classes()
+            scores[id(node)] = (25 if _POSITIVE.search(hints) else 0) - (25 if _NEGATIVE.search(hints) else 0)
+            scores[id(node)] += {"article": 20, "main": 20}.get(node.tag, 0)
+        scores[id(node)] += points
+
+    for node in root.iter():
+        if node.tag in ("p", "pre", "blockquote") or node.tag in _HEADINGS:
+            text = _clean(_text(node))
+            if len(text) < 25:
+                continue
+            points = 1 + text.count(",") + min(len(text) / 100, 3)
+        elif node.tag == "table":
+            points = min(len(_table_rows(node, 20)), 20)
+        else:
+            continue
+        credit(node.parent, points)
+        credit(node.parent.parent if node.parent else None, points / 2)
+
+    if not scores:
+        return next(root.iter("body"), root)
+    return max(nodes.values(), key=lambda node: scores[id(node)] * (1 - stats.link_density(node)))
+
+
+def _render(node: _Node, stats: _Stats, lines: list[str], budget: int, skip: set[int]) -> int:
+    """Append the readable content of node as lines, leaving out tables in
+    skip; returns chars left"""
+    inline: list[str] = []
+
+    def flush() -> None:
+        nonlocal budget
+        text = _clean("".join(inline))
+        inline.clear()
+        if text and budget > 0:
+            lines.append(text)
+            budget -= len(text) + 1
+
+    previous = None
+    for child in node.children:
+        if budget <= 0:
+            break
+        gap, previous = _gap(previous, child), child
+        if isinstance(child, str):
+            inline.append(child)
+            continue
+        # Checked before inlining, so a <nav> or an inline "share" widget
+        # inside the candidate is dropped rather than run into the text
+        if _is_boilerplate(child, stats):
+            if child.tag in _BLOCKS:
+                flush()
+            else:
+                inline.append(" ")
+            continue
+        if child.tag not in _BLOCKS and child.tag not in ("td", "th"):
+            inline.append(gap + _text(child))
+            continue
+        flush()
+        if child.tag == "table":
+            if id(child) in skip:
+                continue
+            text = render_table(child)
+            if text:
+                lines.append(text)
+                budget -= len(text) + 1
+        elif child.tag == "li":
+            text = _clean(_text(child))
+            if text:
+                lines.append(f"- {text}")
+                budget -= len(text) + 3
+        elif child.tag in _HEADINGS:
+            text = _clean(_text(child))
+            if text:
+                lines.append(f"# {text}")
+                budget -= len(text) + 3
+        else:
+            budget = _render(child, stats, lines, budget, skip)
+    flush()
+    return budget
+
+
+class ContentExtractor:
+    """
+    Main content of a page, with tables kept as CSV rows.
+
+    Same feed_text / done / get_text interface as the streaming text
+    extractor in agent.py. The page is parsed until max_input_chars of HTML
+    or CONTENT_TEXT_MULTIPLE * max_chars of visible text have been seen,
+    then a per-domain profile pulls the site's leader tables; the rest of
+    the budget (or all of it, for other sites) goes to the highest scoring
+    content block, leaving out navigation, footers and link lists.
+    """
+
+    def __init__(self, url: str, max_chars: int, max_input_chars: int = CONTENT_MAX_INPUT_CHARS) -> None:
+        self.url = url
+        self.max_chars = max_chars
+        self.max_input_chars = max_input_chars
+        self.profile = profile_for(url)
+        self.done = False
+        self._builder = _TreeBuilder(uncomment=bool(self.profile and self.profile.uncomment))
+        self._fed = 0
+
+    def feed_text(self, text: str) -> bool:
+        if not self.done:
+            self._builder.feed(text)
+            self._fed += len(text)
+            self.done = (
+                self._fed >= self.max_input_chars
+                or self._builder.text_chars >= self.max_chars * CONTENT_TEXT_MULTIPLE
+            )
+        return self.done
+
+    def close(self) -> None:
+        self._builder.close()
+
+    def get_text(self) -> str:
+        root = self._builder.root
+        stats = _Stats(root)
+        lines: list[str] = []
+        title = _clean(self._builder.title)
+        if title:
+            lines.append(f"Title: {title}")
+
+        budget = self.max_chars
+        used: set[int] = set()
+        if self.profile is not None:
+            for table in _profile_tables(root, self.profile, used):
+                if budget <= 0:
+                    break
+                lines.append(table)
+                budget -= len(table) + 1
+        if budget > 0:
+            _render(_main_candidate(root, stats), stats, lines, budget, used)
+
+        text = "\n".join(lines)
+        if len(text) > self.max_chars:
+            text = text[:self.max_chars].rstrip() + "..."
+        return text
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Mapping
+from urllib.parse import urlparse
+import zlib
+
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", "http_cache.sqlite")
+HTTP_CACHE_MAX_MB = float(os.getenv("HTTP_CACHE_MAX_MB", "200"))
+# Freshness for responses that give no Cache-Control/Expires/Last-Modified
+HTTP_CACHE_DEFAULT_TTL = float(os.getenv("HTTP_CACHE_DEFAULT_TTL", "300"))
+# last_access (for LRU eviction) is rewritten at most this often per entry,
+# so fresh hits are usually read-only
+HTTP_CACHE_TOUCH_SECONDS = float(os.getenv("HTTP_CACHE_TOUCH_SECONDS", "60"))
+
+# Seconds a response stays fresh, overriding the server's max-age/Expires
+# (but not no-store or no-cache). Keys are a domain (subdomains included) or
+# a domain plus path prefix; the longest match wins. Extend or override with
+# HTTP_CACHE_TTLS="espn.com=120,...".
+DEFAULT_DOMAIN_TTLS = {
+    "duckduckgo.com": 1800,
+    # Stats and standings change during game days
+    "pro-football-reference.com": 900,
+    "nfl.com": 600,
+    "espn.com": 600,
+    "statmuse.com": 600,
+    # Reference pages rarely change
+    "pro-football-reference.com/players": 86400,
+    "pro-football-reference.com/teams": 3600,
+    "wikipedia.org": 86400,
+}
+
+
+def _parse_ttls(raw: str) -> dict[str, float]:
+    ttls: dict[str, float] = {}
+    for item in raw.split(","):
+        if "=" in item:
+            key, value = item.split("=", 1)
+            ttls[key.strip().lower()] = float(value)
+    return ttls
+
+
+def _http_date(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    body: bytes
+    encoding: str | None
+    etag: str | None
+    last_modified: str | None
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    @property
+    def revalidatable(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HTTPCache:
+    """
+    Disk-backed (SQLite) cache for the agent's GET requests.
+
+    Fresh entries are served without touching the network. Stale entries
+    that carry an ETag or Last-Modified are revalidated with If-None-Match /
+    If-Modified-Since, and a 304 reuses the stored body. Freshness comes from
+    a per-domain TTL override when one matches, otherwise from
+    Cache-Control max-age / Expires / a Last-Modified heuristic; no-cache
+    always means revalidate on every use. Bodies are
+    stored compressed and the least recently used entries are evicted once
+    the cache exceeds max_bytes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int,
+        domain_ttls: Mapping[str, float] | None = None,
+        default_ttl: float = HTTP_CACHE_DEFAULT_TTL,
+        touch_seconds: float = HTTP_CACHE_TOUCH_SECONDS,
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.domain_ttls = {key.lower(): ttl for key, ttl in (domain_ttls or {}).items()}
+        self.default_ttl = default_ttl
+        self.touch_seconds = touch_seconds
+        self.counts = {"hits": 0, "revalidated": 0, "misses": 0, "stored": 0, "evicted": 0}
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " url TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL,"
+            " encoding TEXT, etag TEXT, last_modified TEXT,"
+            " expires_at REAL NOT NULL, last_access REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);"
+        )
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def domain_ttl(self, url: str) -> float | None:
+        parsed = urlparse(url)
+        host = parsed.netloc.lower().split(":")[0]
+        best: tuple[int, float] | None = None
+        for key, ttl in self.domain_ttls.items():
+            domain, _, prefix = key.partition("/")
+            if host != domain and not host.endswith("." + domain):
+                continue
+            if prefix and not parsed.path.lstrip("/").startswith(prefix):
+                continue
+            if best is None or len(key) > best[0]:
+                best = (len(key), ttl)
+        return best[1] if best else None
+
+    def freshness(self, url: str, headers: Mapping[str, str]) -> float | None:
+        """Seconds the response may be served without revalidation; None
+        if it must not be stored at all"""
+        cache_control = headers.get("cache-control", "").lower()
+        if "no-store" in cache_control:
+            return None
+        # Stored (when it has a validator) but revalidated on every use,
+        # whatever the domain override says
+        if "no-cache" in cache_control:
+            return 0.0
+        override = self.domain_ttl(url)
+        if override is not None:
+            return override
+        match = re.search(r"(?:s-maxage|max-age)=(\d+)", cache_control)
+        if match:
+            return float(match.group(1))
+        expires = _http_date(headers.get("expires"))
+        if expires is not None:
+            return max(0.0, expires - time.time())
+        last_modified = _http_date(headers.get("last-modified"))
+        if last_modified is not None:
+            # Usual heuristic: a tenth of the document's age, at most a day
+            return min(86400.0, max(0.0, (time.time() - last_modified) / 10))
+        return self.default_ttl
+
+    def lookup(self, url: str) -> CachedResponse | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, encoding, etag, last_modified, expires_at, last_access FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[5] >= self.touch_seconds:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (now, url))
+                self._conn.commit()
+        body, encoding, etag, last_modified, expires_at, _ = row
+        return CachedResponse(url, zlib.decompress(body), encoding, etag, last_modified, expires_at)
+
+    def record_hit(self, entry: CachedResponse) -> None:
+        with self._lock:
+            self.counts["hits"] += 1
+            self.bytes_saved += len(entry.body)
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.counts["misses"] += 1
+
+    def revalidated(self, entry: CachedResponse, headers: Mapping[str, str]) -> CachedResponse:
+        """Extend a stored entry after a 304 Not Modified"""
+        ttl = self.freshness(entry.url, headers) or 0.0
+        entry.expires_at = time.time() + ttl
+        entry.etag = headers.get("etag", entry.etag)
+        entry.last_modified = headers.get("last-modified", entry.last_modified)
+        with self._lock:
+            self.counts["revalidated"] += 1
+            self.bytes_saved += len(entry.body)
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, etag = ?, last_modified = ?, last_access = ? WHERE url = ?",
+                (entry.expires_at, entry.etag, entry.last_modified, time.time(), entry.url),
+            )
+            self._conn.commit()
+        return entry
+
+    def store(self, url: str, body: bytes, encoding: str | None, headers: Mapping[str, str]) -> None:
+        ttl = self.freshness(url, headers)
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+        if ttl is None or (ttl <= 0 and not (etag or last_modified)):
+            return
+        compressed = zlib.compress(body)
+        if len(compressed) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (url, body, size, encoding, etag, last_modified, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, compressed, len(compressed), encoding, etag, last_modified, now + ttl, now),
+            )
+            self._total += len(compressed) - (old[0] if old else 0)
+            self.counts["stored"] += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Called with the lock held; trims to 90% so evictions come in batches
+        if self._total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT url, size FROM responses ORDER BY last_access").fetchall()
+        for url, size in rows:
+            if self._total <= target:
+                break
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self._total -= size
+            self.counts["evicted"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self.counts,
+                "requests_saved": self.counts["hits"],
+                "bytes_saved": self.bytes_saved,
+                "cache_bytes": self._total,
+            }
+
+    def summary(self) -> str:
+        stats = self.stats()
+        return (
+            f"HTTP cache: {stats['hits']} hits, {stats['revalidated']} revalidated (304), "
+            f"{stats['misses']} misses; saved {stats['requests_saved']} requests and "
+            f"{stats['bytes_saved'] / 1024:.0f} KiB; {stats['cache_bytes'] / 1024:.0f} KiB on disk"
+        )
+
+
+_cache: HTTPCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HTTPCache | None:
+    """The process-wide cache, or None when HTTP_CACHE_PATH is empty"""
+    global _cache
+    if not HTTP_CACHE_PATH:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = HTTPCache(
+                HTTP_CACHE_PATH,
+                max_bytes=int(HTTP_CACHE_MAX_MB * 1024 * 1024),
+                domain_ttls={**DEFAULT_DOMAIN_TTLS, **_parse_ttls(os.getenv("HTTP_CACHE_TTLS", ""))},
+            )
+        return _cache
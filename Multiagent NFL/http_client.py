@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import os
+import threading
+from typing import Any, Awaitable, Callable
+from urllib.parse import urlparse
+
+import httpx
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "30"))
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "4"))
+HTTP_ENABLE_HTTP2 = os.getenv("HTTP_HTTP2", "true").lower() in {"1", "true", "yes", "y"}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class SharedHTTPClient:
+    """
+    Pooled async HTTP client shared by the sync and async tools.
+
+    The httpx.AsyncClient instances live on one background event loop, so
+    connections stay warm whichever thread or loop a tool runs on: sync
+    callers block on the result, async callers await it. Requests to one
+    host are capped at per_host_limit in flight, and every request has an
+    overall deadline on top of httpx's connect/read timeouts.
+
+    gzip and deflate are always decoded; brotli is decoded when the brotli
+    package is installed and HTTP/2 is used when h2 is (httpx[http2,brotli]).
+    """
+
+    def __init__(
+        self,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_keepalive: int = HTTP_MAX_KEEPALIVE,
+        keepalive_expiry: float = HTTP_KEEPALIVE_SECONDS,
+        per_host_limit: int = HTTP_PER_HOST_LIMIT,
+        http2: bool = HTTP_ENABLE_HTTP2,
+    ) -> None:
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.per_host_limit = max(1, per_host_limit)
+        self.http2 = http2 and _http2_available()
+        self._clients: dict[bool, httpx.AsyncClient] = {}
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="nfl-http", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def _client(self, verify: bool) -> httpx.AsyncClient:
+        # Only called on the background loop, so no locking is needed
+        client = self._clients.get(verify)
+        if client is None:
+            client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                verify=verify,
+                follow_redirects=True,
+            )
+            self._clients[verify] = client
+        return client
+
+    async def _request(
+        self,
+        url: str,
+        timeout: float,
+        verify: bool,
+        headers: dict[str, str] | None,
+    ) -> httpx.Response:
+        host = urlparse(url).netloc
+        slots = self._host_slots.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        async with slots:
+            response = await asyncio.wait_for(
+                self._client(verify).get(
+                    url,
+                    headers=headers,
+                    timeout=httpx.Timeout(timeout, connect=min(timeout, 10.0)),
+                ),
+                timeout,
+            )
+        # 304 answers a conditional request from the HTTP cache
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    async def _stream(
+        self,
+        url: str,
+        timeout: float,
+        verify: bool,
+        headers: dict[str, str] | None,
+        consume: Callable[[httpx.Response, bytes], bool | Awaitable[bool]],
+    ) -> httpx.Response:
+        async def run() -> httpx.Response:
+            async with self._client(verify).stream(
+                "GET",
+                url,
+                headers=headers,
+                timeout=httpx.Timeout(timeout, connect=min(timeout, 10.0)),
+            ) as response:
+                if response.status_code == 304:
+                    return response
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    stop = consume(response, chunk)
+                    if inspect.isawaitable(stop):
+                        stop = await stop
+                    if stop:
+                        # Closing early drops the connection instead of
+                        # reading a body nobody needs
+                        break
+                return response
+
+        host = urlparse(url).netloc
+        slots = self._host_slots.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        async with slots:
+            return await asyncio.wait_for(run(), timeout)
+
+    def stream(
+        self,
+        url: str,
+        timeout: float,
+        consume: Callable[[httpx.Response, bytes], bool | Awaitable[bool]],
+        verify: bool = True,
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        """
+        Fetch url incrementally, passing each decoded (decompressed) body
+        chunk to consume(response, chunk); reading stops as soon as consume
+        returns True. consume runs on the client's event loop thread, so it
+        should be quick; it may be a coroutine function, awaited before the
+        next chunk is read, to slow the download down to its own pace.
+        Returns the closed response (status and headers); errors are raised
+        as in get.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self._stream(url, timeout, verify, headers, consume), self._ensure_loop()
+        )
+        return future.result()
+
+    async def astream(
+        self,
+        url: str,
+        timeout: float,
+        consume: Callable[[httpx.Response, bytes], bool | Awaitable[bool]],
+        verify: bool = True,
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        """Async stream; see stream"""
+        future = asyncio.run_coroutine_threadsafe(
+            self._stream(url, timeout, verify, headers, consume), self._ensure_loop()
+        )
+        return await asyncio.wrap_future(future)
+
+    def get(
+        self,
+        url: str,
+        timeout: float,
+        verify: bool = True,
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        """Fetch url from a synchronous caller; raises httpx.HTTPStatusError
+        for error statuses (and redirects it could not follow)"""
+        future = asyncio.run_coroutine_threadsafe(
+            self._request(url, timeout, verify, headers), self._ensure_loop()
+        )
+        return future.result()
+
+    async def aget(
+        self,
+        url: str,
+        timeout: float,
+        verify: bool = True,
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        """Fetch url from any event loop; see get"""
+        future = asyncio.run_coroutine_threadsafe(
+            self._request(url, timeout, verify, headers), self._ensure_loop()
+        )
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "clients": len(self._clients),
+            "hosts": len(self._host_slots),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        clients = list(self._clients.values())
+        self._clients.clear()
+
+        async def _close() -> None:
+            for client in clients:
+                await client.aclose()
+
+        asyncio.run_coroutine_threadsafe(_close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+
+_shared_client: SharedHTTPClient | None = None
+_shared_lock = threading.Lock()
+
+
+def get_http_client() -> SharedHTTPClient:
+    """The process-wide client used by the NFL tools"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = SharedHTTPClient()
+        return _shared_client
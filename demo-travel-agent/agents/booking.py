@@ -1,22 +1,21 @@
 from typing import Dict, Any, Optional
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from datetime import datetime, timedelta
 
 from models.state import TravelAgentState, TravelBooking
 from graph import add_message_to_state, update_state_field
+from utils.graph_utils import STREAM_TOKENS_TAG
+from utils.llm_registry import LLMRegistry
 
 
 class BookingAgent:
     """Booking agent for handling travel reservations and booking requests"""
 
-    def __init__(self, openai_api_key: str):
-        self.llm = ChatOpenAI(
-            api_key=openai_api_key,
-            model="gpt-4o-mini",
-            temperature=0.2
-        )
+    def __init__(self, openai_api_key: str, llm_registry: Optional[LLMRegistry] = None):
+        # Shared HTTP pool and concurrency limit when built by the graph
+        llm_registry = llm_registry or LLMRegistry(openai_api_key)
+        self.llm = llm_registry.get("booking", temperature=0.2)
 
         self.booking_analysis_prompt = ChatPromptTemplate.from_messages([
             ("system", """You are a travel booking assistant. Extract booking information from the customer's query and provide helpful booking assistance.
@@ -50,6 +49,11 @@ Provide a professional confirmation response that includes:
     def process_booking_request(self, state: TravelAgentState) -> TravelAgentState:
         """Process a booking request and update booking information"""
 
+        # The router already extracted the booking fields (combined mode)
+        pre_extracted = state["agent_responses"].get("booking_extraction")
+        if pre_extracted is not None:
+            return self._apply_booking_result(state, pre_extracted)
+
         try:
             # Extract booking information from the query
             booking_chain = self.booking_analysis_prompt | self.llm | self.output_parser
@@ -58,31 +62,59 @@ Provide a professional confirmation response that includes:
                 "query": state["current_query"]
             })
 
-            # Update booking information in state
-            updated_booking = self._update_booking_info(state["booking_info"], booking_result)
+            return self._apply_booking_result(state, booking_result)
+
+        except Exception as e:
+            print(f"Booking agent error: {e}")
+            return self._booking_error_state(state)
+
+    async def aprocess_booking_request(self, state: TravelAgentState) -> TravelAgentState:
+        """Async version of process_booking_request"""
 
-            state = update_state_field(state, "booking_info", updated_booking)
+        pre_extracted = state["agent_responses"].get("booking_extraction")
+        if pre_extracted is not None:
+            return self._apply_booking_result(state, pre_extracted)
+
+        try:
+            booking_chain = self.booking_analysis_prompt | self.llm | self.output_parser
 
-            # Generate booking response
-            response_message = self._generate_booking_response(updated_booking, booking_result)
+            booking_result = await booking_chain.ainvoke({
+                "query": state["current_query"]
+            })
 
-            return add_message_to_state(
-                state,
-                "agent",
-                response_message,
-                "booking_agent"
-            )
+            return self._apply_booking_result(state, booking_result)
 
         except Exception as e:
             print(f"Booking agent error: {e}")
-            error_message = "I apologize, but I'm having trouble processing your booking request. Could you please provide more details about your travel plans?"
+            return self._booking_error_state(state)
+
+    def _apply_booking_result(self, state: TravelAgentState, booking_result: Dict[str, Any]) -> TravelAgentState:
+        """Merge extracted booking fields into the state and add the agent reply"""
+        # Update booking information in state
+        updated_booking = self._update_booking_info(state["booking_info"], booking_result)
+
+        state = update_state_field(state, "booking_info", updated_booking)
+
+        # Generate booking response
+        response_message = self._generate_booking_response(updated_booking, booking_result)
+
+        return add_message_to_state(
+            state,
+            "agent",
+            response_message,
+            "booking_agent"
+        )
 
-            return add_message_to_state(
-                state,
-                "agent",
-                error_message,
-                "booking_agent"
-            )
+    def _booking_error_state(self, state: TravelAgentState) -> TravelAgentState:
+        """Add the booking error reply to the state"""
+        error_message = "I apologize, but I'm having trouble processing your booking request. Could you please provide more details about your travel plans?"
+
+        return add_message_to_state(
+            state,
+            "agent",
+            error_message,
+            "booking_agent"
+        )
 
     def _update_booking_info(self, current_booking: TravelBooking, extracted_info: Dict[str, Any]) -> TravelBooking:
         """Update booking information with extracted data"""
@@ -151,26 +183,50 @@ Provide a professional confirmation response that includes:
                 "booking_info": state["booking_info"]
             })
 
-            # Update booking status
-            updated_booking = state["booking_info"].copy()
-            updated_booking["booking_status"] = "confirmed"
+            return self._apply_confirmation(state, confirmation_response.content)
+
+        except Exception as e:
+            print(f"Booking confirmation error: {e}")
+            return self._confirmation_error_state(state)
+
+    async def aconfirm_booking(self, state: TravelAgentState) -> TravelAgentState:
+        """Async version of confirm_booking"""
+
+        try:
+            confirmation_chain = self.booking_confirmation_prompt | self.llm
 
-            state = update_state_field(state, "booking_info", updated_booking)
+            confirmation_response = await confirmation_chain.ainvoke({
+                "booking_info": state["booking_info"]
+            }, config={"tags": [STREAM_TOKENS_TAG]})
 
-            return add_message_to_state(
-                state,
-                "agent",
-                f"Booking Agent: {confirmation_response.content}",
-                "booking_agent"
-            )
+            return self._apply_confirmation(state, confirmation_response.content)
 
         except Exception as e:
             print(f"Booking confirmation error: {e}")
-            error_message = "I apologize, but there was an issue confirming your booking. Please contact customer support."
-
-            return add_message_to_state(
-                state,
-                "agent",
-                error_message,
-                "booking_agent"
-            )
\ No newline at end of file
+            return self._confirmation_error_state(state)
+
+    def _apply_confirmation(self, state: TravelAgentState, confirmation_text: str) -> TravelAgentState:
+        """Mark the booking as confirmed and add the confirmation reply"""
+        # Update booking status
+        updated_booking = state["booking_info"].copy()
+        updated_booking["booking_status"] = "confirmed"
+
+        state = update_state_field(state, "booking_info", updated_booking)
+
+        return add_message_to_state(
+            state,
+            "agent",
+            f"Booking Agent: {confirmation_text}",
+            "booking_agent"
+        )
+
+    def _confirmation_error_state(self, state: TravelAgentState) -> TravelAgentState:
+        """Add the confirmation error reply to the state"""
+        error_message = "I apologize, but there was an issue confirming your booking. Please contact customer support."
+
+        return add_message_to_state(
+            state,
+            "agent",
+            error_message,
+            "booking_agent"
+        )
\ No newline at end of file
@@ -1,21 +1,21 @@
 from typing import Dict, Any, Optional, List
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 
 from models.state import TravelAgentState
 from graph import add_message_to_state, update_state_field
+from utils.context_window import recent_history
+from utils.graph_utils import STREAM_TOKENS_TAG
+from utils.llm_registry import LLMRegistry
 
 
 class ComplaintAgent:
     """Complaint agent for handling customer issues, complaints, and service problems"""
 
-    def __init__(self, openai_api_key: str):
-        self.llm = ChatOpenAI(
-            api_key=openai_api_key,
-            model="gpt-4o-mini",
-            temperature=0.1
-        )
+    def __init__(self, openai_api_key: str, llm_registry: Optional[LLMRegistry] = None):
+        # Shared HTTP pool and concurrency limit when built by the graph
+        llm_registry = llm_registry or LLMRegistry(openai_api_key)
+        self.llm = llm_registry.get("complaint", temperature=0.1)
 
         self.complaint_analysis_prompt = ChatPromptTemplate.from_messages([
             ("system", """You are a customer service specialist handling travel-related complaints. Analyze the customer's complaint and determine:
@@ -69,33 +69,76 @@ Complaint: {complaint}"""),
             })
 
             # Store analysis in state
-            state = update_state_field(state, "agent_responses", {
-                **state["agent_responses"],
-                "complaint_analysis": analysis_result
-            })
+            state = self._store_analysis(state, analysis_result)
 
             # Determine response strategy based on severity and type
-            complaint_type = analysis_result.get("complaint_type", "other")
-            severity = analysis_result.get("severity", "medium")
-            urgency = analysis_result.get("urgency", "response_within_24h")
+            strategy = self._resolution_strategy(analysis_result)
 
-            if severity == "critical" or urgency == "immediate_action_required":
+            if strategy == "critical":
                 return self._handle_critical_complaint(state, analysis_result)
-            elif complaint_type in ["refund", "cancellation"]:
+            elif strategy == "refund_cancellation":
                 return self._handle_refund_cancellation(state, analysis_result)
             else:
                 return self._provide_standard_resolution(state, analysis_result)
 
         except Exception as e:
             print(f"Complaint agent error: {e}")
-            error_message = "I apologize for the inconvenience. I'm having trouble processing your complaint right now. Please contact our customer service team directly at support@travelcompany.com or call 1-800-TRAVEL."
+            return self._complaint_error_state(state)
+
+    async def ahandle_complaint(self, state: TravelAgentState) -> TravelAgentState:
+        """Async version of handle_complaint"""
+
+        try:
+            analysis_chain = self.complaint_analysis_prompt | self.llm | self.output_parser
 
-            return add_message_to_state(
-                state,
-                "agent",
-                error_message,
-                "complaint_agent"
-            )
+            analysis_result = await analysis_chain.ainvoke({
+                "query": state["current_query"]
+            })
+
+            state = self._store_analysis(state, analysis_result)
+
+            strategy = self._resolution_strategy(analysis_result)
+
+            if strategy == "critical":
+                return await self._ahandle_critical_complaint(state, analysis_result)
+            elif strategy == "refund_cancellation":
+                return self._handle_refund_cancellation(state, analysis_result)
+            else:
+                return await self._aprovide_standard_resolution(state, analysis_result)
+
+        except Exception as e:
+            print(f"Complaint agent error: {e}")
+            return self._complaint_error_state(state)
+
+    def _store_analysis(self, state: TravelAgentState, analysis_result: Dict[str, Any]) -> TravelAgentState:
+        """Store the complaint analysis in the agent responses"""
+        return update_state_field(state, "agent_responses", {
+            **state["agent_responses"],
+            "complaint_analysis": analysis_result
+        })
+
+    def _resolution_strategy(self, analysis_result: Dict[str, Any]) -> str:
+        """Pick a resolution strategy from the complaint severity and type"""
+        complaint_type = analysis_result.get("complaint_type", "other")
+        severity = analysis_result.get("severity", "medium")
+        urgency = analysis_result.get("urgency", "response_within_24h")
+
+        if severity == "critical" or urgency == "immediate_action_required":
+            return "critical"
+        elif complaint_type in ["refund", "cancellation"]:
+            return "refund_cancellation"
+        return "standard"
+
+    def _complaint_error_state(self, state: TravelAgentState) -> TravelAgentState:
+        """Add the complaint error reply to the state"""
+        error_message = "I apologize for the inconvenience. I'm having trouble processing your complaint right now. Please contact our customer service team directly at support@travelcompany.com or call 1-800-TRAVEL."
+
+        return add_message_to_state(
+            state,
+            "agent",
+            error_message,
+            "complaint_agent"
+        )
 
     def _handle_critical_complaint(self, state: TravelAgentState, analysis: Dict[str, Any]) -> TravelAgentState:
         """Handle critical complaints that require immediate attention"""
@@ -106,9 +149,25 @@ Complaint: {complaint}"""),
             "complaint": state["current_query"]
         })
 
+        return self._critical_complaint_state(state, escalation_response.content)
+
+    async def _ahandle_critical_complaint(self, state: TravelAgentState, analysis: Dict[str, Any]) -> TravelAgentState:
+        """Async version of _handle_critical_complaint"""
+
+        escalation_chain = self.escalation_prompt | self.llm
+
+        escalation_response = await escalation_chain.ainvoke({
+            "complaint": state["current_query"]
+        }, config={"tags": [STREAM_TOKENS_TAG]})
+
+        return self._critical_complaint_state(state, escalation_response.content)
+
+    def _critical_complaint_state(self, state: TravelAgentState, escalation_text: str) -> TravelAgentState:
+        """Add the escalation reply for a critical complaint"""
+
         response_message = f"""Complaint Agent: I understand this is a critical issue that requires immediate attention.
 
-{escalation_response.content}
+{escalation_text}
 
 I have escalated this to our senior customer service team. A representative will contact you within the next hour at the phone number associated with your account.
 
@@ -161,16 +220,37 @@ Could you provide your booking reference number so I can check your specific can
 
         solution_chain = self.solution_prompt | self.llm
 
-        solution_response = solution_chain.invoke({
+        solution_response = solution_chain.invoke(self._solution_inputs(state, analysis))
+
+        return self._standard_resolution_state(state, solution_response.content)
+
+    async def _aprovide_standard_resolution(self, state: TravelAgentState, analysis: Dict[str, Any]) -> TravelAgentState:
+        """Async version of _provide_standard_resolution"""
+
+        solution_chain = self.solution_prompt | self.llm
+
+        solution_response = await solution_chain.ainvoke(
+            self._solution_inputs(state, analysis),
+            config={"tags": [STREAM_TOKENS_TAG]}
+        )
+
+        return self._standard_resolution_state(state, solution_response.content)
+
+    def _solution_inputs(self, state: TravelAgentState, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the prompt inputs for the solution chain"""
+        return {
             "analysis": analysis,
             "context": {
                 "booking_info": state["booking_info"],
                 "customer_info": state["customer_info"],
-                "conversation_history": [msg["content"] for msg in state["messages"][-3:]]
+                "conversation_history": recent_history(state, 3)
             }
-        })
+        }
+
+    def _standard_resolution_state(self, state: TravelAgentState, solution_text: str) -> TravelAgentState:
+        """Add the standard resolution reply to the state"""
 
-        response_message = f"Complaint Agent: {solution_response.content}"
+        response_message = f"Complaint Agent: {solution_text}"
 
         return add_message_to_state(
             state,
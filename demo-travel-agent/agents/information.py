@@ -1,21 +1,24 @@
 from typing import Dict, Any, Optional, List
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 
 from models.state import TravelAgentState
 from graph import add_message_to_state, update_state_field
+from utils.graph_utils import STREAM_TOKENS_TAG
+from utils.llm_registry import LLMRegistry
+from utils.response_cache import CacheKey, ResponseCache
 
 
 class InformationAgent:
     """Information agent for providing travel information, recommendations, and destination details"""
 
-    def __init__(self, openai_api_key: str):
-        self.llm = ChatOpenAI(
-            api_key=openai_api_key,
-            model="gpt-4o-mini",
-            temperature=0.3
-        )
+    def __init__(self, openai_api_key: str, response_cache: Optional[ResponseCache] = None,
+                 llm_registry: Optional[LLMRegistry] = None):
+        self.response_cache = response_cache
+
+        # Shared HTTP pool and concurrency limit when built by the graph
+        llm_registry = llm_registry or LLMRegistry(openai_api_key)
+        self.llm = llm_registry.get("information", temperature=0.3)
 
         self.query_analysis_prompt = ChatPromptTemplate.from_messages([
             ("system", """You are a travel information specialist. Analyze the customer's query to understand what type of information they need:
@@ -126,27 +129,140 @@ Travel duration: {duration}"""),
 
         except Exception as e:
             print(f"Information agent error: {e}")
-            error_message = "I apologize, but I'm having trouble retrieving that travel information right now. Could you please rephrase your question or ask about a specific destination?"
+            return self._information_error_state(state)
+
+    async def aprovide_information(self, state: TravelAgentState) -> TravelAgentState:
+        """Async version of provide_information"""
+
+        try:
+            analysis_chain = self.query_analysis_prompt | self.llm | self.output_parser
+
+            analysis_result = await analysis_chain.ainvoke({
+                "query": state["current_query"]
+            })
+
+            query_type = analysis_result.get("query_type", "general_travel")
+            destination = analysis_result.get("destination")
+            timeframe = analysis_result.get("timeframe")
+            interests = analysis_result.get("interests", [])
+
+            if query_type == "destination_info":
+                return await self._aprovide_destination_info(state, destination, timeframe, interests)
+            elif query_type == "recommendations":
+                return await self._aprovide_recommendations(state, destination, interests)
+            elif query_type == "travel_tips":
+                return await self._aprovide_travel_tips(state, destination)
+            elif query_type == "requirements":
+                return self._provide_requirements_info(state, destination)
+            elif query_type == "weather_seasonal":
+                return self._provide_weather_info(state, destination, timeframe)
+            else:
+                return self._provide_general_travel_info(state)
+
+        except Exception as e:
+            print(f"Information agent error: {e}")
+            return self._information_error_state(state)
+
+    def _information_error_state(self, state: TravelAgentState) -> TravelAgentState:
+        """Add the information error reply to the state"""
+        error_message = "I apologize, but I'm having trouble retrieving that travel information right now. Could you please rephrase your question or ask about a specific destination?"
+
+        return add_message_to_state(
+            state,
+            "agent",
+            error_message,
+            "information_agent"
+        )
+
+    def _generate(self, chain, inputs: Dict[str, Any], cache_key: CacheKey) -> str:
+        """Run an answer chain, serving repeated inputs from the response cache"""
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
 
-            return add_message_to_state(
-                state,
-                "agent",
-                error_message,
-                "information_agent"
-            )
+        content = chain.invoke(inputs).content
+        self._cache_set(cache_key, content)
+        return content
+
+    async def _agenerate(self, chain, inputs: Dict[str, Any], cache_key: CacheKey) -> str:
+        """Async version of _generate"""
+        cached = await self._acache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        content = (await chain.ainvoke(inputs, config={"tags": [STREAM_TOKENS_TAG]})).content
+        await self._acache_set(cache_key, content)
+        return content
+
+    # Cache failures (e.g. the embeddings API being down) must never fail the
+    # answer itself, so they are logged and treated as misses
+
+    def _cache_get(self, cache_key: CacheKey) -> Optional[str]:
+        if self.response_cache is None:
+            return None
+        try:
+            return self.response_cache.get(cache_key)
+        except Exception as e:
+            print(f"Response cache error: {e}")
+            return None
+
+    def _cache_set(self, cache_key: CacheKey, content: str) -> None:
+        if self.response_cache is None:
+            return
+        try:
+            self.response_cache.set(cache_key, content)
+        except Exception as e:
+            print(f"Response cache error: {e}")
+
+    async def _acache_get(self, cache_key: CacheKey) -> Optional[str]:
+        if self.response_cache is None:
+            return None
+        try:
+            return await self.response_cache.aget(cache_key)
+        except Exception as e:
+            print(f"Response cache error: {e}")
+            return None
+
+    async def _acache_set(self, cache_key: CacheKey, content: str) -> None:
+        if self.response_cache is None:
+            return
+        try:
+            await self.response_cache.aset(cache_key, content)
+        except Exception as e:
+            print(f"Response cache error: {e}")
 
     def _provide_destination_info(self, state: TravelAgentState, destination: str, timeframe: str, interests: List[str]) -> TravelAgentState:
         """Provide comprehensive destination information"""
 
         info_chain = self.destination_info_prompt | self.llm
+        inputs = self._destination_info_inputs(destination, timeframe, interests)
 
-        response = info_chain.invoke({
+        content = self._generate(info_chain, inputs, CacheKey("destination_info", destination, timeframe, interests))
+
+        return self._destination_info_state(state, destination, content)
+
+    async def _aprovide_destination_info(self, state: TravelAgentState, destination: str, timeframe: str, interests: List[str]) -> TravelAgentState:
+        """Async version of _provide_destination_info"""
+
+        info_chain = self.destination_info_prompt | self.llm
+        inputs = self._destination_info_inputs(destination, timeframe, interests)
+
+        content = await self._agenerate(info_chain, inputs, CacheKey("destination_info", destination, timeframe, interests))
+
+        return self._destination_info_state(state, destination, content)
+
+    def _destination_info_inputs(self, destination: str, timeframe: str, interests: List[str]) -> Dict[str, Any]:
+        """Build the prompt inputs for the destination info chain"""
+        return {
             "destination": destination or "the location",
             "timeframe": timeframe or "unspecified",
             "interests": ", ".join(interests) if interests else "general tourism"
-        })
+        }
+
+    def _destination_info_state(self, state: TravelAgentState, destination: str, content: str) -> TravelAgentState:
+        """Add the destination info reply to the state"""
 
-        response_message = f"Information Agent: Here's what I know about {destination}:\n\n{response.content}"
+        response_message = f"Information Agent: Here's what I know about {destination}:\n\n{content}"
 
         return add_message_to_state(
             state,
@@ -158,6 +274,28 @@ Travel duration: {duration}"""),
     def _provide_recommendations(self, state: TravelAgentState, destination: str, interests: List[str]) -> TravelAgentState:
         """Provide personalized recommendations"""
 
+        rec_chain = self.recommendation_prompt | self.llm
+        inputs = self._recommendation_inputs(state, destination, interests)
+        cache_key = CacheKey("recommendations", destination, None, interests, budget=inputs["budget"], group=inputs["group"])
+
+        content = self._generate(rec_chain, inputs, cache_key)
+
+        return self._recommendations_state(state, destination, content)
+
+    async def _aprovide_recommendations(self, state: TravelAgentState, destination: str, interests: List[str]) -> TravelAgentState:
+        """Async version of _provide_recommendations"""
+
+        rec_chain = self.recommendation_prompt | self.llm
+        inputs = self._recommendation_inputs(state, destination, interests)
+        cache_key = CacheKey("recommendations", destination, None, interests, budget=inputs["budget"], group=inputs["group"])
+
+        content = await self._agenerate(rec_chain, inputs, cache_key)
+
+        return self._recommendations_state(state, destination, content)
+
+    def _recommendation_inputs(self, state: TravelAgentState, destination: str, interests: List[str]) -> Dict[str, Any]:
+        """Build the prompt inputs for the recommendation chain"""
+
         # Extract budget and group info from conversation if available
         budget = "moderate"  # Default
         group = "general"
@@ -175,16 +313,17 @@ Travel duration: {duration}"""),
             elif any(word in msg_lower for word in ["solo", "alone"]):
                 group = "solo"
 
-        rec_chain = self.recommendation_prompt | self.llm
-
-        response = rec_chain.invoke({
+        return {
             "destination": destination or "your destination",
             "interests": ", ".join(interests) if interests else "general tourism",
             "budget": budget,
             "group": group
-        })
+        }
 
-        response_message = f"Information Agent: Based on your interests, here are my recommendations for {destination}:\n\n{response.content}"
+    def _recommendations_state(self, state: TravelAgentState, destination: str, content: str) -> TravelAgentState:
+        """Add the recommendations reply to the state"""
+
+        response_message = f"Information Agent: Based on your interests, here are my recommendations for {destination}:\n\n{content}"
 
         return add_message_to_state(
             state,
@@ -197,13 +336,33 @@ Travel duration: {duration}"""),
         """Provide practical travel tips"""
 
         tips_chain = self.travel_tips_prompt | self.llm
+        inputs = self._travel_tips_inputs(destination)
+
+        content = self._generate(tips_chain, inputs, CacheKey("travel_tips", destination, duration=inputs["duration"]))
+
+        return self._travel_tips_state(state, destination, content)
 
-        response = tips_chain.invoke({
+    async def _aprovide_travel_tips(self, state: TravelAgentState, destination: str) -> TravelAgentState:
+        """Async version of _provide_travel_tips"""
+
+        tips_chain = self.travel_tips_prompt | self.llm
+        inputs = self._travel_tips_inputs(destination)
+
+        content = await self._agenerate(tips_chain, inputs, CacheKey("travel_tips", destination, duration=inputs["duration"]))
+
+        return self._travel_tips_state(state, destination, content)
+
+    def _travel_tips_inputs(self, destination: str) -> Dict[str, Any]:
+        """Build the prompt inputs for the travel tips chain"""
+        return {
             "destination": destination or "your destination",
             "duration": "your trip"  # Could be extracted from booking info
-        })
+        }
+
+    def _travel_tips_state(self, state: TravelAgentState, destination: str, content: str) -> TravelAgentState:
+        """Add the travel tips reply to the state"""
 
-        response_message = f"Information Agent: Here are some practical travel tips for {destination}:\n\n{response.content}"
+        response_message = f"Information Agent: Here are some practical travel tips for {destination}:\n\n{content}"
 
         return add_message_to_state(
             state,
@@ -1,21 +1,91 @@
 from typing import Dict, Any, Optional
-from langchain_openai import ChatOpenAI
+import os
+import threading
+import time
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 
 from models.state import TravelAgentState
 from graph import add_message_to_state, update_state_field
+from utils.keyword_matcher import KeywordMatcher
+from utils.llm_registry import LLMRegistry
+
+
+# Keyword weights per agent: 1.0 for words that state the intent outright,
+# lower for words that only hint at it. Matching is by word prefix, so "book"
+# also covers "booking" and "cancel" covers "cancellation"
+ROUTING_KEYWORDS = {
+    "booking": {
+        "book": 1.0, "reserve": 1.0, "reservation": 1.0, "ticket": 1.0,
+        "flight": 0.5, "hotel": 0.5, "tour": 0.5, "package": 0.5, "vacation": 0.5,
+        "trip": 0.5, "travel": 0.25
+    },
+    "complaint": {
+        "complaint": 1.0, "refund": 1.0, "cancel": 1.0, "dissatisfied": 1.0, "angry": 1.0,
+        "upset": 1.0, "terrible": 1.0, "awful": 1.0, "horrible": 1.0,
+        "problem": 0.5, "issue": 0.5, "delay": 0.5, "wrong": 0.5, "mistake": 0.5, "error": 0.5
+    },
+    "information": {
+        "information": 1.0, "recommend": 1.0, "suggest": 1.0, "tips": 1.0, "visa": 1.0,
+        "weather": 1.0, "tell me about": 1.0, "things to do": 1.0, "best time": 1.0,
+        "where": 0.5, "how": 0.5
+    }
+}
+
+DEFAULT_KEYWORD_CONFIDENCE_THRESHOLD = 0.65
+
+
+class RoutingStats:
+    """Counters for routing tiers, used to tune the keyword confidence threshold"""
+
+    TIERS = ("keyword", "llm", "fallback")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {tier: 0 for tier in self.TIERS}
+        self.latency_totals = {tier: 0.0 for tier in self.TIERS}
+
+    def record(self, tier: str, latency: float) -> None:
+        with self._lock:
+            self.counts[tier] += 1
+            self.latency_totals[tier] += latency
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self.counts.values())
+            averages = {
+                tier: (self.latency_totals[tier] / self.counts[tier]) if self.counts[tier] else 0.0
+                for tier in self.TIERS
+            }
+            # Each keyword hit saved one LLM round-trip, minus the matcher cost
+            saved = self.counts["keyword"] * max(averages["llm"] - averages["keyword"], 0.0)
+
+            return {
+                "total_queries": total,
+                "tier_counts": dict(self.counts),
+                "tier_hit_rates": {
+                    tier: (self.counts[tier] / total) if total else 0.0 for tier in self.TIERS
+                },
+                "avg_latency_seconds": averages,
+                "estimated_latency_saved_seconds": saved
+            }
 
 
 class RouterAgent:
-    """Router agent that analyzes customer queries and routes them to appropriate specialized agents"""
+    """Router agent that analyzes customer queries and routes them to appropriate specialized agents
 
-    def __init__(self, openai_api_key: str):
-        self.llm = ChatOpenAI(
-            api_key=openai_api_key,
-            model="gpt-4o-mini",
-            temperature=0.1
-        )
+    Routing is tiered: a keyword matcher scores the query first and the LLM
+    is only called when the keyword confidence is below the threshold.
+
+    In "combined" mode the LLM call also extracts the booking fields, so a
+    booking request needs one LLM round-trip instead of two.
+    """
+
+    def __init__(self, openai_api_key: str, keyword_confidence_threshold: Optional[float] = None,
+                 mode: Optional[str] = None, llm_registry: Optional[LLMRegistry] = None):
+        # Shared HTTP pool and concurrency limit when built by the graph
+        llm_registry = llm_registry or LLMRegistry(openai_api_key)
+        self.llm = llm_registry.get("router", temperature=0.1)
 
         self.routing_prompt = ChatPromptTemplate.from_messages([
             ("system", """You are a travel customer service router. Analyze the customer's query and determine which specialized agent should handle it.
@@ -30,77 +100,157 @@ Return a JSON response with:
 - confidence: A score from 0-1 indicating confidence in the routing decision
 - reasoning: Brief explanation of why this agent was chosen
 
+If the query doesn't clearly fit any category, default to "information"."""),
+            ("user", "{query}")
+        ])
+
+        self.combined_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are a travel customer service router. Analyze the customer's query, determine which specialized agent should handle it, and extract booking details in the same pass.
+
+Available agents:
+- booking: For travel reservations, flight bookings, hotel bookings, tour packages
+- complaint: For customer complaints, cancellations, refunds, service issues, problems
+- information: For travel information, recommendations, destination info, how-to questions
+
+Return a JSON response with:
+- agent: The chosen agent name ("booking", "complaint", "information")
+- confidence: A score from 0-1 indicating confidence in the routing decision
+- reasoning: Brief explanation of why this agent was chosen
+- booking: Only when agent is "booking", an object with the extracted booking information, otherwise null:
+  - destination: Where they want to travel
+  - departure_date: When they want to leave (in YYYY-MM-DD format)
+  - return_date: When they want to return (in YYYY-MM-DD format)
+  - travelers: Number of people traveling (default: 1)
+  - budget: Their budget range if mentioned
+  - preferences: Any specific preferences (hotel type, flight class, etc.)
+
 If the query doesn't clearly fit any category, default to "information"."""),
             ("user", "{query}")
         ])
 
         self.output_parser = JsonOutputParser()
 
+        # "classify" routes only; "combined" routes and extracts booking fields
+        self.mode = (mode or os.getenv("ROUTER_MODE", "classify")).lower()
+
+        if keyword_confidence_threshold is None:
+            keyword_confidence_threshold = float(os.getenv(
+                "ROUTER_KEYWORD_CONFIDENCE_THRESHOLD", DEFAULT_KEYWORD_CONFIDENCE_THRESHOLD
+            ))
+        self.keyword_confidence_threshold = keyword_confidence_threshold
+        self.keyword_matcher = KeywordMatcher(ROUTING_KEYWORDS)
+        self.stats = RoutingStats()
+
     def route_query(self, state: TravelAgentState) -> TravelAgentState:
         """Analyze the query and determine which agent should handle it"""
 
+        keyword_state = self._keyword_routing(state)
+        if keyword_state is not None:
+            return keyword_state
+
+        start = time.perf_counter()
         try:
             # Prepare the routing chain
-            routing_chain = self.routing_prompt | self.llm | self.output_parser
+            routing_chain = self._routing_chain()
 
             # Get routing decision
             routing_result = routing_chain.invoke({
                 "query": state["current_query"]
             })
 
-            agent = routing_result.get("agent", "information")
-            confidence = routing_result.get("confidence", 0.5)
-            reasoning = routing_result.get("reasoning", "Default routing decision")
+            self.stats.record("llm", time.perf_counter() - start)
+            return self._apply_routing_result(state, routing_result)
 
-            # Update state with routing decision
-            state = update_state_field(state, "query_type", agent)
-            state = update_state_field(state, "current_agent", agent)
+        except Exception as e:
+            # Fallback routing based on keywords
+            print(f"Router error: {e}. Using fallback routing.")
+            self.stats.record("fallback", time.perf_counter() - start)
+            return self._fallback_routing(state)
+
+    async def aroute_query(self, state: TravelAgentState) -> TravelAgentState:
+        """Async version of route_query that does not block the event loop"""
 
-            # Add routing message to conversation
-            routing_message = f"Router: I've analyzed your query and determined this is a {agent} request. {reasoning}"
+        keyword_state = self._keyword_routing(state)
+        if keyword_state is not None:
+            return keyword_state
 
-            return add_message_to_state(
-                state,
-                "agent",
-                routing_message,
-                "router"
-            )
+        start = time.perf_counter()
+        try:
+            routing_chain = self._routing_chain()
+
+            routing_result = await routing_chain.ainvoke({
+                "query": state["current_query"]
+            })
+
+            self.stats.record("llm", time.perf_counter() - start)
+            return self._apply_routing_result(state, routing_result)
 
         except Exception as e:
-            # Fallback routing based on keywords
             print(f"Router error: {e}. Using fallback routing.")
+            self.stats.record("fallback", time.perf_counter() - start)
             return self._fallback_routing(state)
 
-    def _fallback_routing(self, state: TravelAgentState) -> TravelAgentState:
-        """Fallback routing using keyword matching when LLM fails"""
-        query = state["current_query"].lower()
-
-        # Enhanced keyword-based routing
-        booking_keywords = [
-            "book", "reserve", "booking", "flight", "hotel", "tour", "package",
-            "vacation", "trip", "travel", "reservation", "ticket"
-        ]
-
-        complaint_keywords = [
-            "complaint", "problem", "issue", "cancel", "refund", "delay",
-            "wrong", "mistake", "error", "dissatisfied", "angry", "upset",
-            "terrible", "awful", "horrible"
-        ]
-
-        if any(keyword in query for keyword in booking_keywords):
-            agent = "booking"
-            reasoning = "Detected booking-related keywords"
-        elif any(keyword in query for keyword in complaint_keywords):
-            agent = "complaint"
-            reasoning = "Detected complaint-related keywords"
-        else:
-            agent = "information"
-            reasoning = "Defaulting to information agent"
+    def _routing_chain(self):
+        """Prompt | llm | parser chain for the configured routing mode"""
+        prompt = self.combined_prompt if self.mode == "combined" else self.routing_prompt
+        return prompt | self.llm | self.output_parser
+
+    def score_keywords(self, query: str) -> Dict[str, Any]:
+        """Score a query against the keyword tables
+
+        Confidence combines how dominant the best agent is over the others
+        with how much keyword evidence it has, so a lone weak hint or a
+        query matching several agents stays below the threshold.
+        """
+        scores = self.keyword_matcher.score(query)
+        if not scores:
+            return {"agent": None, "confidence": 0.0, "keywords": []}
+
+        agent, best = max(scores.items(), key=lambda item: item[1]["score"])
+        total = sum(entry["score"] for entry in scores.values())
+        dominance = best["score"] / total
+        evidence = best["score"] / (best["score"] + 0.5)
+
+        return {
+            "agent": agent,
+            "confidence": dominance * evidence,
+            "keywords": best["keywords"]
+        }
 
-        # Update state
+    def _keyword_routing(self, state: TravelAgentState) -> Optional[TravelAgentState]:
+        """Route on keywords alone when confident enough, otherwise return None"""
+        start = time.perf_counter()
+        match = self.score_keywords(state["current_query"])
+
+        if match["agent"] is None or match["confidence"] < self.keyword_confidence_threshold:
+            return None
+
+        self.stats.record("keyword", time.perf_counter() - start)
+        reasoning = f"Matched keywords: {', '.join(match['keywords'])}"
+        return self._set_route(state, match["agent"], reasoning)
+
+    def _apply_routing_result(self, state: TravelAgentState, routing_result: Dict[str, Any]) -> TravelAgentState:
+        """Update the state with the LLM routing decision"""
+        agent = routing_result.get("agent", "information")
+        confidence = routing_result.get("confidence", 0.5)
+        reasoning = routing_result.get("reasoning", "Default routing decision")
+
+        # Hand booking fields extracted in combined mode to the booking agent
+        if agent == "booking" and isinstance(routing_result.get("booking"), dict):
+            state = update_state_field(state, "agent_responses", {
+                **state["agent_responses"],
+                "booking_extraction": routing_result["booking"]
+            })
+
+        return self._set_route(state, agent, reasoning)
+
+    def _set_route(self, state: TravelAgentState, agent: str, reasoning: str) -> TravelAgentState:
+        """Record the chosen agent in the state and add the routing message"""
+        # Update state with routing decision
         state = update_state_field(state, "query_type", agent)
         state = update_state_field(state, "current_agent", agent)
 
+        # Add routing message to conversation
         routing_message = f"Router: I've analyzed your query and determined this is a {agent} request. {reasoning}"
 
         return add_message_to_state(
@@ -108,4 +258,17 @@ If the query doesn't clearly fit any category, default to "information"."""),
             "agent",
             routing_message,
             "router"
-        )
\ No newline at end of file
+        )
+
+    def _fallback_routing(self, state: TravelAgentState) -> TravelAgentState:
+        """Fallback routing using keyword matching when LLM fails"""
+        match = self.score_keywords(state["current_query"])
+
+        if match["agent"] is not None:
+            agent = match["agent"]
+            reasoning = f"Detected {agent}-related keywords"
+        else:
+            agent = "information"
+            reasoning = "Defaulting to information agent"
+
+        return self._set_route(state, agent, reasoning)
\ No newline at end of file
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Recorded-response latency harness for router modes.
+
+Compares end-to-end latency of booking queries when the router only
+classifies ("classify": router call + booking extraction call) and when it
+classifies and extracts in one call ("combined").
+
+First record real responses and their latencies (needs OPENAI_API_KEY):
+    python bench_routing.py --record
+Then replay them as often as needed without network access:
+    python bench_routing.py
+
+The keyword routing tier is disabled here so every query exercises the
+LLM router path being compared.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from graph import TravelMultiAgentGraph
+
+
+BOOKING_QUERIES = [
+    "I'd like to go to Lisbon from June 3 to June 10 with my partner",
+    "Can you get me to Tokyo next month? Two adults, business class",
+    "Looking for a week in Bali in August for a family of four",
+    "Need something in Rome over Easter, just me, mid-range budget",
+    "Plan a trip to Reykjavik from 2026-12-20 to 2026-12-27 for 3 people",
+    "We want to visit Cape Town in March, 2 travelers, boutique hotel",
+]
+
+DEFAULT_RECORDING = os.path.join("recordings", "routing.jsonl")
+
+
+def prompt_kind(messages: List[BaseMessage]) -> str:
+    """Identify which prompt a call came from by its system message"""
+    system = messages[0].content if messages else ""
+    if "extract booking details in the same pass" in system:
+        return "combined"
+    if "travel customer service router" in system:
+        return "router"
+    if "travel booking assistant" in system:
+        return "booking_analysis"
+    return "other"
+
+
+class RecordingChatModel(BaseChatModel):
+    """Wraps a real chat model and records each response with its latency"""
+
+    inner: Any
+    records: List[Dict[str, Any]] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording"
+
+    def _record(self, messages: List[BaseMessage], content: str, latency: float) -> ChatResult:
+        self.records.append({
+            "kind": prompt_kind(messages),
+            "query": messages[-1].content,
+            "content": content,
+            "latency": latency
+        })
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        start = time.perf_counter()
+        response = self.inner.invoke(messages)
+        return self._record(messages, response.content, time.perf_counter() - start)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        start = time.perf_counter()
+        response = await self.inner.ainvoke(messages)
+        return self._record(messages, response.content, time.perf_counter() - start)
+
+
+class ReplayChatModel(BaseChatModel):
+    """Replays recorded responses, sleeping for the recorded latency"""
+
+    recordings: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def _lookup(self, messages: List[BaseMessage]) -> Dict[str, Any]:
+        key = f"{prompt_kind(messages)}|{messages[-1].content}"
+        record = self.recordings.get(key)
+        if record is None:
+            raise KeyError(f"No recording for {key!r}; re-run with --record")
+        return record
+
+    @staticmethod
+    def _result(record: Dict[str, Any]) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=record["content"]))])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        record = self._lookup(messages)
+        time.sleep(record["latency"])
+        return self._result(record)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        record = self._lookup(messages)
+        await asyncio.sleep(record["latency"])
+        return self._result(record)
+
+
+def build_graph(mode: str, llm: BaseChatModel) -> TravelMultiAgentGraph:
+    graph = TravelMultiAgentGraph(openai_api_key=os.getenv("OPENAI_API_KEY", "replay-key"))
+    graph.router_agent.mode = mode
+    graph.router_agent.keyword_confidence_threshold = 1.01
+    # Every agent's LLM goes through the recording, so a query the router
+    # sends elsewhere is recorded/replayed too instead of reaching the API
+    graph.booking_agent.llm = llm
+    graph.router_agent.llm = llm
+    graph.information_agent.llm = llm
+    graph.complaint_agent.llm = llm
+    # Cached answers would skip the recorded call (and semantic lookups embed
+    # over the network)
+    graph.information_agent.response_cache = None
+    return graph
+
+
+async def run_mode(mode: str, llm: BaseChatModel, rounds: int) -> List[float]:
+    graph = build_graph(mode, llm)
+    latencies = []
+    for _ in range(rounds):
+        for i, query in enumerate(BOOKING_QUERIES):
+            start = time.perf_counter()
+            await graph.aprocess_query(query, f"{mode}_{i}")
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def record(path: str) -> None:
+    from langchain_openai import ChatOpenAI
+
+    recorder = RecordingChatModel(inner=ChatOpenAI(model="gpt-4o-mini", temperature=0.1))
+    for mode in ("classify", "combined"):
+        await run_mode(mode, recorder, rounds=1)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        for row in recorder.records:
+            handle.write(json.dumps(row) + "\n")
+    print(f"Recorded {len(recorder.records)} responses to {path}")
+
+
+async def replay(path: str, rounds: int) -> None:
+    recordings = {}
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            row = json.loads(line)
+            recordings[f"{row['kind']}|{row['query']}"] = row
+
+    replayer = ReplayChatModel(recordings=recordings)
+    results = {mode: await run_mode(mode, replayer, rounds) for mode in ("classify", "combined")}
+
+    print(f"{'mode':<10} {'p50_ms':>8} {'p95_ms':>8} {'mean_ms':>8}")
+    for mode, latencies in results.items():
+        print(f"{mode:<10} {percentile(latencies, 50) * 1000:>8.0f} {percentile(latencies, 95) * 1000:>8.0f} {statistics.mean(latencies) * 1000:>8.0f}")
+
+    for pct in (50, 95):
+        before = percentile(results["classify"], pct)
+        after = percentile(results["combined"], pct)
+        print(f"p{pct} reduction: {(before - after) * 1000:.0f} ms ({(1 - after / before) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare classify vs combined router latency on recorded responses")
+    parser.add_argument("--record", action="store_true", help="Call the real LLM and save responses")
+    parser.add_argument("--recording", default=DEFAULT_RECORDING, help="Recording file (JSONL)")
+    parser.add_argument("--rounds", type=int, default=5, help="Replay rounds over the query set")
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(record(args.recording))
+    elif not os.path.exists(args.recording):
+        parser.error(f"{args.recording} not found; run with --record first")
+    else:
+        asyncio.run(replay(args.recording, args.rounds))
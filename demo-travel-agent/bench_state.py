@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark for conversation state updates.
+
+Replays a long session through the state helpers the router and agents use
+each turn, comparing the previous list-copying implementation with the
+current MessageLog-based one. Reports time and allocated bytes per turn.
+
+Usage: python bench_state.py [--turns 500]
+"""
+
+import argparse
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from models.state import ConversationMessage
+from utils.graph_utils import create_initial_state, add_message_to_state, update_state_field
+
+
+def baseline_add_message(state: Dict[str, Any], role: str, content: str, agent_name: str = None) -> Dict[str, Any]:
+    """add_message_to_state as it was before MessageLog: copies the history"""
+    new_message = ConversationMessage(
+        role=role,
+        content=content,
+        timestamp=datetime.now(),
+        agent_name=agent_name
+    )
+
+    updated_state = state.copy()
+    updated_state["messages"] = list(state["messages"]) + [new_message]
+    updated_state["updated_at"] = datetime.now()
+    return updated_state
+
+
+def play_turn(state: Dict[str, Any], turn: int, add_message: Callable) -> Dict[str, Any]:
+    """One turn: user message, router decision, agent reply, final response"""
+    state = update_state_field(state, "current_query", f"Question {turn}")
+    state = add_message(state, "user", f"Question {turn}")
+    state = update_state_field(state, "query_type", "information")
+    state = update_state_field(state, "current_agent", "information")
+    state = add_message(state, "agent", "Router: information request", "router")
+    state = add_message(state, "agent", f"Information Agent: answer {turn}", "information_agent")
+    state = add_message(state, "assistant", f"Final Response: answer {turn}", "final_response")
+    return state
+
+
+def replay(turns: int, add_message: Callable) -> List[Dict[str, float]]:
+    """Replay a session and measure each turn"""
+    state = create_initial_state("start", "bench")
+    samples = []
+
+    tracemalloc.start()
+    for turn in range(turns):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+
+        state = play_turn(state, turn, add_message)
+
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        samples.append({"seconds": elapsed, "bytes": peak - before})
+    tracemalloc.stop()
+
+    return samples
+
+
+def summarise(name: str, samples: List[Dict[str, float]]) -> None:
+    def window(rows):
+        return (
+            sum(row["seconds"] for row in rows) / len(rows) * 1e6,
+            sum(row["bytes"] for row in rows) / len(rows)
+        )
+
+    first_us, first_bytes = window(samples[:50])
+    last_us, last_bytes = window(samples[-50:])
+    print(f"{name:<10} {first_us:>16.1f} {last_us:>16.1f} {first_bytes:>18.0f} {last_bytes:>18.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-turn state update cost")
+    parser.add_argument("--turns", type=int, default=500, help="Number of turns to replay")
+    args = parser.parse_args()
+
+    print(f"Replaying {args.turns} turns (4 messages per turn)")
+    print(f"{'impl':<10} {'us/turn first50':>16} {'us/turn last50':>16} {'bytes/turn first50':>18} {'bytes/turn last50':>18}")
+    summarise("before", replay(args.turns, baseline_add_message))
+    summarise("after", replay(args.turns, add_message_to_state))
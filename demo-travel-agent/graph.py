@@ -1,11 +1,15 @@
 from langgraph.graph import StateGraph, END
-from typing import Dict, Any, List
+from langchain_core.runnables import RunnableLambda
+from typing import Dict, Any, List, AsyncIterator
 from datetime import datetime
 import uuid
 import os
 
 from models.state import TravelAgentState, ConversationMessage, CustomerInfo, TravelBooking
-from utils.graph_utils import create_initial_state, add_message_to_state, update_state_field
+from utils.graph_utils import create_initial_state, add_message_to_state, update_state_field, STREAM_TOKENS_TAG
+from utils.response_cache import create_response_cache
+from utils.context_window import create_context_manager
+from utils.llm_registry import create_llm_registry
 
 
 
@@ -15,7 +19,7 @@ from utils.graph_utils import create_initial_state, add_message_to_state, update
 class TravelMultiAgentGraph:
     """Main graph class for the travel customer management multi-agent system"""
 
-    def __init__(self, openai_api_key: str = None):
+    def __init__(self, openai_api_key: str = None, llm_overrides: Dict[str, Dict[str, Any]] = None):
         if openai_api_key is None:
             openai_api_key = os.getenv("OPENAI_API_KEY")
 
@@ -25,11 +29,21 @@ class TravelMultiAgentGraph:
         # Import agents here to avoid circular imports
         from agents import RouterAgent, BookingAgent, ComplaintAgent, InformationAgent
 
+        # One HTTP pool and concurrency limit shared by every agent's LLM;
+        # llm_overrides maps agent name -> {"model": ..., "temperature": ...}
+        self.llm_registry = create_llm_registry(openai_api_key, llm_overrides)
+
         # Initialize agents
-        self.router_agent = RouterAgent(openai_api_key)
-        self.booking_agent = BookingAgent(openai_api_key)
-        self.complaint_agent = ComplaintAgent(openai_api_key)
-        self.information_agent = InformationAgent(openai_api_key)
+        self.router_agent = RouterAgent(openai_api_key, llm_registry=self.llm_registry)
+        self.booking_agent = BookingAgent(openai_api_key, llm_registry=self.llm_registry)
+        self.complaint_agent = ComplaintAgent(openai_api_key, llm_registry=self.llm_registry)
+        self.information_agent = InformationAgent(
+            openai_api_key,
+            response_cache=create_response_cache(openai_api_key),
+            llm_registry=self.llm_registry
+        )
+
+        self.context_manager = create_context_manager()
 
         self.graph = self._build_graph()
 
@@ -38,11 +52,13 @@ class TravelMultiAgentGraph:
         # Create the state graph
         workflow = StateGraph(TravelAgentState)
 
-        # Add nodes (agents will be added here)
-        workflow.add_node("router", self._router_agent)
-        workflow.add_node("booking_agent", self._booking_agent)
-        workflow.add_node("complaint_agent", self._complaint_agent)
-        workflow.add_node("information_agent", self._information_agent)
+        # Add nodes (agents will be added here). Each agent node carries both
+        # a sync and an async implementation so the same compiled graph serves
+        # invoke() and ainvoke().
+        workflow.add_node("router", RunnableLambda(self._router_agent, afunc=self._arouter_agent))
+        workflow.add_node("booking_agent", RunnableLambda(self._booking_agent, afunc=self._abooking_agent))
+        workflow.add_node("complaint_agent", RunnableLambda(self._complaint_agent, afunc=self._acomplaint_agent))
+        workflow.add_node("information_agent", RunnableLambda(self._information_agent, afunc=self._ainformation_agent))
         workflow.add_node("final_response", self._final_response_agent)
 
         # Add edges
@@ -108,10 +124,27 @@ class TravelMultiAgentGraph:
         """Information agent for providing travel info"""
         return self.information_agent.provide_information(state)
 
+    async def _arouter_agent(self, state: TravelAgentState) -> TravelAgentState:
+        """Async router agent"""
+        return await self.router_agent.aroute_query(state)
+
+    async def _abooking_agent(self, state: TravelAgentState) -> TravelAgentState:
+        """Async booking agent"""
+        return await self.booking_agent.aprocess_booking_request(state)
+
+    async def _acomplaint_agent(self, state: TravelAgentState) -> TravelAgentState:
+        """Async complaint agent"""
+        return await self.complaint_agent.ahandle_complaint(state)
+
+    async def _ainformation_agent(self, state: TravelAgentState) -> TravelAgentState:
+        """Async information agent"""
+        return await self.information_agent.aprovide_information(state)
+
     def _final_response_agent(self, state: TravelAgentState) -> TravelAgentState:
         """Final response compilation"""
-        # Compile all agent responses into a final answer
-        responses = [msg["content"] for msg in state["messages"] if msg["role"] == "agent"]
+        # Compile this turn's agent responses into a final answer
+        turn_messages = state["messages"][state.get("turn_start", 0):]
+        responses = [msg["content"] for msg in turn_messages if msg["role"] == "agent"]
 
         final_response = f"Final Response: {' '.join(responses[-3:])}"  # Last 3 responses
 
@@ -122,18 +155,13 @@ class TravelMultiAgentGraph:
         )
 
     def _route_to_agent(self, state: TravelAgentState) -> str:
-        """Determine which agent to route to based on query analysis"""
-        query = state["current_query"].lower()
-
-        # Simple keyword-based routing (will be improved with LLM)
-        if any(word in query for word in ["book", "reserve", "booking", "flight", "hotel"]):
-            return "booking"
-        elif any(word in query for word in ["complaint", "problem", "issue", "cancel", "refund"]):
-            return "complaint"
-        elif any(word in query for word in ["information", "recommend", "suggest", "where", "how"]):
-            return "information"
-        else:
-            return "complete"  # Default to complete if unsure
+        """Send the query to the agent chosen by the router"""
+        # The router has already classified the query (keyword tier or LLM),
+        # so reuse its decision instead of re-matching keywords here
+        agent = state.get("current_agent")
+        if agent in ("booking", "complaint", "information"):
+            return agent
+        return "complete"  # Default to complete if unsure
 
     def _agent_continue_or_complete(self, state: TravelAgentState) -> str:
         """Determine if agent should continue processing or complete"""
@@ -141,14 +169,70 @@ class TravelMultiAgentGraph:
         # This can be made more sophisticated based on agent responses
         return "complete"
 
-    def process_query(self, query: str, session_id: str = None) -> TravelAgentState:
-        """Process a customer query through the multi-agent system"""
-        initial_state = create_initial_state(query, session_id)
+    def _prepare_state(self, query: str, session_id: str = None, previous_state: TravelAgentState = None) -> TravelAgentState:
+        """Start a new conversation or continue a previous one with a new query"""
+        if previous_state is None:
+            state = create_initial_state(query, session_id)
+        else:
+            # Keeps a bounded window of history plus a running summary
+            state = self.context_manager.start_turn(previous_state, query)
 
         # Add the user message
-        state_with_user_msg = add_message_to_state(initial_state, "user", query)
+        return add_message_to_state(state, "user", query)
+
+    def _finish_state(self, state: TravelAgentState) -> TravelAgentState:
+        """Record the context size for the session"""
+        return update_state_field(state, "context_tokens", self.context_manager.count_tokens(state))
+
+    def process_query(self, query: str, session_id: str = None, previous_state: TravelAgentState = None) -> TravelAgentState:
+        """Process a customer query through the multi-agent system"""
+        state_with_user_msg = self._prepare_state(query, session_id, previous_state)
 
         # Run the graph
         final_state = self.graph.invoke(state_with_user_msg)
 
-        return final_state
\ No newline at end of file
+        return self._finish_state(final_state)
+
+    async def aprocess_query(self, query: str, session_id: str = None, previous_state: TravelAgentState = None) -> TravelAgentState:
+        """Process a customer query without blocking the event loop"""
+        state_with_user_msg = self._prepare_state(query, session_id, previous_state)
+
+        # Every LLM round-trip inside the graph is awaited via ainvoke
+        final_state = await self.graph.ainvoke(state_with_user_msg)
+
+        return self._finish_state(final_state)
+
+    async def astream_query(self, query: str, session_id: str = None, previous_state: TravelAgentState = None) -> AsyncIterator[Dict[str, Any]]:
+        """Process a query and yield progress events as they happen
+
+        Yields dicts with an "event" key:
+        - route: the router's decision, as soon as the router node finishes
+        - token: a chunk of customer-facing LLM text from a specialist agent
+        - agent_message: the full reply an agent added to the conversation
+        - complete: the final state, always the last event
+        """
+        state_with_user_msg = self._prepare_state(query, session_id, previous_state)
+        specialist_nodes = ("booking_agent", "complaint_agent", "information_agent")
+
+        async for event in self.graph.astream_events(state_with_user_msg, version="v2"):
+            kind = event["event"]
+            node = event.get("metadata", {}).get("langgraph_node")
+
+            if kind == "on_chat_model_stream" and STREAM_TOKENS_TAG in event.get("tags", []):
+                content = event["data"]["chunk"].content
+                if content:
+                    yield {"event": "token", "agent": node, "content": content}
+
+            elif kind == "on_chain_end" and node is not None and event["name"] == node:
+                output = event["data"].get("output") or {}
+                if node == "router":
+                    yield {
+                        "event": "route",
+                        "agent": output.get("current_agent"),
+                        "content": output["messages"][-1]["content"] if output.get("messages") else None
+                    }
+                elif node in specialist_nodes and output.get("messages"):
+                    yield {"event": "agent_message", "agent": node, "content": output["messages"][-1]["content"]}
+
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                yield {"event": "complete", "state": self._finish_state(event["data"]["output"])}
\ No newline at end of file
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Load test for the async /chat execution path.
+
+Runs the multi-agent graph against a stubbed LLM with a fixed per-call
+latency, first through the blocking process_query (what /chat used to do)
+and then through aprocess_query at increasing concurrency levels.
+
+Usage: python load_test.py [--requests 200] [--latency 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from graph import TravelMultiAgentGraph
+
+
+STUB_RESPONSE = json.dumps({
+    "agent": "information",
+    "confidence": 0.9,
+    "reasoning": "Stubbed routing decision",
+    "query_type": "destination_info",
+    "destination": "Paris",
+    "timeframe": "spring",
+    "interests": ["culture"]
+})
+
+
+class StubChatModel(BaseChatModel):
+    """Chat model that sleeps for a fixed latency and returns a canned reply"""
+
+    latency: float = 0.2
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=STUB_RESPONSE))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=STUB_RESPONSE))])
+
+
+def build_stubbed_graph(latency: float) -> TravelMultiAgentGraph:
+    """Build the real graph and swap every agent's LLM for the stub"""
+    graph = TravelMultiAgentGraph(openai_api_key="stub-key")
+    stub = StubChatModel(latency=latency)
+    for agent in (graph.router_agent, graph.booking_agent, graph.complaint_agent, graph.information_agent):
+        agent.llm = stub
+    # Every request should pay for its LLM calls, so keep the cache out of it
+    graph.information_agent.response_cache = None
+    return graph
+
+
+async def run_blocking(graph: TravelMultiAgentGraph, total: int) -> float:
+    """Fire requests the way the old /chat did: sync call inside a coroutine"""
+
+    async def handler(i: int):
+        return graph.process_query(f"How should I spend a week in Paris? #{i}", f"sync_{i}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(i) for i in range(total)))
+    return time.perf_counter() - start
+
+
+async def run_async(graph: TravelMultiAgentGraph, total: int, concurrency: int) -> float:
+    """Fire requests through aprocess_query with a bounded number in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def handler(i: int):
+        async with semaphore:
+            return await graph.aprocess_query(f"How should I spend a week in Paris? #{i}", f"async_{i}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(i) for i in range(total)))
+    return time.perf_counter() - start
+
+
+async def main(total: int, latency: float) -> None:
+    graph = build_stubbed_graph(latency)
+
+    # Keep the blocking run short: it is strictly serial
+    blocking_total = min(total, 10)
+    elapsed = await run_blocking(graph, blocking_total)
+    print(f"{'mode':<10} {'concurrency':>11} {'requests':>9} {'elapsed_s':>10} {'req/s':>8}")
+    print(f"{'blocking':<10} {1:>11} {blocking_total:>9} {elapsed:>10.2f} {blocking_total / elapsed:>8.1f}")
+
+    for concurrency in (1, 10, 50, 100, 200):
+        if concurrency > total:
+            break
+        elapsed = await run_async(graph, total, concurrency)
+        print(f"{'async':<10} {concurrency:>11} {total:>9} {elapsed:>10.2f} {total / elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the async chat path against a stubbed LLM")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per async run")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stubbed LLM latency in seconds")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.latency))
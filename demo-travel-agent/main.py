@@ -6,16 +6,21 @@ Main application entry point with FastAPI interface
 
 import os
 import uvicorn
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 import asyncio
+import json
+import uuid
 from dotenv import load_dotenv
 
 from graph import TravelMultiAgentGraph
 from models.state import TravelAgentState, ConversationMessage
+from utils.session_store import create_session_store
+from utils.error_handling import ErrorRecovery
 
 # Load environment variables
 load_dotenv()
@@ -57,11 +62,14 @@ class ChatResponse(BaseModel):
     agent_used: Optional[str] = Field(None, description="Which agent handled the request")
     is_complete: bool = Field(..., description="Whether the conversation is complete")
     booking_info: Optional[Dict[str, Any]] = Field(None, description="Current booking information")
+    context_tokens: Optional[int] = Field(None, description="Estimated tokens in the session context")
 
 
 class ConversationHistory(BaseModel):
     session_id: str
     messages: List[Dict[str, Any]]
+    summary: str = ""
+    context_tokens: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -70,71 +78,158 @@ class HealthResponse(BaseModel):
     status: str = "healthy"
     timestamp: datetime
     version: str = "1.0.0"
+    circuit_breakers: Dict[str, Dict[str, Any]] = Field(default_factory=dict, description="Circuit breaker state per upstream service")
+    retry_budget: Dict[str, Any] = Field(default_factory=dict, description="Retries used against the retry budget")
 
 
-# In-memory storage for conversation sessions (in production, use a database)
-conversation_store: Dict[str, TravelAgentState] = {}
+# Conversation session storage, in-memory LRU by default or SQLite when
+# SESSION_STORE=sqlite (see utils/session_store.py)
+session_store = create_session_store()
 
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint
+
+    Reports "degraded" while any upstream circuit breaker is not closed.
+    """
+    circuit_breakers = ErrorRecovery.circuit_states()
+    degraded = any(breaker["state"] != "closed" for breaker in circuit_breakers.values())
     return HealthResponse(
-        status="healthy",
+        status="degraded" if degraded else "healthy",
         timestamp=datetime.now(),
-        version="1.0.0"
+        version="1.0.0",
+        circuit_breakers=circuit_breakers,
+        retry_budget=ErrorRecovery.retry_budget.snapshot()
+    )
+
+
+@app.get("/metrics/routing")
+async def routing_metrics():
+    """Routing tier hit rates and LLM latency saved by the keyword tier"""
+    return {
+        "keyword_confidence_threshold": graph.router_agent.keyword_confidence_threshold,
+        **graph.router_agent.stats.snapshot()
+    }
+
+
+@app.get("/metrics/cache")
+async def cache_metrics():
+    """Hit and miss counters for the information agent response cache"""
+    cache = graph.information_agent.response_cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.get("/metrics/llm")
+async def llm_metrics():
+    """Shared LLM client pool usage"""
+    return graph.llm_registry.stats()
+
+
+async def resolve_session(session_id: Optional[str]):
+    """Return (session_id, previous_state), creating a new session id if needed"""
+    # Store calls may block on SQLite I/O, so they run in a worker thread
+    previous_state = await asyncio.to_thread(session_store.get, session_id) if session_id else None
+    if previous_state is None:
+        # Concurrent requests can arrive within the same second, so the
+        # timestamp alone is not unique
+        session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    return session_id, previous_state
+
+
+def build_chat_response(session_id: str, result_state: TravelAgentState) -> ChatResponse:
+    """Build the API response from the final graph state"""
+
+    # Extract the latest agent response
+    latest_agent_message = next(
+        (msg for msg in reversed(result_state["messages"]) if msg["role"] == "agent"),
+        None
+    )
+    latest_response = latest_agent_message["content"] if latest_agent_message else "I'm sorry, I couldn't process your request."
+
+    # Determine which agent was used
+    agent_used = result_state.get("current_agent")
+
+    return ChatResponse(
+        response=latest_response,
+        session_id=session_id,
+        agent_used=agent_used,
+        is_complete=result_state["is_complete"],
+        booking_info=result_state["booking_info"] if result_state["booking_info"]["destination"] else None,
+        context_tokens=result_state.get("context_tokens")
     )
 
 
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
 @app.post("/chat", response_model=ChatResponse)
-async def chat_with_agent(request: ChatRequest, background_tasks: BackgroundTasks):
+async def chat_with_agent(request: ChatRequest):
     """Main chat endpoint for customer interactions"""
 
     try:
         # Get or create session
-        session_id = request.session_id
-        if not session_id or session_id not in conversation_store:
-            session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            conversation_store[session_id] = None
-
-        # Process the query through the multi-agent system
-        result_state = graph.process_query(request.message, session_id)
-
-        # Store the updated state
-        conversation_store[session_id] = result_state
+        session_id, previous_state = await resolve_session(request.session_id)
 
-        # Extract the latest agent response
-        agent_messages = [msg for msg in result_state["messages"] if msg["role"] == "agent"]
-        latest_response = agent_messages[-1]["content"] if agent_messages else "I'm sorry, I couldn't process your request."
+        # Process the query through the multi-agent system without blocking
+        # the event loop, so other sessions keep being served meanwhile
+        result_state = await graph.aprocess_query(request.message, session_id, previous_state)
 
-        # Determine which agent was used
-        agent_used = result_state.get("current_agent")
+        # Store the updated state (the store handles TTL and size eviction)
+        await asyncio.to_thread(session_store.put, session_id, result_state)
 
-        # Clean up old sessions (keep last 100, remove sessions older than 24 hours)
-        background_tasks.add_task(cleanup_old_sessions)
-
-        return ChatResponse(
-            response=latest_response,
-            session_id=session_id,
-            agent_used=agent_used,
-            is_complete=result_state["is_complete"],
-            booking_info=result_state["booking_info"] if result_state["booking_info"]["destination"] else None
-        )
+        return build_chat_response(session_id, result_state)
 
     except Exception as e:
         print(f"Error processing chat request: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@app.post("/chat/stream")
+async def chat_with_agent_stream(request: ChatRequest):
+    """Streaming chat endpoint (Server-Sent Events)
+
+    Emits a "session" event first, then "route" as soon as the router has
+    decided, "token" events with agent text as it is generated, and
+    "agent_message" with each full agent reply. The last event is
+    "response", carrying the same payload as /chat, or "error".
+    """
+
+    session_id, previous_state = await resolve_session(request.session_id)
+
+    async def event_stream():
+        yield sse_event("session", {"session_id": session_id})
+        try:
+            async for event in graph.astream_query(request.message, session_id, previous_state):
+                if event["event"] == "complete":
+                    result_state = event["state"]
+                    await asyncio.to_thread(session_store.put, session_id, result_state)
+                    yield sse_event("response", build_chat_response(session_id, result_state).model_dump(mode="json"))
+                else:
+                    yield sse_event(event["event"], {key: value for key, value in event.items() if key != "event"})
+        except Exception as e:
+            print(f"Error processing streaming chat request: {e}")
+            yield sse_event("error", {"detail": f"Internal server error: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/conversation/{session_id}", response_model=ConversationHistory)
 async def get_conversation_history(session_id: str):
     """Get conversation history for a session"""
 
-    if session_id not in conversation_store:
+    state = await asyncio.to_thread(session_store.get, session_id)
+    if state is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    state = conversation_store[session_id]
-
     return ConversationHistory(
         session_id=session_id,
         messages=[
@@ -146,6 +241,8 @@ async def get_conversation_history(session_id: str):
             }
             for msg in state["messages"]
         ],
+        summary=state.get("context_summary", ""),
+        context_tokens=state.get("context_tokens", 0),
         created_at=state["created_at"],
         updated_at=state["updated_at"]
     )
@@ -155,55 +252,28 @@ async def get_conversation_history(session_id: str):
 async def delete_conversation(session_id: str):
     """Delete a conversation session"""
 
-    if session_id not in conversation_store:
+    if not await asyncio.to_thread(session_store.delete, session_id):
         raise HTTPException(status_code=404, detail="Session not found")
 
-    del conversation_store[session_id]
     return {"message": "Conversation deleted successfully"}
 
 
 @app.get("/sessions")
-async def list_sessions():
-    """List all active sessions (for debugging/admin purposes)"""
-
-    sessions = []
-    for session_id, state in conversation_store.items():
-        if state:
-            sessions.append({
-                "session_id": session_id,
-                "message_count": len(state["messages"]),
-                "current_agent": state.get("current_agent"),
-                "is_complete": state["is_complete"],
-                "created_at": state["created_at"],
-                "last_updated": state["updated_at"]
-            })
-
-    return {"sessions": sessions, "total": len(sessions)}
-
-
-async def cleanup_old_sessions():
-    """Background task to clean up old conversation sessions"""
-    current_time = datetime.now()
-    sessions_to_remove = []
-
-    for session_id, state in conversation_store.items():
-        if state and (current_time - state["updated_at"]).total_seconds() > 24 * 3600:  # 24 hours
-            sessions_to_remove.append(session_id)
-
-    for session_id in sessions_to_remove:
-        del conversation_store[session_id]
-
-    # Keep only the most recent 100 sessions
-    if len(conversation_store) > 100:
-        # Sort by last updated time and keep the newest 100
-        sorted_sessions = sorted(
-            conversation_store.items(),
-            key=lambda x: x[1]["updated_at"] if x[1] else datetime.min,
-            reverse=True
-        )
-        conversation_store.clear()
-        for session_id, state in sorted_sessions[:100]:
-            conversation_store[session_id] = state
+async def list_sessions(
+    offset: int = Query(0, ge=0, description="Number of sessions to skip"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of sessions to return")
+):
+    """List active sessions one page at a time (for debugging/admin purposes)"""
+
+    sessions = await asyncio.to_thread(session_store.list_sessions, offset=offset, limit=limit)
+    total = await asyncio.to_thread(session_store.count)
+
+    return {
+        "sessions": sessions,
+        "total": total,
+        "offset": offset,
+        "limit": limit
+    }
 
 
 @app.on_event("startup")
@@ -218,7 +288,8 @@ async def startup_event():
 async def shutdown_event():
     """Application shutdown tasks"""
     print("🛑 Shutting down Travel Customer Management System...")
-    conversation_store.clear()
+    session_store.close()
+    await graph.llm_registry.aclose()
     print("✅ Shutdown complete")
 
 
@@ -1,8 +1,10 @@
 from .state import TravelAgentState, CustomerInfo, TravelBooking, ConversationMessage
+from .message_log import MessageLog
 
 __all__ = [
     "TravelAgentState",
     "CustomerInfo",
     "TravelBooking",
-    "ConversationMessage"
+    "ConversationMessage",
+    "MessageLog"
 ]
\ No newline at end of file
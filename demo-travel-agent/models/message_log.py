@@ -0,0 +1,83 @@
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+import threading
+
+# Kept independent of models.state (which imports this module); messages
+# are ConversationMessage dicts
+ConversationMessage = Dict[str, Any]
+
+
+class MessageLog(Sequence):
+    """Immutable, append-only conversation history with structural sharing
+
+    Every version of the log is a (backing list, length) view over the same
+    shared list. Appending to the newest version pushes onto the backing list
+    and returns a longer view, which is O(1) instead of copying the whole
+    history the way ``messages + [new_message]`` does. Older versions keep
+    seeing exactly their own prefix. Appending to an older version (a branch)
+    falls back to copying that prefix.
+    """
+
+    __slots__ = ("_items", "_lock", "_length")
+
+    def __init__(self, messages: Iterable[ConversationMessage] = ()):
+        self._items: List[ConversationMessage] = list(messages)
+        self._lock = threading.Lock()
+        self._length = len(self._items)
+
+    @classmethod
+    def _view(cls, items: List[ConversationMessage], lock: threading.Lock, length: int) -> "MessageLog":
+        log = cls.__new__(cls)
+        log._items = items
+        log._lock = lock
+        log._length = length
+        return log
+
+    def append(self, message: ConversationMessage) -> "MessageLog":
+        """Return a new log with message added at the end"""
+        with self._lock:
+            if len(self._items) == self._length:
+                self._items.append(message)
+                return self._view(self._items, self._lock, self._length + 1)
+        return MessageLog(self._items[:self._length] + [message])
+
+    def extend(self, messages: Iterable[ConversationMessage]) -> "MessageLog":
+        """Return a new log with messages added at the end"""
+        log = self
+        for message in messages:
+            log = log.append(message)
+        return log
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            # Only touch the requested range so state["messages"][-3:] stays O(k)
+            return [self._items[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("MessageLog index out of range")
+        return self._items[index]
+
+    def __iter__(self) -> Iterator[ConversationMessage]:
+        for i in range(self._length):
+            yield self._items[i]
+
+    def __reversed__(self) -> Iterator[ConversationMessage]:
+        for i in range(self._length - 1, -1, -1):
+            yield self._items[i]
+
+    def __add__(self, other: Iterable[ConversationMessage]) -> "MessageLog":
+        return self.extend(other)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (MessageLog, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __reduce__(self):
+        return (MessageLog, (list(self),))
+
+    def __repr__(self) -> str:
+        return f"MessageLog({list(self)!r})"
@@ -1,6 +1,8 @@
 from typing import List, Optional, Dict, Any, TypedDict
 from datetime import datetime
 
+from .message_log import MessageLog
+
 
 class CustomerInfo(TypedDict):
     """Customer information structure"""
@@ -35,8 +37,13 @@ class TravelAgentState(TypedDict):
     # Customer information
     customer_info: CustomerInfo
 
-    # Current conversation
-    messages: List[ConversationMessage]
+    # Current conversation (append-only, see MessageLog). Only the most
+    # recent messages are kept; older ones are folded into context_summary
+    messages: MessageLog
+    context_summary: str
+    summarized_messages: int
+    context_tokens: int
+    turn_start: int  # index in messages where the current turn begins
 
     # Current query and context
     current_query: str
@@ -16,9 +16,15 @@ from .error_handling import (
     BookingError,
     APIError,
     ConfigurationError,
+    CircuitOpenError,
     handle_agent_errors,
     safe_api_call,
+    asafe_api_call,
     validate_and_sanitize_input,
+    is_transient_error,
+    decorrelated_jitter,
+    CircuitBreaker,
+    RetryBudget,
     ErrorRecovery
 )
 
@@ -28,6 +34,36 @@ from .graph_utils import (
     update_state_field
 )
 
+from .keyword_matcher import KeywordMatcher
+
+from .context_window import (
+    ContextWindowManager,
+    create_context_manager,
+    estimate_tokens,
+    recent_history
+)
+
+from .llm_registry import (
+    ConcurrencyLimiter,
+    LLMRegistry,
+    create_llm_registry
+)
+
+from .response_cache import (
+    CacheKey,
+    ResponseCache,
+    InMemoryResponseCache,
+    SQLiteResponseCache,
+    create_response_cache
+)
+
+from .session_store import (
+    SessionStore,
+    InMemorySessionStore,
+    SQLiteSessionStore,
+    create_session_store
+)
+
 __all__ = [
     # Validation functions
     "validate_email",
@@ -46,8 +82,41 @@ __all__ = [
     "BookingError",
     "APIError",
     "ConfigurationError",
+    "CircuitOpenError",
     "handle_agent_errors",
     "safe_api_call",
+    "asafe_api_call",
     "validate_and_sanitize_input",
-    "ErrorRecovery"
+    "is_transient_error",
+    "decorrelated_jitter",
+    "CircuitBreaker",
+    "RetryBudget",
+    "ErrorRecovery",
+
+    # Conversation context
+    "ContextWindowManager",
+    "create_context_manager",
+    "estimate_tokens",
+    "recent_history",
+
+    # Keyword matching
+    "KeywordMatcher",
+
+    # Shared LLM clients
+    "ConcurrencyLimiter",
+    "LLMRegistry",
+    "create_llm_registry",
+
+    # Response caching
+    "CacheKey",
+    "ResponseCache",
+    "InMemoryResponseCache",
+    "SQLiteResponseCache",
+    "create_response_cache",
+
+    # Session storage
+    "SessionStore",
+    "InMemorySessionStore",
+    "SQLiteSessionStore",
+    "create_session_store"
 ]
\ No newline at end of file
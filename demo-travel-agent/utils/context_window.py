@@ -0,0 +1,128 @@
+"""
+Bounded conversation context for long-running sessions
+
+Each session keeps only the most recent messages verbatim. Older messages
+are folded into a running summary as they leave the window, and the
+summary itself is trimmed to a token budget, so memory per session and
+the context agents see stay flat however long the conversation runs.
+"""
+
+from typing import Callable, List, Optional
+import os
+
+from models.state import TravelAgentState, ConversationMessage
+from models.message_log import MessageLog
+from .graph_utils import update_state_field
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token for English)"""
+    return (len(text) + 3) // 4 if text else 0
+
+
+def digest_message(message: ConversationMessage, max_chars: int = 200) -> Optional[str]:
+    """One summary line for a message, or None if it adds nothing"""
+    # Router notes and compiled final responses repeat other messages
+    if message.get("agent_name") in ("router", "final_response"):
+        return None
+
+    speaker = "Customer" if message["role"] == "user" else (message.get("agent_name") or message["role"])
+    content = " ".join(message["content"].split())
+    if len(content) > max_chars:
+        content = content[:max_chars].rstrip() + "..."
+    return f"{speaker}: {content}"
+
+
+class ContextWindowManager:
+    """Keeps a fixed window of recent messages plus a running summary"""
+
+    def __init__(self, window_size: int = 12, summary_token_budget: int = 400,
+                 digest_chars: int = 200,
+                 summarizer: Optional[Callable[[str, List[ConversationMessage]], str]] = None):
+        """
+        Args:
+            window_size: number of recent messages kept verbatim
+            summary_token_budget: maximum estimated tokens in the running summary
+            digest_chars: per-message character limit for the default summarizer
+            summarizer: optional (summary, evicted messages) -> new summary
+                function, e.g. an LLM call; the result is still trimmed to budget
+        """
+        self.window_size = window_size
+        self.summary_token_budget = summary_token_budget
+        self.digest_chars = digest_chars
+        self.summarizer = summarizer
+
+    def start_turn(self, previous_state: TravelAgentState, query: str) -> TravelAgentState:
+        """Continue a session with a new query, compacting its history first"""
+        state = self.compact(previous_state)
+
+        state = state.copy()
+        state.update({
+            "current_query": query,
+            "query_type": None,
+            "current_agent": None,
+            "agent_responses": {},
+            "is_complete": False,
+            "error_message": None,
+            "turn_start": len(state["messages"])
+        })
+        return state
+
+    def compact(self, state: TravelAgentState) -> TravelAgentState:
+        """Fold messages that fall outside the window into the summary"""
+        messages = state["messages"]
+        overflow = len(messages) - self.window_size
+        if overflow <= 0:
+            return state
+
+        evicted = messages[:overflow]
+        summary = state.get("context_summary", "")
+
+        if self.summarizer is not None:
+            summary = self.summarizer(summary, evicted)
+        else:
+            lines = [digest_message(message, self.digest_chars) for message in evicted]
+            new_lines = "\n".join(line for line in lines if line)
+            summary = f"{summary}\n{new_lines}".strip() if new_lines else summary
+
+        state = update_state_field(state, "context_summary", self._trim_summary(summary))
+        state = update_state_field(state, "summarized_messages", state.get("summarized_messages", 0) + overflow)
+        return update_state_field(state, "messages", MessageLog(messages[overflow:]))
+
+    def _trim_summary(self, summary: str) -> str:
+        """Drop the oldest summary lines until the summary fits the budget"""
+        lines = summary.split("\n")
+        total = sum(estimate_tokens(line) for line in lines)
+        start = 0
+        while total > self.summary_token_budget and start < len(lines) - 1:
+            total -= estimate_tokens(lines[start])
+            start += 1
+        summary = "\n".join(lines[start:])
+
+        # A single oversized line is cut down to the budget
+        max_chars = self.summary_token_budget * 4
+        return summary[-max_chars:] if len(summary) > max_chars else summary
+
+    def count_tokens(self, state: TravelAgentState) -> int:
+        """Estimated tokens in the context an agent sees for this session"""
+        return estimate_tokens(state.get("context_summary", "")) + sum(
+            estimate_tokens(message["content"]) for message in state["messages"]
+        )
+
+
+def recent_history(state: TravelAgentState, count: int) -> List[str]:
+    """The running summary (if any) followed by the contents of the last messages"""
+    history = [f"Earlier in this conversation:\n{state['context_summary']}"] if state.get("context_summary") else []
+    return history + [message["content"] for message in state["messages"][-count:]]
+
+
+def create_context_manager() -> ContextWindowManager:
+    """Create the context window manager configured by environment variables
+
+    CONTEXT_WINDOW_MESSAGES: recent messages kept verbatim (default: 12)
+    CONTEXT_SUMMARY_TOKENS: token budget for the running summary (default: 400)
+    """
+    return ContextWindowManager(
+        window_size=int(os.getenv("CONTEXT_WINDOW_MESSAGES", 12)),
+        summary_token_budget=int(os.getenv("CONTEXT_SUMMARY_TOKENS", 400))
+    )
@@ -2,9 +2,15 @@
 Error handling utilities for the Travel Customer Management System
 """
 
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, Optional, Callable, Awaitable, Deque
+from collections import deque
 from functools import wraps
+import asyncio
 import logging
+import os
+import random
+import threading
+import time
 import traceback
 from datetime import datetime
 
@@ -66,6 +72,13 @@ class APIError(TravelAgentError):
         )
 
 
+class CircuitOpenError(APIError):
+    """Raised without calling the service while its circuit breaker is open"""
+    def __init__(self, service: str, retry_after: float):
+        super().__init__(f"{service} is unavailable (circuit open)", service=service)
+        self.details["retry_after"] = round(retry_after, 1)
+
+
 class ConfigurationError(TravelAgentError):
     """Configuration-related errors"""
     def __init__(self, message: str, config_key: str = None):
@@ -180,9 +193,32 @@ def _handle_unexpected_error(error: Exception, state: Any = None) -> Any:
 
 
 def safe_api_call(func: Callable, *args, service_name: str = "external service", **kwargs) -> Any:
-    """Safely call external API functions with error handling"""
+    """Safely call external API functions with error handling
+
+    Fails fast with CircuitOpenError while the service's breaker is open.
+    """
     try:
-        return func(*args, **kwargs)
+        return ErrorRecovery.call_with_breaker(lambda: func(*args, **kwargs), service_name)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        logger.error(f"API call to {service_name} failed: {e}")
+        raise APIError(
+            f"Failed to connect to {service_name}",
+            service=service_name
+        ) from e
+
+
+async def asafe_api_call(func: Callable[..., Awaitable[Any]], *args, service_name: str = "external service", **kwargs) -> Any:
+    """Async version of safe_api_call that also retries transient failures
+
+    Retries use decorrelated-jitter backoff with non-blocking sleeps, draw
+    on the shared retry budget and go through the service's circuit breaker.
+    """
+    try:
+        return await ErrorRecovery.aretry_with_backoff(lambda: func(*args, **kwargs), service_name=service_name)
+    except CircuitOpenError:
+        raise
     except Exception as e:
         logger.error(f"API call to {service_name} failed: {e}")
         raise APIError(
@@ -214,24 +250,308 @@ def validate_and_sanitize_input(input_data: Dict[str, Any]) -> Dict[str, Any]:
     return sanitized
 
 
-class ErrorRecovery:
-    """Error recovery strategies"""
+def is_transient_error(error: BaseException) -> bool:
+    """Whether an error is worth retrying: timeouts, dropped connections,
+    rate limits and 5xx responses, but not bad requests or auth failures"""
+    if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    if status_code is not None:
+        return status_code in (408, 409, 429) or status_code >= 500
+    # Client libraries name their network errors consistently
+    # (httpx.ConnectError, openai.APIConnectionError, APITimeoutError, ...)
+    names = [cls.__name__ for cls in type(error).__mro__]
+    return any(("Connect" in name or "Timeout" in name or name == "TransportError") for name in names)
+
+
+class CircuitBreaker:
+    """Per-service circuit breaker
+
+    closed: calls go through; consecutive transient failures are counted.
+    open: after failure_threshold failures, calls fail fast with
+        CircuitOpenError for recovery_timeout seconds.
+    half_open: one trial call is let through; success closes the circuit,
+        failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, service: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.service = service
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == self.OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now"""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self.rejected += 1
+            retry_after = max(0.0, self.recovery_timeout - (now - self._opened_at))
+        raise CircuitOpenError(self.service, retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit for {self.service} closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self, error: BaseException) -> None:
+        # Only upstream trouble counts; a bad request says nothing about health
+        if not is_transient_error(error):
+            with self._lock:
+                self._trial_in_flight = False
+            return
+
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuit for {self.service} opened after {self._failures} failures: {error}")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "rejected": self.rejected,
+                "retry_after": round(max(0.0, self.recovery_timeout - (now - self._opened_at)), 1) if state == self.OPEN else 0.0
+            }
+
+
+class RetryBudget:
+    """Caps retries to a fraction of recent requests
+
+    Within a sliding window, retries are allowed while they stay under
+    max(min_retries, ratio * requests). This keeps a struggling upstream from
+    being hit by a multiple of its normal traffic when every caller retries.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10, window_seconds: float = 10.0):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window_seconds = window_seconds
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self._lock = threading.Lock()
+        self.exhausted = 0
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        for events in (self._requests, self._retries):
+            while events and events[0] < cutoff:
+                events.popleft()
+
+    def record_request(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_acquire_retry(self) -> bool:
+        """Take a retry from the budget, returning False if none is left"""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            if len(self._retries) >= max(self.min_retries, self.ratio * len(self._requests)):
+                self.exhausted += 1
+                return False
+            self._retries.append(now)
+            return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._trim(time.monotonic())
+            return {
+                "requests": len(self._requests),
+                "retries": len(self._retries),
+                "ratio": self.ratio,
+                "exhausted": self.exhausted
+            }
+
+
+def decorrelated_jitter(previous_delay: float, base_delay: float, max_delay: float) -> float:
+    """Next backoff delay: random between base and three times the last delay
+
+    Spreads out retries from many callers that failed at the same moment
+    instead of having them all wake up together.
+    """
+    return min(max_delay, random.uniform(base_delay, max(base_delay, previous_delay * 3)))
 
-    @staticmethod
-    def retry_with_backoff(func: Callable, max_retries: int = 3, backoff_factor: float = 2.0):
-        """Retry a function with exponential backoff"""
-        import time
 
+class ErrorRecovery:
+    """Error recovery strategies
+
+    Retry settings come from environment variables:
+    RETRY_MAX_ATTEMPTS (default: 3), RETRY_BASE_DELAY (default: 0.5s),
+    RETRY_MAX_DELAY (default: 8s), RETRY_BUDGET_RATIO (default: 0.2),
+    CIRCUIT_FAILURE_THRESHOLD (default: 5), CIRCUIT_RECOVERY_SECONDS (default: 30)
+    """
+
+    max_attempts = int(os.getenv("RETRY_MAX_ATTEMPTS", 3))
+    base_delay = float(os.getenv("RETRY_BASE_DELAY", 0.5))
+    max_delay = float(os.getenv("RETRY_MAX_DELAY", 8.0))
+    retry_budget = RetryBudget(ratio=float(os.getenv("RETRY_BUDGET_RATIO", 0.2)))
+
+    _breakers: Dict[str, CircuitBreaker] = {}
+    _breakers_lock = threading.Lock()
+
+    @classmethod
+    def circuit_breaker(cls, service_name: str) -> CircuitBreaker:
+        """Return the circuit breaker for a service, creating it on first use"""
+        with cls._breakers_lock:
+            breaker = cls._breakers.get(service_name)
+            if breaker is None:
+                breaker = cls._breakers[service_name] = CircuitBreaker(
+                    service_name,
+                    failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5)),
+                    recovery_timeout=float(os.getenv("CIRCUIT_RECOVERY_SECONDS", 30))
+                )
+            return breaker
+
+    @classmethod
+    def circuit_states(cls) -> Dict[str, Dict[str, Any]]:
+        """Snapshot of every circuit breaker, keyed by service name"""
+        with cls._breakers_lock:
+            breakers = list(cls._breakers.values())
+        return {breaker.service: breaker.snapshot() for breaker in breakers}
+
+    @classmethod
+    def call_with_breaker(cls, func: Callable, service_name: str) -> Any:
+        """Call func once through the service's circuit breaker"""
+        breaker = cls.circuit_breaker(service_name)
+        breaker.before_call()
+        try:
+            result = func()
+        except BaseException as e:
+            # Also on interrupts/cancellation, so a half-open trial is
+            # released; record_failure ignores them otherwise
+            breaker.record_failure(e)
+            raise
+        breaker.record_success()
+        return result
+
+    @classmethod
+    def _next_delay(cls, error: Exception, attempt: int, max_retries: int, delay: float,
+                    base_delay: float, max_delay: float,
+                    retry_on: Callable[[Exception], bool],
+                    breaker: Optional[CircuitBreaker] = None) -> Optional[float]:
+        """Delay before the next attempt, or None if the error should be raised"""
+        if isinstance(error, CircuitOpenError) or attempt == max_retries - 1 or not retry_on(error):
+            return None
+        # This failure opened the circuit: the next attempt would be rejected
+        # anyway, so don't spend a retry token or sleep first
+        if breaker is not None and breaker.state == CircuitBreaker.OPEN:
+            return None
+        if not cls.retry_budget.try_acquire_retry():
+            logger.warning(f"Retry budget exhausted, not retrying: {error}")
+            return None
+        return decorrelated_jitter(delay, base_delay, max_delay)
+
+    @classmethod
+    def retry_with_backoff(cls, func: Callable, max_retries: Optional[int] = None,
+                           backoff_factor: Optional[float] = None, service_name: Optional[str] = None,
+                           max_delay: Optional[float] = None,
+                           retry_on: Callable[[Exception], bool] = is_transient_error):
+        """Retry a function with jittered exponential backoff
+
+        Blocks the calling thread while waiting; use aretry_with_backoff on
+        the event loop. backoff_factor is the base delay in seconds.
+        """
+        max_retries = max_retries or cls.max_attempts
+        base_delay = cls.base_delay if backoff_factor is None else backoff_factor
+        max_delay = cls.max_delay if max_delay is None else max_delay
+        call = (lambda: cls.call_with_breaker(func, service_name)) if service_name else func
+        breaker = cls.circuit_breaker(service_name) if service_name else None
+
+        cls.retry_budget.record_request()
+        delay = base_delay
         for attempt in range(max_retries):
             try:
-                return func()
+                return call()
             except Exception as e:
-                if attempt == max_retries - 1:
-                    raise e
-
-                wait_time = backoff_factor ** attempt
-                logger.warning(f"Attempt {attempt + 1} failed, retrying in {wait_time}s: {e}")
-                time.sleep(wait_time)
+                delay = cls._next_delay(e, attempt, max_retries, delay, base_delay, max_delay, retry_on, breaker)
+                if delay is None:
+                    raise
+
+                logger.warning(f"Attempt {attempt + 1} failed, retrying in {delay:.2f}s: {e}")
+                time.sleep(delay)
+
+    @classmethod
+    async def aretry_with_backoff(cls, func: Callable[[], Awaitable[Any]], max_retries: Optional[int] = None,
+                                  base_delay: Optional[float] = None, service_name: Optional[str] = None,
+                                  max_delay: Optional[float] = None,
+                                  retry_on: Callable[[Exception], bool] = is_transient_error):
+        """Async retry with decorrelated-jitter backoff
+
+        func is called with no arguments and must return a new awaitable
+        each time. Waiting uses asyncio.sleep, so other requests keep being
+        served. With service_name, every attempt goes through that service's
+        circuit breaker and an open circuit fails fast without retrying.
+        """
+        max_retries = max_retries or cls.max_attempts
+        base_delay = cls.base_delay if base_delay is None else base_delay
+        max_delay = cls.max_delay if max_delay is None else max_delay
+        breaker = cls.circuit_breaker(service_name) if service_name else None
+
+        cls.retry_budget.record_request()
+        delay = base_delay
+        for attempt in range(max_retries):
+            try:
+                if breaker is not None:
+                    breaker.before_call()
+                result = await func()
+            except asyncio.CancelledError as e:
+                # Frees a half-open trial slot; cancellation is not a failure
+                if breaker is not None:
+                    breaker.record_failure(e)
+                raise
+            except Exception as e:
+                if breaker is not None and not isinstance(e, CircuitOpenError):
+                    breaker.record_failure(e)
+                delay = cls._next_delay(e, attempt, max_retries, delay, base_delay, max_delay, retry_on, breaker)
+                if delay is None:
+                    raise
+
+                logger.warning(f"Attempt {attempt + 1} failed, retrying in {delay:.2f}s: {e}")
+                await asyncio.sleep(delay)
+            else:
+                if breaker is not None:
+                    breaker.record_success()
+                return result
 
     @staticmethod
     def fallback_response(error: Exception, fallback_message: str = None) -> str:
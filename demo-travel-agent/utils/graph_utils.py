@@ -7,6 +7,12 @@ from datetime import datetime
 import uuid
 
 from models.state import TravelAgentState, ConversationMessage, CustomerInfo, TravelBooking
+from models.message_log import MessageLog
+
+
+# Tag for LLM calls whose tokens are customer-facing text and may be streamed
+# to the client (as opposed to JSON analysis/extraction calls)
+STREAM_TOKENS_TAG = "stream_tokens"
 
 
 def create_initial_state(query: str, session_id: str = None) -> TravelAgentState:
@@ -22,7 +28,11 @@ def create_initial_state(query: str, session_id: str = None) -> TravelAgentState
             phone=None,
             preferences={}
         ),
-        messages=[],
+        messages=MessageLog(),
+        context_summary="",
+        summarized_messages=0,
+        context_tokens=0,
+        turn_start=0,
         current_query=query,
         query_type=None,
         current_agent=None,
@@ -45,7 +55,12 @@ def create_initial_state(query: str, session_id: str = None) -> TravelAgentState
 
 
 def add_message_to_state(state: TravelAgentState, role: str, content: str, agent_name: str = None) -> TravelAgentState:
-    """Add a message to the conversation state"""
+    """Add a message to the conversation state
+
+    The state dict itself is copied shallowly (a fixed number of keys), and
+    the message history is shared with the previous state via MessageLog, so
+    the cost does not grow with the length of the conversation.
+    """
     new_message = ConversationMessage(
         role=role,
         content=content,
@@ -54,7 +69,7 @@ def add_message_to_state(state: TravelAgentState, role: str, content: str, agent
     )
 
     updated_state = state.copy()
-    updated_state["messages"] = state["messages"] + [new_message]
+    updated_state["messages"] = state["messages"].append(new_message)
     updated_state["updated_at"] = datetime.now()
 
     return updated_state
@@ -0,0 +1,87 @@
+"""
+Multi-pattern keyword matching for query classification
+
+KeywordMatcher compiles every keyword list into a single Aho-Corasick
+automaton, so a query is scanned once regardless of how many keywords
+or categories are registered.
+"""
+
+from collections import deque
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over weighted, labelled keywords"""
+
+    def __init__(self, keyword_tables: Dict[str, Dict[str, float]]):
+        """
+        Args:
+            keyword_tables: label -> {keyword: weight}
+        """
+        # Trie as parallel lists: goto transitions, failure links, outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, str, float]]] = [[]]
+
+        for label, keywords in keyword_tables.items():
+            for keyword, weight in keywords.items():
+                self._add(keyword.lower(), label, weight)
+
+        self._build_failure_links()
+
+    def _add(self, keyword: str, label: str, weight: float) -> None:
+        node = 0
+        for char in keyword:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[node][char] = next_node
+            node = next_node
+        self._output[node].append((keyword, label, weight))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find_all(self, text: str) -> Iterable[Tuple[str, str, float]]:
+        """Yield (keyword, label, weight) for every keyword starting on a word boundary"""
+        text = text.lower()
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for keyword, label, weight in self._output[node]:
+                start = index - len(keyword) + 1
+                # Require a word start so "show" does not match "how";
+                # suffixes are allowed so "flights" still matches "flight"
+                if start == 0 or not text[start - 1].isalnum():
+                    yield keyword, label, weight
+
+    def score(self, text: str) -> Dict[str, Dict[str, Any]]:
+        """Sum matched keyword weights per label
+
+        Each distinct keyword counts once, so repeating a word does not
+        inflate the score.
+        """
+        seen = set()
+        scores: Dict[str, Dict[str, Any]] = {}
+        for keyword, label, weight in self.find_all(text):
+            if (keyword, label) in seen:
+                continue
+            seen.add((keyword, label))
+            entry = scores.setdefault(label, {"score": 0.0, "keywords": []})
+            entry["score"] += weight
+            entry["keywords"].append(keyword)
+        return scores
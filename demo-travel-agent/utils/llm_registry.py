@@ -0,0 +1,260 @@
+"""
+Shared LLM clients for all agents
+
+Every agent used to build its own ChatOpenAI, and with it its own HTTP
+client and connection pool, so each agent paid for its own TLS handshakes
+and nothing capped the total number of in-flight upstream requests. The
+registry owns one keep-alive httpx pool (sync and async) that every client
+shares, and a concurrency limiter that every call goes through.
+"""
+
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+import asyncio
+import os
+import threading
+import weakref
+
+import httpx
+from langchain_openai import ChatOpenAI
+from pydantic import PrivateAttr
+
+from .error_handling import ErrorRecovery
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Circuit breaker name for upstream LLM calls
+LLM_SERVICE_NAME = "openai"
+
+# Set while a call holds a slot, so nested calls (e.g. _agenerate delegating
+# to _astream) don't wait on a slot their own caller holds
+_holding_slot: ContextVar[bool] = ContextVar("_holding_slot", default=False)
+
+
+class ConcurrencyLimiter:
+    """Caps concurrent upstream LLM calls
+
+    Sync calls share one threading semaphore. Async calls share an asyncio
+    semaphore per event loop, because asyncio primitives cannot be used
+    across loops.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._sync = threading.BoundedSemaphore(max_concurrency)
+        self._async: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _loop_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._async.get(loop)
+            if semaphore is None:
+                semaphore = self._async[loop] = asyncio.Semaphore(self.max_concurrency)
+            return semaphore
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _exit(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    @contextmanager
+    def hold(self) -> Iterator[None]:
+        if _holding_slot.get():
+            yield
+            return
+        with self._sync:
+            token = _holding_slot.set(True)
+            self._enter()
+            try:
+                yield
+            finally:
+                self._exit()
+                _holding_slot.reset(token)
+
+    @asynccontextmanager
+    async def ahold(self) -> AsyncIterator[None]:
+        if _holding_slot.get():
+            yield
+            return
+        async with self._loop_semaphore():
+            token = _holding_slot.set(True)
+            self._enter()
+            try:
+                yield
+            finally:
+                self._exit()
+                _holding_slot.reset(token)
+
+
+class PooledChatOpenAI(ChatOpenAI):
+    """ChatOpenAI whose calls go through a shared concurrency limiter
+
+    Retries are handled here rather than by the OpenAI SDK (max_retries=0):
+    transient failures are retried with jittered backoff under the shared
+    retry budget, and every attempt goes through the "openai" circuit
+    breaker. The limiter slot is released while waiting between attempts.
+    """
+
+    _limiter: Optional[ConcurrencyLimiter] = PrivateAttr(default=None)
+
+    def _limited_generate(self, *args: Any, **kwargs: Any):
+        with self._limiter.hold():
+            return super()._generate(*args, **kwargs)
+
+    async def _limited_agenerate(self, *args: Any, **kwargs: Any):
+        async with self._limiter.ahold():
+            return await super()._agenerate(*args, **kwargs)
+
+    def _generate(self, *args: Any, **kwargs: Any):
+        if _holding_slot.get():
+            return super()._generate(*args, **kwargs)
+        return ErrorRecovery.retry_with_backoff(
+            lambda: self._limited_generate(*args, **kwargs), service_name=LLM_SERVICE_NAME
+        )
+
+    async def _agenerate(self, *args: Any, **kwargs: Any):
+        if _holding_slot.get():
+            return await super()._agenerate(*args, **kwargs)
+        return await ErrorRecovery.aretry_with_backoff(
+            lambda: self._limited_agenerate(*args, **kwargs), service_name=LLM_SERVICE_NAME
+        )
+
+    def _stream(self, *args: Any, **kwargs: Any):
+        # Streams go through the breaker but are not retried; a retry after
+        # tokens were already emitted would duplicate them
+        with self._limiter.hold():
+            breaker = ErrorRecovery.circuit_breaker(LLM_SERVICE_NAME)
+            breaker.before_call()
+            try:
+                yield from super()._stream(*args, **kwargs)
+            except BaseException as e:
+                breaker.record_failure(e)
+                raise
+            breaker.record_success()
+
+    async def _astream(self, *args: Any, **kwargs: Any):
+        async with self._limiter.ahold():
+            breaker = ErrorRecovery.circuit_breaker(LLM_SERVICE_NAME)
+            breaker.before_call()
+            try:
+                async for chunk in super()._astream(*args, **kwargs):
+                    yield chunk
+            except BaseException as e:
+                breaker.record_failure(e)
+                raise
+            breaker.record_success()
+
+
+class LLMRegistry:
+    """Hands out chat models that share one HTTP pool and one limiter
+
+    Agents ask for their model by name with their default temperature;
+    per-agent overrides (model and/or temperature) take precedence. Agents
+    that end up with the same settings share one client instance.
+    """
+
+    def __init__(self, openai_api_key: str, default_model: str = DEFAULT_MODEL,
+                 max_concurrency: int = 16, max_connections: int = 32,
+                 keepalive_expiry: float = 60.0, timeout: float = 60.0,
+                 overrides: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Args:
+            openai_api_key: API key for every client
+            default_model: model used unless an agent override names another
+            max_concurrency: maximum in-flight LLM calls across all agents
+            max_connections: size of the shared HTTP connection pool
+            keepalive_expiry: seconds an idle pooled connection is kept open
+            timeout: HTTP timeout for each request
+            overrides: agent name -> {"model": ..., "temperature": ...}
+        """
+        self.openai_api_key = openai_api_key
+        self.default_model = default_model
+        self.overrides = overrides or {}
+        self.limiter = ConcurrencyLimiter(max_concurrency)
+
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http_client = httpx.Client(limits=limits, timeout=timeout)
+        self.http_async_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+
+        self._clients: Dict[Tuple[str, float], PooledChatOpenAI] = {}
+        self._lock = threading.Lock()
+
+    def get(self, agent_name: str, temperature: float = 0.0, model: Optional[str] = None) -> PooledChatOpenAI:
+        """Return the chat model for an agent, applying its overrides"""
+        override = self.overrides.get(agent_name, {})
+        model = override.get("model") or model or self.default_model
+        temperature = float(override.get("temperature", temperature))
+
+        with self._lock:
+            client = self._clients.get((model, temperature))
+            if client is None:
+                client = PooledChatOpenAI(
+                    api_key=self.openai_api_key,
+                    model=model,
+                    temperature=temperature,
+                    http_client=self.http_client,
+                    http_async_client=self.http_async_client,
+                    max_retries=0
+                )
+                client._limiter = self.limiter
+                self._clients[(model, temperature)] = client
+            return client
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self._clients),
+            "max_concurrency": self.limiter.max_concurrency,
+            "in_flight": self.limiter.in_flight,
+            "peak_in_flight": self.limiter.peak_in_flight
+        }
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP pools"""
+        self.http_client.close()
+        await self.http_async_client.aclose()
+
+
+def create_llm_registry(openai_api_key: str,
+                        overrides: Optional[Dict[str, Dict[str, Any]]] = None) -> LLMRegistry:
+    """Create the LLM registry configured by environment variables
+
+    LLM_MODEL: default model for every agent (default: gpt-4o-mini)
+    LLM_MAX_CONCURRENCY: maximum in-flight LLM calls (default: 16)
+    LLM_MAX_CONNECTIONS: size of the shared HTTP pool (default: 32)
+    LLM_KEEPALIVE_SECONDS: idle keep-alive time for pooled connections (default: 60)
+    LLM_<AGENT>_MODEL / LLM_<AGENT>_TEMPERATURE: per-agent overrides, e.g.
+        LLM_ROUTER_MODEL; explicit overrides passed in take precedence
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for agent_name in ("router", "booking", "complaint", "information"):
+        prefix = f"LLM_{agent_name.upper()}_"
+        override: Dict[str, Any] = {}
+        if os.getenv(prefix + "MODEL"):
+            override["model"] = os.getenv(prefix + "MODEL")
+        if os.getenv(prefix + "TEMPERATURE"):
+            override["temperature"] = float(os.getenv(prefix + "TEMPERATURE"))
+        if override:
+            merged[agent_name] = override
+    for agent_name, override in (overrides or {}).items():
+        merged[agent_name] = {**merged.get(agent_name, {}), **override}
+
+    return LLMRegistry(
+        openai_api_key,
+        default_model=os.getenv("LLM_MODEL", DEFAULT_MODEL),
+        max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", 16)),
+        max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", 32)),
+        keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_SECONDS", 60)),
+        overrides=merged
+    )
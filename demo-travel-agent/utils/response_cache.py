@@ -0,0 +1,332 @@
+"""
+Response cache for long, repeatable LLM answers
+
+Entries are keyed on the normalised fields the information agent extracts
+from a query (query_type, destination, timeframe, interests, plus any extra
+prompt inputs). When an embeddings model is configured, an exact miss falls
+back to a cosine-similarity lookup among entries with the same query_type
+and extras, so "NYC" and "New York City" can share an answer.
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+
+def _normalise(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple, set)):
+        return ",".join(sorted(_normalise(item) for item in value if item))
+    return re.sub(r"\s+", " ", str(value)).strip().lower()
+
+
+class CacheKey:
+    """Normalised cache key
+
+    scope holds the fields that must match exactly (query_type and extras);
+    subject holds the fields that may match semantically.
+    """
+
+    def __init__(self, query_type: str, destination: Any = None, timeframe: Any = None,
+                 interests: Any = None, **extra: Any):
+        self.scope = "|".join(
+            [_normalise(query_type)] + [f"{name}={_normalise(extra[name])}" for name in sorted(extra)]
+        )
+        self.subject = "|".join([_normalise(destination), _normalise(timeframe), _normalise(interests)])
+        self.key = f"{self.scope}#{self.subject}"
+        # Embedding of subject, filled on lookup so a following set reuses it
+        self.vector: Optional[np.ndarray] = None
+
+    def __repr__(self) -> str:
+        return f"CacheKey({self.key!r})"
+
+
+class ResponseCache(ABC):
+    """Size-bounded, TTL-bounded response cache with optional semantic lookup"""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 6 * 3600,
+                 embeddings: Any = None, similarity_threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    # Storage primitives implemented by each backend
+
+    @abstractmethod
+    def _get_exact(self, key: str) -> Optional[str]:
+        """Return a live value for an exact key and mark it recently used"""
+
+    @abstractmethod
+    def _candidates(self, scope: str) -> Iterable[Tuple[str, np.ndarray]]:
+        """Yield (key, unit vector) for live entries in a scope"""
+
+    @abstractmethod
+    def _put(self, cache_key: CacheKey, value: str, vector: Optional[np.ndarray]) -> None:
+        """Insert a value, evicting expired and least recently used entries"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of live entries"""
+
+    def clear(self) -> None:
+        """Remove every entry"""
+
+    # Public API
+
+    def get(self, cache_key: CacheKey) -> Optional[str]:
+        """Look up a value by exact key, then by similarity if enabled"""
+        value = self._get_exact(cache_key.key)
+        if value is not None:
+            self._record("hits")
+            return value
+
+        if self.embeddings is not None:
+            cache_key.vector = self._unit(self.embeddings.embed_query(cache_key.subject))
+            value = self._similar(cache_key, cache_key.vector)
+            if value is not None:
+                return value
+
+        self._record("misses")
+        return None
+
+    async def aget(self, cache_key: CacheKey) -> Optional[str]:
+        """Async version of get; SQLite lookups run in a worker thread"""
+        value = await asyncio.to_thread(self._get_exact, cache_key.key)
+        if value is not None:
+            self._record("hits")
+            return value
+
+        if self.embeddings is not None:
+            cache_key.vector = self._unit(await self.embeddings.aembed_query(cache_key.subject))
+            value = await asyncio.to_thread(self._similar, cache_key, cache_key.vector)
+            if value is not None:
+                return value
+
+        self._record("misses")
+        return None
+
+    def set(self, cache_key: CacheKey, value: str) -> None:
+        if self.embeddings is not None and cache_key.vector is None:
+            cache_key.vector = self._unit(self.embeddings.embed_query(cache_key.subject))
+        self._put(cache_key, value, cache_key.vector)
+
+    async def aset(self, cache_key: CacheKey, value: str) -> None:
+        if self.embeddings is not None and cache_key.vector is None:
+            cache_key.vector = self._unit(await self.embeddings.aembed_query(cache_key.subject))
+        await asyncio.to_thread(self._put, cache_key, value, cache_key.vector)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self),
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": ((self.hits + self.semantic_hits) / lookups) if lookups else 0.0
+            }
+
+    # Helpers
+
+    def _record(self, counter: str) -> None:
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @staticmethod
+    def _unit(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def _similar(self, cache_key: CacheKey, vector: np.ndarray) -> Optional[str]:
+        candidates = list(self._candidates(cache_key.scope))
+        if not candidates:
+            return None
+
+        keys = [key for key, _ in candidates]
+        similarities = np.stack([candidate for _, candidate in candidates]) @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+
+        value = self._get_exact(keys[best])
+        if value is not None:
+            self._record("semantic_hits")
+        return value
+
+
+class InMemoryResponseCache(ResponseCache):
+    """In-process LRU response cache"""
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        # key -> (expires_at, scope, value, vector)
+        self._entries: "OrderedDict[str, Tuple[float, str, str, Optional[np.ndarray]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_exact(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def _candidates(self, scope: str) -> Iterable[Tuple[str, np.ndarray]]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (key, vector)
+                for key, (expires_at, entry_scope, _, vector) in self._entries.items()
+                if entry_scope == scope and vector is not None and expires_at >= now
+            ]
+
+    def _put(self, cache_key: CacheKey, value: str, vector: Optional[np.ndarray]) -> None:
+        with self._lock:
+            self._entries[cache_key.key] = (time.monotonic() + self.ttl_seconds, cache_key.scope, value, vector)
+            self._entries.move_to_end(cache_key.key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteResponseCache(ResponseCache):
+    """Response cache stored in a local SQLite file, shared across processes"""
+
+    def __init__(self, db_path: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                scope TEXT NOT NULL,
+                value TEXT NOT NULL,
+                vector BLOB,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_scope ON response_cache (scope)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_accessed_at ON response_cache (accessed_at)")
+        self._conn.commit()
+
+    def _get_exact(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM response_cache WHERE key = ? AND expires_at >= ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return row[0]
+
+    def _candidates(self, scope: str) -> Iterable[Tuple[str, np.ndarray]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, vector FROM response_cache WHERE scope = ? AND vector IS NOT NULL AND expires_at >= ?",
+                (scope, time.time())
+            ).fetchall()
+        return [(key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows]
+
+    def _put(self, cache_key: CacheKey, value: str, vector: Optional[np.ndarray]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO response_cache (key, scope, value, vector, expires_at, accessed_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (
+                    cache_key.key,
+                    cache_key.scope,
+                    value,
+                    vector.astype(np.float32).tobytes() if vector is not None else None,
+                    now + self.ttl_seconds,
+                    now
+                )
+            )
+            self._conn.execute("DELETE FROM response_cache WHERE expires_at < ?", (now,))
+            self._conn.execute(
+                """DELETE FROM response_cache WHERE key IN (
+                    SELECT key FROM response_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM response_cache WHERE expires_at >= ?", (time.time(),)
+            ).fetchone()
+        return row[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache")
+            self._conn.commit()
+
+
+def create_response_cache(openai_api_key: Optional[str] = None) -> Optional[ResponseCache]:
+    """Create the response cache configured by environment variables
+
+    RESPONSE_CACHE: "memory" (default), "sqlite" or "off"
+    RESPONSE_CACHE_DB_PATH: SQLite file path (default: response_cache.db)
+    RESPONSE_CACHE_MAX_ENTRIES: maximum number of cached answers (default: 1000)
+    RESPONSE_CACHE_TTL_SECONDS: lifetime of a cached answer (default: 6h)
+    RESPONSE_CACHE_SEMANTIC: "true" to enable embedding-similarity lookup
+    RESPONSE_CACHE_SIMILARITY: cosine similarity needed for a semantic hit (default: 0.95)
+    """
+    backend = os.getenv("RESPONSE_CACHE", "memory").lower()
+    if backend == "off":
+        return None
+
+    embeddings = None
+    if os.getenv("RESPONSE_CACHE_SEMANTIC", "false").lower() == "true":
+        from langchain_openai import OpenAIEmbeddings
+
+        embeddings = OpenAIEmbeddings(
+            api_key=openai_api_key,
+            model=os.getenv("RESPONSE_CACHE_EMBEDDING_MODEL", "text-embedding-3-small")
+        )
+
+    options = {
+        "max_entries": int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1000)),
+        "ttl_seconds": float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 6 * 3600)),
+        "embeddings": embeddings,
+        "similarity_threshold": float(os.getenv("RESPONSE_CACHE_SIMILARITY", 0.95))
+    }
+
+    if backend == "sqlite":
+        return SQLiteResponseCache(os.getenv("RESPONSE_CACHE_DB_PATH", "response_cache.db"), **options)
+
+    return InMemoryResponseCache(**options)
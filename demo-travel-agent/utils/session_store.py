@@ -0,0 +1,308 @@
+"""
+Session storage for conversation state
+
+Two implementations sit behind the SessionStore interface:
+- InMemorySessionStore: LRU + TTL eviction in O(1) per operation, single process
+- SQLiteSessionStore: survives restarts and can be shared by several uvicorn workers
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from models.state import TravelAgentState
+from models.message_log import MessageLog
+
+
+def session_summary(session_id: str, state: TravelAgentState) -> Dict[str, Any]:
+    """Build the summary row returned by /sessions"""
+    return {
+        "session_id": session_id,
+        "message_count": len(state["messages"]),
+        "current_agent": state.get("current_agent"),
+        "is_complete": state["is_complete"],
+        "created_at": state["created_at"],
+        "last_updated": state["updated_at"]
+    }
+
+
+class SessionStore(ABC):
+    """Interface for conversation session storage"""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[TravelAgentState]:
+        """Return the state for a session, or None if missing or expired"""
+
+    @abstractmethod
+    def put(self, session_id: str, state: TravelAgentState) -> None:
+        """Insert or replace the state for a session"""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Delete a session, returning whether it existed"""
+
+    @abstractmethod
+    def list_sessions(self, offset: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        """Return one page of session summaries, most recently updated first"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of live sessions"""
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def close(self) -> None:
+        """Release any resources held by the store"""
+
+
+class InMemorySessionStore(SessionStore):
+    """In-process LRU store with TTL eviction
+
+    Entries are kept in an OrderedDict ordered by last touch, so the least
+    recently used session is always at the front. Expiry and capacity
+    eviction only ever look at the front, which keeps every operation O(1)
+    amortised with no full scans.
+    """
+
+    def __init__(self, max_sessions: int = 100, ttl_seconds: float = 24 * 3600):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        # session_id -> (last touch time, state)
+        self._sessions: "OrderedDict[str, Tuple[float, TravelAgentState]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict_expired(self, now: float) -> None:
+        while self._sessions:
+            oldest_id, (touched_at, _) = next(iter(self._sessions.items()))
+            if now - touched_at <= self.ttl_seconds:
+                break
+            del self._sessions[oldest_id]
+
+    def get(self, session_id: str) -> Optional[TravelAgentState]:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            self._sessions[session_id] = (now, entry[1])
+            self._sessions.move_to_end(session_id)
+            return entry[1]
+
+    def put(self, session_id: str, state: TravelAgentState) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[session_id] = (now, state)
+            self._sessions.move_to_end(session_id)
+            self._evict_expired(now)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def list_sessions(self, offset: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._evict_expired(time.monotonic())
+            page = list(islice(reversed(self._sessions.items()), offset, offset + limit))
+        return [session_summary(session_id, state) for session_id, (_, state) in page]
+
+    def count(self) -> int:
+        with self._lock:
+            self._evict_expired(time.monotonic())
+            return len(self._sessions)
+
+    def close(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, MessageLog):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode_object(obj: Dict[str, Any]) -> Any:
+    if "__datetime__" in obj and len(obj) == 1:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+def serialize_state(state: TravelAgentState) -> str:
+    """Serialize a state to JSON, preserving datetime fields"""
+    return json.dumps(state, default=_encode_value)
+
+
+def deserialize_state(payload: str) -> TravelAgentState:
+    """Inverse of serialize_state"""
+    state = json.loads(payload, object_hook=_decode_object)
+    state["messages"] = MessageLog(state["messages"])
+    return state
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite-backed session store shared across processes
+
+    Runs in WAL mode so several uvicorn workers can read while one writes.
+    Summary columns are stored next to the serialized state so /sessions
+    pages never deserialize full conversations, and expiry is an indexed
+    range delete on touched_at.
+
+    Eviction runs from put() at most once every evict_interval seconds
+    rather than on every write, and the capacity delete only runs when a
+    row count shows the table is over max_sessions. Reads filter on
+    touched_at, so expired rows that have not been deleted yet are never
+    returned; the table may briefly hold more than max_sessions rows.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_sessions: int = 10000,
+        ttl_seconds: float = 24 * 3600,
+        evict_interval: float = 60.0
+    ):
+        self.db_path = db_path
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.evict_interval = evict_interval
+        self._lock = threading.Lock()
+        self._next_evict = 0.0
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                message_count INTEGER NOT NULL,
+                current_agent TEXT,
+                is_complete INTEGER NOT NULL,
+                created_at TEXT NOT NULL,
+                last_updated TEXT NOT NULL,
+                touched_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_touched_at ON sessions (touched_at)")
+        self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        if now < self._next_evict:
+            return
+        self._next_evict = now + self.evict_interval
+        self._conn.execute("DELETE FROM sessions WHERE touched_at < ?", (now - self.ttl_seconds,))
+        (rows,) = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()
+        if rows > self.max_sessions:
+            self._conn.execute(
+                """DELETE FROM sessions WHERE session_id IN (
+                    SELECT session_id FROM sessions ORDER BY touched_at ASC LIMIT ?
+                )""",
+                (rows - self.max_sessions,)
+            )
+
+    def get(self, session_id: str) -> Optional[TravelAgentState]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM sessions WHERE session_id = ? AND touched_at >= ?",
+                (session_id, time.time() - self.ttl_seconds)
+            ).fetchone()
+        return deserialize_state(row[0]) if row else None
+
+    def put(self, session_id: str, state: TravelAgentState) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO sessions
+                   (session_id, state, message_count, current_agent, is_complete, created_at, last_updated, touched_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    session_id,
+                    serialize_state(state),
+                    len(state["messages"]),
+                    state.get("current_agent"),
+                    int(bool(state["is_complete"])),
+                    state["created_at"].isoformat(),
+                    state["updated_at"].isoformat(),
+                    now
+                )
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+            return cursor.rowcount > 0
+
+    def list_sessions(self, offset: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT session_id, message_count, current_agent, is_complete, created_at, last_updated
+                   FROM sessions WHERE touched_at >= ?
+                   ORDER BY touched_at DESC LIMIT ? OFFSET ?""",
+                (time.time() - self.ttl_seconds, limit, offset)
+            ).fetchall()
+
+        return [
+            {
+                "session_id": session_id,
+                "message_count": message_count,
+                "current_agent": current_agent,
+                "is_complete": bool(is_complete),
+                "created_at": datetime.fromisoformat(created_at),
+                "last_updated": datetime.fromisoformat(last_updated)
+            }
+            for session_id, message_count, current_agent, is_complete, created_at, last_updated in rows
+        ]
+
+    def count(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM sessions WHERE touched_at >= ?",
+                (time.time() - self.ttl_seconds,)
+            ).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_session_store() -> SessionStore:
+    """Create the session store configured by environment variables
+
+    SESSION_STORE: "memory" (default) or "sqlite"
+    SESSION_DB_PATH: SQLite file path (default: sessions.db)
+    SESSION_TTL_SECONDS: idle time before a session expires (default: 24h)
+    SESSION_MAX_SESSIONS: maximum number of sessions kept
+    SESSION_EVICT_INTERVAL_SECONDS: how often the SQLite store evicts (default: 60)
+    """
+    backend = os.getenv("SESSION_STORE", "memory").lower()
+    ttl_seconds = float(os.getenv("SESSION_TTL_SECONDS", 24 * 3600))
+
+    if backend == "sqlite":
+        return SQLiteSessionStore(
+            db_path=os.getenv("SESSION_DB_PATH", "sessions.db"),
+            max_sessions=int(os.getenv("SESSION_MAX_SESSIONS", 10000)),
+            ttl_seconds=ttl_seconds,
+            evict_interval=float(os.getenv("SESSION_EVICT_INTERVAL_SECONDS", 60))
+        )
+
+    return InMemorySessionStore(
+        max_sessions=int(os.getenv("SESSION_MAX_SESSIONS", 100)),
+        ttl_seconds=ttl_seconds
+    )
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import faiss
+import numpy as np
+
+from kb_store import INDEX_TYPES, KBIngestConfig, configure_search, create_faiss_index
+
+# Compare FAISS index types on a synthetic clustered corpus: build time,
+# per-query latency, recall@k against exact search, and serialized size.
+#
+#   python bench_index.py --n 100000 --dim 384 --nprobe 4 8 16 --ef-search 32 64 128
+
+
+def synthetic_corpus(n: int, dim: int, queries: int, clusters: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """Vectors drawn around random centroids, like embeddings of topical docs"""
+    rng = np.random.default_rng(seed)
+    centroids = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n + queries)
+    vectors = centroids[labels] + 0.35 * rng.normal(size=(n + queries, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.ascontiguousarray(vectors[:n]), np.ascontiguousarray(vectors[n:])
+
+
+def search_each(index: faiss.Index, queries: np.ndarray, k: int) -> tuple[np.ndarray, list[float]]:
+    """One query at a time, as the bot issues them"""
+    ids = np.empty((len(queries), k), dtype=np.int64)
+    latencies = []
+    for row, query in enumerate(queries):
+        start = time.perf_counter()
+        _, found = index.search(query[None, :], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        ids[row] = found[0]
+    return ids, latencies
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(row) & set(expected)) for row, expected in zip(found, truth))
+    return hits / truth.size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark FAISS index types for the KB")
+    parser.add_argument("--n", type=int, default=50_000, help="corpus vectors")
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--types", nargs="+", default=list(INDEX_TYPES), choices=INDEX_TYPES)
+    parser.add_argument("--nlist", type=int, default=0, help="IVF lists (0 = auto)")
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--ef-construction", type=int, default=200)
+    parser.add_argument("--pq-m", type=int, default=16)
+    parser.add_argument("--pq-nbits", type=int, default=8)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 32, 64, 128])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vectors, queries = synthetic_corpus(args.n, args.dim, args.queries, args.clusters, args.seed)
+    print(f"{args.n} vectors x {args.dim} dims, {args.queries} queries, k={args.k}\n")
+
+    exact = faiss.IndexFlatL2(args.dim)
+    exact.add(vectors)
+    _, truth = exact.search(queries, args.k)
+
+    print(f"{'index':<8} {'setting':<12} {'build s':>8} {'p50 ms':>8} {'p95 ms':>8} {'recall':>7} {'size MB':>8}")
+    for index_type in args.types:
+        config = KBIngestConfig(
+            kb_dir="",
+            vectorstore_dir="",
+            chunk_size=0,
+            chunk_overlap=0,
+            index_type=index_type,
+            ivf_nlist=args.nlist,
+            hnsw_m=args.hnsw_m,
+            hnsw_ef_construction=args.ef_construction,
+            pq_m=args.pq_m,
+            pq_nbits=args.pq_nbits,
+        )
+        start = time.perf_counter()
+        index, built = create_faiss_index(vectors, config)
+        build_seconds = time.perf_counter() - start
+        size_mb = faiss.serialize_index(index).nbytes / 1e6
+
+        if built in ("ivf", "ivfpq"):
+            settings = [(f"nprobe={nprobe}", {"nprobe": nprobe}) for nprobe in args.nprobe]
+        elif built == "hnsw":
+            settings = [(f"ef={ef}", {"ef_search": ef}) for ef in args.ef_search]
+        else:
+            settings = [("exact", {})]
+
+        for label, knobs in settings:
+            configure_search(index, **knobs)
+            found, latencies = search_each(index, queries, args.k)
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+            print(
+                f"{built:<8} {label:<12} {build_seconds:>8.2f} {statistics.median(latencies):>8.3f} "
+                f"{p95:>8.3f} {recall(found, truth):>7.3f} {size_mb:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+from pathlib import Path
+import re
+from collections import Counter
+from typing import Iterable
+
+BM25_FILE = "bm25.json"
+
+# Identifiers keep their dots and underscores ("asyncio.gather", "__init__")
+# and are also indexed by their parts, so both spellings match.
+_TOKEN_RE = re.compile(r"[a-z_][a-z0-9_]*(?:\.[a-z_][a-z0-9_]*)*|\d+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from how i if in into is it its "
+    "me my of on or so that the their then there these this to was we what when "
+    "where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    tokens: list[str] = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        if "." in token or "_" in token.strip("_"):
+            tokens.extend(part for part in re.split(r"[._]+", token) if part and part not in STOPWORDS)
+    return tokens
+
+
+class BM25Index:
+    """Inverted-index BM25 over KB chunks, keyed by chunk id.
+
+    Built at ingest time alongside the FAISS index and updated with the same
+    chunk ids, so its hits can be fused with vector hits or served on their
+    own without an embedding call.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.doc_lengths: dict[str, int] = {}
+        self.postings: dict[str, dict[str, int]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, ids: Iterable[str], texts: Iterable[str]) -> None:
+        for chunk_id, text in zip(ids, texts):
+            if chunk_id in self.doc_lengths:
+                self.remove([chunk_id])
+            tokens = tokenize(text)
+            self.doc_lengths[chunk_id] = len(tokens)
+            self._total_length += len(tokens)
+            for term, tf in Counter(tokens).items():
+                self.postings.setdefault(term, {})[chunk_id] = tf
+
+    def remove(self, ids: Iterable[str]) -> None:
+        removed = {chunk_id for chunk_id in ids if chunk_id in self.doc_lengths}
+        if not removed:
+            return
+        for chunk_id in removed:
+            self._total_length -= self.doc_lengths.pop(chunk_id)
+        for term in list(self.postings):
+            docs = self.postings[term]
+            for chunk_id in removed & docs.keys():
+                del docs[chunk_id]
+            if not docs:
+                del self.postings[term]
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        n = len(self.doc_lengths)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int) -> list[tuple[str, float]]:
+        if not self.doc_lengths:
+            return []
+        avg_length = self._total_length / len(self.doc_lengths) or 1.0
+        scores: dict[str, float] = {}
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = self.idf(term)
+            for chunk_id, tf in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[chunk_id] / avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def confidence(self, query: str, results: list[tuple[str, float]], lead: float = 0.2) -> float:
+        """How sure the lexical match is, from 0 to 1.
+
+        The idf-weighted share of query terms found in the top hit, scaled
+        down when the top hit leads the runner-up by less than `lead`
+        (relative). Query terms missing from the KB count at full weight,
+        so questions phrased in words the KB doesn't use fall back to
+        vector search.
+        """
+        terms = set(tokenize(query))
+        if not results or not terms:
+            return 0.0
+        top_id = results[0][0]
+        max_idf = self.idf("\0")
+        total = matched = 0.0
+        for term in terms:
+            docs = self.postings.get(term)
+            weight = self.idf(term) if docs else max_idf
+            total += weight
+            if docs and top_id in docs:
+                matched += weight
+        coverage = matched / total if total else 0.0
+
+        top = results[0][1]
+        runner_up = results[1][1] if len(results) > 1 else 0.0
+        margin = (top - runner_up) / top if top > 0 else 0.0
+        return coverage * min(1.0, margin / lead)
+
+    def save(self, directory: str) -> None:
+        path = Path(directory) / BM25_FILE
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({
+                "k1": self.k1,
+                "b": self.b,
+                "doc_lengths": self.doc_lengths,
+                "postings": self.postings,
+            }),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, directory: str) -> "BM25Index | None":
+        path = Path(directory) / BM25_FILE
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+        index = cls(k1=data["k1"], b=data["b"])
+        index.doc_lengths = data["doc_lengths"]
+        index.postings = data["postings"]
+        index._total_length = sum(index.doc_lengths.values())
+        return index
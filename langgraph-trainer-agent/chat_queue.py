@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import logging
+import time
+from typing import Awaitable, Callable
+
+
+logger = logging.getLogger("trainer-bot")
+
+
+@dataclass
+class _Job:
+    text: str
+    respond: Callable[[str | None], Awaitable[None]]
+    enqueued: float = field(default_factory=time.monotonic)
+
+
+class ChatWorkerPool:
+    """Answers messages on a fixed number of workers, in order per chat.
+
+    Each chat has its own FIFO queue and is served by at most one worker at
+    a time, so replies stay in order within a chat while different chats
+    run in parallel. A chat with more work goes to the back of the line
+    after each message, so one busy chat cannot hold every worker.
+
+    Backpressure: a message identical to one already queued in the same
+    chat is coalesced into it, and messages arriving when the chat's queue
+    (or the total backlog) is full are shed. Messages that waited longer
+    than max_wait_seconds are dropped when they reach a worker.
+    """
+
+    def __init__(
+        self,
+        answer: Callable[[str], str | None],
+        workers: int = 4,
+        chat_queue_size: int = 5,
+        max_pending: int = 100,
+        max_wait_seconds: float = 120.0,
+        log_every: int = 50,
+    ) -> None:
+        self.answer = answer
+        self.workers = max(1, workers)
+        self.chat_queue_size = chat_queue_size
+        self.max_pending = max_pending
+        self.max_wait_seconds = max_wait_seconds
+        self.log_every = log_every
+        self.counts = {"done": 0, "failed": 0, "shed": 0, "coalesced": 0, "expired": 0}
+        self._queues: dict[int, deque[_Job]] = {}
+        self._ready: asyncio.Queue[int] | None = None
+        self._pending = 0
+        self._waits: deque[float] = deque(maxlen=500)
+        self._executor: ThreadPoolExecutor | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._ready = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="trainer-answer")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, chat_id: int, text: str, respond: Callable[[str | None], Awaitable[None]]) -> bool:
+        """Queue a message; False if it was coalesced or shed"""
+        queue = self._queues.get(chat_id)
+        if queue is not None and any(job.text == text for job in queue):
+            self.counts["coalesced"] += 1
+            logger.info("Chat %s: duplicate message coalesced", chat_id)
+            return False
+        if (queue is not None and len(queue) >= self.chat_queue_size) or self._pending >= self.max_pending:
+            self.counts["shed"] += 1
+            logger.warning(
+                "Chat %s: message shed (chat queue %d, backlog %d)",
+                chat_id, len(queue) if queue else 0, self._pending,
+            )
+            return False
+
+        if queue is None:
+            queue = self._queues[chat_id] = deque()
+            # Not queued or being answered: make the chat ready for a worker
+            self._ready.put_nowait(chat_id)
+        queue.append(_Job(text, respond))
+        self._pending += 1
+        return True
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            chat_id = await self._ready.get()
+            queue = self._queues[chat_id]
+            job = queue[0]
+            wait = time.monotonic() - job.enqueued
+            self._waits.append(wait)
+            try:
+                if wait > self.max_wait_seconds:
+                    self.counts["expired"] += 1
+                    logger.warning("Chat %s: message dropped after %.0fs in queue", chat_id, wait)
+                else:
+                    start = time.monotonic()
+                    reply = await loop.run_in_executor(self._executor, self.answer, job.text)
+                    await job.respond(reply)
+                    self.counts["done"] += 1
+                    logger.debug(
+                        "Chat %s: answered after %.0f ms in queue, %.0f ms running",
+                        chat_id, wait * 1000, (time.monotonic() - start) * 1000,
+                    )
+            except Exception:
+                self.counts["failed"] += 1
+                logger.exception("Chat %s: answering failed", chat_id)
+            finally:
+                queue.popleft()
+                self._pending -= 1
+                if queue:
+                    self._ready.put_nowait(chat_id)
+                else:
+                    del self._queues[chat_id]
+                self._maybe_log()
+
+    def stats(self) -> dict[str, float]:
+        waits = sorted(self._waits)
+        return {
+            **self.counts,
+            "pending": self._pending,
+            "chats_waiting": len(self._queues),
+            "max_chat_depth": max((len(queue) for queue in self._queues.values()), default=0),
+            "wait_p50_ms": waits[len(waits) // 2] * 1000 if waits else 0.0,
+            "wait_p95_ms": waits[int(len(waits) * 0.95)] * 1000 if waits else 0.0,
+        }
+
+    def _maybe_log(self) -> None:
+        handled = self.counts["done"] + self.counts["failed"] + self.counts["expired"]
+        if not self.log_every or handled % self.log_every:
+            return
+        stats = self.stats()
+        logger.info(
+            "Chat queue: %d pending across %d chats (deepest %d), time in queue p50 %.0f ms "
+            "p95 %.0f ms; %d answered, %d failed, %d shed, %d coalesced, %d expired",
+            stats["pending"], stats["chats_waiting"], stats["max_chat_depth"],
+            stats["wait_p50_ms"], stats["wait_p95_ms"], stats["done"], stats["failed"],
+            stats["shed"], stats["coalesced"], stats["expired"],
+        )
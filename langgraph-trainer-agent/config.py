@@ -21,6 +21,23 @@ def _env_int(key: str, default: int) -> int:
         raise RuntimeError(f"{key} must be an integer") from exc
 
 
+def _env_float(key: str, default: float) -> float:
+    value = os.getenv(key)
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except ValueError as exc:
+        raise RuntimeError(f"{key} must be a number") from exc
+
+
+def _env_bool(key: str, default: bool) -> bool:
+    value = os.getenv(key)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
 @dataclass
 class Settings:
     openai_api_key: str
@@ -34,20 +51,79 @@ class Settings:
     chunk_size: int
     chunk_overlap: int
     top_k: int
+    topic_classifier_path: str
+    classifier_allow_threshold: float
+    classifier_reject_threshold: float
+    classifier_log_path: str
+    retrieval_mode: str
+    speculative_retrieval: bool
+    rrf_k: int
+    bm25_fast_path_confidence: float
+    query_cache_size: int
+    query_cache_ttl_seconds: int
+    embedding_cache_path: str
+    embedding_batch_size: int
+    embedding_concurrency: int
+    ingest_batch_size: int
+    ingest_read_workers: int
+    faiss_index_type: str
+    faiss_nlist: int
+    faiss_hnsw_m: int
+    faiss_hnsw_ef_construction: int
+    faiss_pq_m: int
+    faiss_pq_nbits: int
+    faiss_nprobe: int
+    faiss_ef_search: int
+    vectorstore_mmap: bool
+    vectorstore_reload_seconds: float
+    chat_workers: int
+    chat_queue_size: int
+    chat_max_pending: int
+    chat_max_wait_seconds: float
 
 
-def load_settings() -> Settings:
+def load_settings(require_telegram: bool = True) -> Settings:
+    # Offline tools that never start the bot pass require_telegram=False
     allowed_chat = _env("TELEGRAM_ALLOWED_CHAT_ID")
     return Settings(
         openai_api_key=_env("OPENAI_API_KEY", required=True),
         openai_model=_env("OPENAI_MODEL", "gpt-4o-mini"),
         openai_classifier_model=_env("OPENAI_CLASSIFIER_MODEL", "gpt-4o-mini"),
         openai_embedding_model=_env("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small"),
-        telegram_bot_token=_env("TELEGRAM_BOT_TOKEN", required=True),
+        telegram_bot_token=_env("TELEGRAM_BOT_TOKEN", "", required=require_telegram),
         telegram_allowed_chat_id=int(allowed_chat) if allowed_chat else None,
         kb_dir=_env("KB_DIR", "kb"),
         vectorstore_dir=_env("VECTORSTORE_DIR", "vectorstore"),
         chunk_size=_env_int("CHUNK_SIZE", 800),
         chunk_overlap=_env_int("CHUNK_OVERLAP", 100),
         top_k=_env_int("TOP_K", 4),
+        topic_classifier_path=_env("TOPIC_CLASSIFIER_PATH", "topic_classifier.json"),
+        classifier_allow_threshold=_env_float("CLASSIFIER_ALLOW_THRESHOLD", 0.9),
+        classifier_reject_threshold=_env_float("CLASSIFIER_REJECT_THRESHOLD", 0.1),
+        classifier_log_path=_env("CLASSIFIER_LOG_PATH", ""),
+        retrieval_mode=_env("RETRIEVAL_MODE", "hybrid"),
+        speculative_retrieval=_env_bool("SPECULATIVE_RETRIEVAL", True),
+        rrf_k=_env_int("RRF_K", 60),
+        bm25_fast_path_confidence=_env_float("BM25_FAST_PATH_CONFIDENCE", 0.75),
+        query_cache_size=_env_int("QUERY_CACHE_SIZE", 1024),
+        query_cache_ttl_seconds=_env_int("QUERY_CACHE_TTL_SECONDS", 3600),
+        embedding_cache_path=_env("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite"),
+        embedding_batch_size=_env_int("EMBEDDING_BATCH_SIZE", 100),
+        embedding_concurrency=_env_int("EMBEDDING_CONCURRENCY", 4),
+        ingest_batch_size=_env_int("INGEST_BATCH_SIZE", 256),
+        ingest_read_workers=_env_int("INGEST_READ_WORKERS", 4),
+        faiss_index_type=_env("FAISS_INDEX_TYPE", "flat"),
+        faiss_nlist=_env_int("FAISS_NLIST", 0),
+        faiss_hnsw_m=_env_int("FAISS_HNSW_M", 32),
+        faiss_hnsw_ef_construction=_env_int("FAISS_HNSW_EF_CONSTRUCTION", 200),
+        faiss_pq_m=_env_int("FAISS_PQ_M", 16),
+        faiss_pq_nbits=_env_int("FAISS_PQ_NBITS", 8),
+        faiss_nprobe=_env_int("FAISS_NPROBE", 8),
+        faiss_ef_search=_env_int("FAISS_EF_SEARCH", 64),
+        vectorstore_mmap=_env_bool("VECTORSTORE_MMAP", True),
+        vectorstore_reload_seconds=_env_float("VECTORSTORE_RELOAD_SECONDS", 30.0),
+        chat_workers=_env_int("CHAT_WORKERS", 4),
+        chat_queue_size=_env_int("CHAT_QUEUE_SIZE", 5),
+        chat_max_pending=_env_int("CHAT_MAX_PENDING", 100),
+        chat_max_wait_seconds=_env_float("CHAT_MAX_WAIT_SECONDS", 120.0),
     )
\ No newline at end of file
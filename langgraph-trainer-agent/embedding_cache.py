@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import hashlib
+import logging
+from pathlib import Path
+import random
+import sqlite3
+import threading
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+logger = logging.getLogger("trainer-embeddings")
+
+
+@dataclass
+class EmbeddingStats:
+    chunks: int = 0
+    hits: int = 0
+    misses: int = 0
+    batches: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.chunks if self.chunks else 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.chunks} chunks in {self.seconds:.1f}s "
+            f"({self.chunks_per_second:.1f} chunks/s), cache hit rate {self.hit_rate:.0%} "
+            f"({self.hits} hits, {self.misses} embedded in {self.batches} batches, "
+            f"{self.retries} retries)"
+        )
+
+
+def _status(exc: Exception) -> int | None:
+    return getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+
+
+def _is_rate_limited(exc: Exception) -> bool:
+    return _status(exc) == 429 or "RateLimit" in type(exc).__name__
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Rate limits, server errors and timeouts/connection drops; client
+    errors such as 400 or 401 fail the same way on every attempt"""
+    status = _status(exc)
+    if status is not None:
+        return status == 429 or status >= 500
+    name = type(exc).__name__
+    return (
+        _is_rate_limited(exc)
+        or isinstance(exc, (TimeoutError, ConnectionError))
+        or "Timeout" in name
+        or "Connection" in name
+    )
+
+
+def _retry_after(exc: Exception) -> float | None:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper with a persistent SQLite cache and batched,
+    concurrent calls for cache misses.
+
+    Vectors are keyed on sha256(model + text), so they are reused across
+    rebuilds and across chunk_size/chunk_overlap experiments whenever a
+    chunk's text comes out the same. Misses go to the wrapped embeddings in
+    batches of batch_size with at most concurrency batches in flight
+    (async tasks for aembed_documents, worker threads for
+    embed_documents). Rate-limited, 5xx and timed-out batches back off
+    exponentially with jitter, honouring Retry-After when the API sends
+    one; other errors are raised at once.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        cache_path: str,
+        model: str | None = None,
+        batch_size: int = 100,
+        concurrency: int = 4,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ) -> None:
+        self.embeddings = embeddings
+        self.model = model or str(getattr(embeddings, "model", type(embeddings).__name__))
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = EmbeddingStats()
+
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys: list[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                part = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})",
+                    part,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def _store(self, keys: list[str], vectors: list[list[float]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in zip(keys, vectors)],
+            )
+            self._conn.commit()
+
+    def _backoff(self, attempt: int, exc: Exception) -> float:
+        delay = _retry_after(exc)
+        if delay is None:
+            delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+            delay = random.uniform(delay / 2, delay)
+        with self._lock:
+            self.stats.retries += 1
+        logger.warning(
+            "Embedding batch %s (attempt %d), retrying in %.1fs: %s",
+            "rate limited" if _is_rate_limited(exc) else "failed",
+            attempt + 1,
+            delay,
+            exc,
+        )
+        return delay
+
+    async def _aembed_batch(self, texts: list[str], semaphore: asyncio.Semaphore) -> list[list[float]]:
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    vectors = await self.embeddings.aembed_documents(texts)
+                    self.stats.batches += 1
+                    return vectors
+                except Exception as exc:
+                    if attempt == self.max_retries or not _is_retryable(exc):
+                        raise
+                    await asyncio.sleep(self._backoff(attempt, exc))
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                vectors = self.embeddings.embed_documents(texts)
+                with self._lock:
+                    self.stats.batches += 1
+                return vectors
+            except Exception as exc:
+                if attempt == self.max_retries or not _is_retryable(exc):
+                    raise
+                time.sleep(self._backoff(attempt, exc))
+
+    def _plan(self, texts: list[str]) -> tuple[list[str], dict[str, list[float]], list[str], list[str]]:
+        keys = [self._key(text) for text in texts]
+        found = self._lookup(sorted(set(keys)))
+        miss_keys: list[str] = []
+        miss_texts: list[str] = []
+        pending: set[str] = set()
+        for key, text in zip(keys, texts):
+            if key not in found and key not in pending:
+                pending.add(key)
+                miss_keys.append(key)
+                miss_texts.append(text)
+        self.stats.chunks += len(texts)
+        self.stats.misses += len(miss_texts)
+        self.stats.hits += len(texts) - len(miss_texts)
+        return keys, found, miss_keys, miss_texts
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        start = time.perf_counter()
+        keys, found, miss_keys, miss_texts = self._plan(texts)
+        if miss_texts:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            batches = [
+                (miss_keys[i:i + self.batch_size], miss_texts[i:i + self.batch_size])
+                for i in range(0, len(miss_texts), self.batch_size)
+            ]
+
+            async def run(batch_keys: list[str], batch_texts: list[str]) -> None:
+                vectors = await self._aembed_batch(batch_texts, semaphore)
+                # Persist each batch as it lands so an interrupted run keeps its progress
+                self._store(batch_keys, vectors)
+                found.update(zip(batch_keys, vectors))
+
+            await asyncio.gather(*(run(batch_keys, batch_texts) for batch_keys, batch_texts in batches))
+        self.stats.seconds += time.perf_counter() - start
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        # Sync client on worker threads: asyncio.run per call would bind the
+        # wrapped async client's pooled connections to a loop it then closes
+        start = time.perf_counter()
+        keys, found, miss_keys, miss_texts = self._plan(texts)
+
+        def run(i: int) -> None:
+            batch_keys = miss_keys[i:i + self.batch_size]
+            vectors = self._embed_batch(miss_texts[i:i + self.batch_size])
+            self._store(batch_keys, vectors)
+            found.update(zip(batch_keys, vectors))
+
+        if miss_texts:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                # list() re-raises the first failed batch
+                list(executor.map(run, range(0, len(miss_texts), self.batch_size)))
+        self.stats.seconds += time.perf_counter() - start
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return await self.embeddings.aembed_query(text)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
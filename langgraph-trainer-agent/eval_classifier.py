@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+from dotenv import load_dotenv
+import numpy as np
+
+from rag_agent import _precheck, llm_classify
+from topic_classifier import ALLOWED_TOPICS, TopicClassifier, read_labelled
+
+# Offline comparison of the local topic classifier with the LLM gate on a
+# labelled JSONL set (rows: {"question", "topic", "allowed"?}). Both run
+# behind the keyword precheck, as in the bot.
+#
+#   python eval_classifier.py --data labelled_test.jsonl          # local only
+#   python eval_classifier.py --data labelled_test.jsonl --llm    # + LLM gate
+
+
+def expected_calibration_error(probs: np.ndarray, outcomes: np.ndarray, bins: int = 10) -> float:
+    edges = np.linspace(0, 1, bins + 1)
+    error = 0.0
+    for low, high in zip(edges[:-1], edges[1:]):
+        mask = (probs >= low) & ((probs < high) if high < 1 else (probs <= high))
+        if mask.any():
+            error += mask.mean() * abs(probs[mask].mean() - outcomes[mask].mean())
+    return float(error)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the local topic classifier with the LLM gate")
+    parser.add_argument("--data", nargs="+", required=True, help="labelled JSONL files")
+    parser.add_argument("--model", default="topic_classifier.json")
+    parser.add_argument("--allow-threshold", type=float, default=0.9)
+    parser.add_argument("--reject-threshold", type=float, default=0.1)
+    parser.add_argument("--llm", action="store_true", help="also run the LLM gate (uses OPENAI_API_KEY)")
+    args = parser.parse_args()
+
+    model = TopicClassifier.load(args.model)
+    if model is None:
+        raise SystemExit(f"No classifier at {args.model}; run train_classifier.py first")
+    texts, labels = read_labelled(args.data)
+    gold = np.asarray([label in ALLOWED_TOPICS for label in labels])
+    passes = np.asarray([_precheck(text.strip()) for text in texts])
+
+    start = time.perf_counter()
+    probs = np.asarray([model.predict(text)[0] for text in texts])
+    local_ms = (time.perf_counter() - start) * 1000 / max(len(texts), 1)
+    local = passes & (probs >= 0.5)
+    known = np.asarray([model.known_features(text) > 0 for text in texts])
+    confident = known & ((probs >= args.allow_threshold) | (probs <= args.reject_threshold))
+    print(f"{len(texts)} messages, {gold.mean():.0%} on-topic, {passes.mean():.0%} pass the precheck")
+    print(
+        f"local classifier : accuracy {np.mean(local == gold):.3f}, "
+        f"ECE {expected_calibration_error(probs, gold.astype(float)):.3f}, {local_ms:.2f} ms/message"
+    )
+    band = passes & confident
+    print(
+        f"confident band   : {band.sum() / max(passes.sum(), 1):.0%} of precheck passes decided locally, "
+        f"accuracy {np.mean(local[band] == gold[band]) if band.any() else float('nan'):.3f}"
+    )
+
+    if not args.llm:
+        return
+
+    from langchain_openai import ChatOpenAI
+    from config import load_settings
+
+    load_dotenv()
+    settings = load_settings(require_telegram=False)
+    classifier_llm = ChatOpenAI(
+        api_key=settings.openai_api_key,
+        model=settings.openai_classifier_model,
+        temperature=0,
+    )
+    llm = np.zeros(len(texts), dtype=bool)
+    start = time.perf_counter()
+    for i, text in enumerate(texts):
+        if passes[i]:
+            llm[i] = llm_classify(classifier_llm, text.strip())[0]
+    llm_ms = (time.perf_counter() - start) * 1000 / max(passes.sum(), 1)
+    hybrid = np.where(band, local, llm)
+    print(f"LLM gate         : accuracy {np.mean(llm == gold):.3f}, {llm_ms:.0f} ms/call")
+    print(
+        f"local + LLM band : accuracy {np.mean(hybrid == gold):.3f}, "
+        f"agreement with LLM gate {np.mean(hybrid == llm):.3f}, "
+        f"LLM calls avoided {band.sum() / max(passes.sum(), 1):.0%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
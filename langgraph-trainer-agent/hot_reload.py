@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable, MutableMapping
+
+from config import Settings
+from kb_store import vectorstore_version
+
+
+logger = logging.getLogger("trainer-bot")
+
+
+def _close_graph(graph: Any) -> None:
+    vectorstore = getattr(graph, "vectorstore", None)
+    close = getattr(getattr(vectorstore, "docstore", None), "close", None)
+    if close is not None:
+        close()
+
+
+class VectorstoreWatcher:
+    """Rebuilds the graph when ingest finishes writing a new vectorstore.
+
+    Polls the manifest (written last by ingest) and, once it changes, builds
+    a new graph on a worker thread and swaps it into bot_data["graph"] in a
+    single assignment. Messages already being answered keep the graph they
+    started with; a failed load leaves the current graph in place. The
+    replaced graph's SQLite docstore is closed close_after seconds later,
+    once messages that were retrieving from it have finished.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        bot_data: MutableMapping[str, Any],
+        build: Callable[[Settings], Any],
+        interval: float = 30.0,
+        close_after: float = 120.0,
+    ) -> None:
+        self.settings = settings
+        self.bot_data = bot_data
+        self.build = build
+        self.interval = interval
+        self.close_after = close_after
+        self.reloads = 0
+        self._version = vectorstore_version(settings.vectorstore_dir)
+        self._failed_version = None
+
+    async def check(self) -> bool:
+        version = vectorstore_version(self.settings.vectorstore_dir)
+        if version is None or version in (self._version, self._failed_version):
+            return False
+        try:
+            graph = await asyncio.to_thread(self.build, self.settings)
+        except Exception:
+            # Retried only once the vectorstore changes again
+            self._failed_version = version
+            logger.exception("Reloading the vectorstore failed; keeping the current graph")
+            return False
+        previous = self.bot_data.get("graph")
+        self.bot_data["graph"] = graph
+        if previous is not None:
+            asyncio.get_running_loop().call_later(self.close_after, _close_graph, previous)
+        self._version = version
+        self.reloads += 1
+        logger.info("Vectorstore changed on disk; graph reloaded (reload %d)", self.reloads)
+        return True
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
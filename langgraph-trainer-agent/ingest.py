@@ -1,21 +1,48 @@
 from __future__ import annotations
 
+import argparse
+import time
+
 from dotenv import load_dotenv
 from langchain_openai import OpenAIEmbeddings
 
 from config import load_settings
-from kb_store import KBIngestConfig, build_vectorstore, load_kb_documents
+from embedding_cache import CachedEmbeddings
+from kb_store import (
+    KBIngestConfig,
+    build_vectorstore,
+    check_mmap_consistency,
+    iter_kb_documents,
+    load_manifest,
+    update_vectorstore,
+)
+
+#
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build or update the KB vectorstore")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-embed every chunk instead of only new or changed ones",
+    )
+    args = parser.parse_args()
 
-# 
-def main() -> None: 
     load_dotenv()
     settings = load_settings()
 
-    docs = load_kb_documents(settings.kb_dir)
+    start = time.perf_counter()
+    # Streamed: files are read, split, embedded and indexed batch by batch
+    docs = iter_kb_documents(settings.kb_dir, read_workers=settings.ingest_read_workers)
 
-    embeddings = OpenAIEmbeddings(
-        api_key=settings.openai_api_key,
+    embeddings = CachedEmbeddings(
+        OpenAIEmbeddings(
+            api_key=settings.openai_api_key,
+            model=settings.openai_embedding_model,
+        ),
+        cache_path=settings.embedding_cache_path,
         model=settings.openai_embedding_model,
+        batch_size=settings.embedding_batch_size,
+        concurrency=settings.embedding_concurrency,
     )
 
     config = KBIngestConfig(
@@ -23,15 +50,49 @@ def main() -> None:
         vectorstore_dir=settings.vectorstore_dir,
         chunk_size=settings.chunk_size,
         chunk_overlap=settings.chunk_overlap,
+        batch_size=settings.ingest_batch_size,
+        read_workers=settings.ingest_read_workers,
+        index_type=settings.faiss_index_type,
+        ivf_nlist=settings.faiss_nlist,
+        hnsw_m=settings.faiss_hnsw_m,
+        hnsw_ef_construction=settings.faiss_hnsw_ef_construction,
+        pq_m=settings.faiss_pq_m,
+        pq_nbits=settings.faiss_pq_nbits,
     )
 
-    build_vectorstore(docs, embeddings, config)
+    if args.full:
+        build_vectorstore(docs, embeddings, config)
+        file_count = len(load_manifest(settings.vectorstore_dir)["files"])
+        print(
+            f"Vectorstore saved to {settings.vectorstore_dir} with {file_count} documents."
+        )
+        print(f"Embeddings: {embeddings.stats.summary()}")
+        _check_mmap(settings.vectorstore_dir, embeddings)
+        return
 
+    _, report = update_vectorstore(docs, embeddings, config)
+    file_count = len(load_manifest(settings.vectorstore_dir)["files"])
+    mode = f"full rebuild ({', '.join(report.reasons)})" if report.full_rebuild else "incremental"
     print(
-        f"Vectorstore saved to {settings.vectorstore_dir} with {len(docs)} documents."
+        f"Vectorstore saved to {settings.vectorstore_dir} with {file_count} documents "
+        f"[{mode}] in {time.perf_counter() - start:.1f}s: "
+        f"files +{report.files_added} ~{report.files_changed} -{report.files_removed} "
+        f"={report.files_unchanged}; chunks embedded {report.chunks_embedded}, "
+        f"deleted {report.chunks_deleted}, reused {report.chunks_reused}."
     )
+    print(f"Embeddings: {embeddings.stats.summary()}")
+    _check_mmap(settings.vectorstore_dir, embeddings)
 
-if __name__ == "__main__":
-    main()
+
+def _check_mmap(vectorstore_dir: str, embeddings) -> None:
+    # The bot loads with VECTORSTORE_MMAP by default; make sure that path
+    # finds the same chunks as the store ingest just wrote
+    mismatches = check_mmap_consistency(vectorstore_dir, embeddings)
+    if mismatches:
+        raise SystemExit(
+            f"{mismatches} sample searches differ between the mmap and in-memory vectorstore"
+        )
 
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable, Iterator
+
+from langchain_core.documents import Document
+
+
+# Text files larger than this are read lazily in segments instead of whole
+SEGMENT_CHARS = 1_000_000
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_text_segments(path: Path, segment_chars: int = SEGMENT_CHARS) -> Iterator[tuple[str, dict]]:
+    """Yield a text file in segments of about segment_chars, cut at a blank
+    line (or line break) where possible so the splitter sees whole paragraphs"""
+    carry = ""
+    with path.open("r", encoding="utf-8") as handle:
+        while True:
+            block = handle.read(segment_chars)
+            if not block:
+                break
+            text = carry + block
+            if len(block) < segment_chars:
+                # Reached the end of the file
+                carry = ""
+                yield text, {}
+                break
+            cut = text.rfind("\n\n")
+            if cut <= 0:
+                cut = text.rfind("\n")
+            if cut <= 0:
+                cut = len(text)
+            carry = text[cut:]
+            yield text[:cut], {}
+    if carry.strip():
+        yield carry, {}
+
+
+class _HTMLText(HTMLParser):
+    _SKIP = {"script", "style", "noscript", "template", "svg", "head"}
+    _BLOCK = {"p", "div", "br", "li", "tr", "section", "article", "pre", "h1", "h2", "h3", "h4", "h5", "h6"}
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        # Characters in parts not yet returned by take()
+        self.pending = 0
+        self.title = ""
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title":
+            self._in_title = True
+        if tag in self._SKIP:
+            self._skip_depth += 1
+        elif tag in self._BLOCK:
+            self._append("\n")
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        if tag in self._SKIP and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in self._BLOCK:
+            self._append("\n")
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        if not self._skip_depth:
+            self._append(data)
+
+    def _append(self, text: str) -> None:
+        self.parts.append(text)
+        self.pending += len(text)
+
+    def take(self, final: bool = False) -> str:
+        """Return the text parsed so far, up to the last line break unless
+        final, and drop it from the buffer"""
+        raw = "".join(self.parts)
+        cut = len(raw) if final else raw.rfind("\n")
+        if cut <= 0:
+            cut = len(raw)
+        self.parts = [raw[cut:]] if cut < len(raw) else []
+        self.pending = len(raw) - cut
+        return self._normalize(raw[:cut])
+
+    @staticmethod
+    def _normalize(raw: str) -> str:
+        lines = (" ".join(line.split()) for line in raw.splitlines())
+        paragraphs: list[str] = []
+        for line in lines:
+            if line:
+                paragraphs.append(line)
+            elif paragraphs and paragraphs[-1]:
+                paragraphs.append("")
+        return "\n".join(paragraphs).strip()
+
+
+def read_html(path: Path, segment_chars: int = SEGMENT_CHARS) -> Iterator[tuple[str, dict]]:
+    """Yield the text of an HTML file in segments of about segment_chars as
+    it is parsed, cut at a line break (block element) where possible"""
+    parser = _HTMLText()
+
+    def segment(final: bool = False) -> Iterator[tuple[str, dict]]:
+        text = parser.take(final)
+        if text:
+            title = parser.title.strip()
+            yield text, {"title": title} if title else {}
+
+    with path.open("r", encoding="utf-8", errors="replace") as handle:
+        for block in iter(lambda: handle.read(segment_chars), ""):
+            parser.feed(block)
+            if parser.pending >= segment_chars:
+                yield from segment()
+    parser.close()
+    yield from segment(final=True)
+
+
+def read_pdf(path: Path, segment_chars: int = SEGMENT_CHARS) -> Iterator[tuple[str, dict]]:
+    try:
+        from pypdf import PdfReader
+    except ImportError as exc:
+        raise RuntimeError(f"Reading {path} needs pypdf: pip install pypdf") from exc
+
+    reader = PdfReader(str(path))
+    for number, page in enumerate(reader.pages, start=1):
+        text = page.extract_text() or ""
+        if text.strip():
+            yield text, {"page": number}
+
+
+LOADERS: dict[str, Callable[[Path, int], Iterator[tuple[str, dict]]]] = {
+    ".md": read_text_segments,
+    ".txt": read_text_segments,
+    ".html": read_html,
+    ".htm": read_html,
+    ".pdf": read_pdf,
+}
+
+
+def iter_kb_files(kb_dir: str) -> Iterator[Path]:
+    base = Path(kb_dir)
+    if not base.exists():
+        raise RuntimeError(f"KB directory not found: {kb_dir}")
+    for path in sorted(base.rglob("*")):
+        if path.is_file() and path.suffix.lower() in LOADERS:
+            yield path
+
+
+def _load(path: Path, segment_chars: int) -> tuple[str, Iterator[tuple[str, dict]]]:
+    digest = file_hash(path)
+    segments = LOADERS[path.suffix.lower()](path, segment_chars)
+    # Small files are parsed on the worker thread; large text files are
+    # left as a lazy generator so only one segment is in memory at a time
+    if path.suffix.lower() in (".md", ".txt") and path.stat().st_size > segment_chars:
+        return digest, segments
+    return digest, iter(list(segments))
+
+
+def iter_kb_documents(
+    kb_dir: str,
+    read_workers: int = 4,
+    segment_chars: int = SEGMENT_CHARS,
+) -> Iterator[Document]:
+    """Yield KB documents lazily, reading files on a thread pool.
+
+    At most 2 * read_workers files are read ahead of the consumer, and files
+    come out in path order. Each document carries its file's source path and
+    content hash; a file may yield several documents (PDF pages, segments of
+    a large text file), always consecutively.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, read_workers)) as pool:
+        pending: deque[tuple[Path, Future]] = deque()
+        paths = iter_kb_files(kb_dir)
+
+        def submit_next() -> None:
+            path = next(paths, None)
+            if path is not None:
+                pending.append((path, pool.submit(_load, path, segment_chars)))
+
+        for _ in range(2 * max(1, read_workers)):
+            submit_next()
+
+        while pending:
+            path, future = pending.popleft()
+            digest, segments = future.result()
+            submit_next()
+            for index, (text, extra) in enumerate(segments):
+                metadata = {"source": str(path), "file_hash": digest, **extra}
+                if index and "page" not in extra:
+                    metadata["segment"] = index
+                yield Document(page_content=text, metadata=metadata)
@@ -1,36 +1,236 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import hashlib
+import json
+import logging
+import os
 from pathlib import Path
-from typing import Iterable
+import pickle
+import tempfile
+from typing import Callable, Iterable, Iterator
 
+import faiss
+import numpy as np
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 
+from bm25_index import BM25Index
+from kb_loaders import iter_kb_documents
+from kv_docstore import DOCSTORE_FILE, SQLiteDocstore, write_docstore
+
+MANIFEST_FILE = "manifest.json"
+# 2: file hashes are taken over the raw file bytes
+MANIFEST_VERSION = 2
+
+# The flat index.faiss is always kept as the exact copy that incremental
+# ingest edits; other index types are derived from it into this file
+ANN_INDEX_FILE = "index.ann.faiss"
+INDEX_TYPES = ("flat", "ivf", "hnsw", "ivfpq")
+
+# Maps index files into memory instead of reading them (IO_FLAG_MMAP_IFC
+# covers flat vector storage, added in faiss 1.8)
+_MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+logger = logging.getLogger("trainer-kb")
+
 @dataclass
 class KBIngestConfig:
     kb_dir: str
     vectorstore_dir: str
     chunk_size: int
     chunk_overlap: int
+    # Chunks embedded and added to the index per step
+    batch_size: int = 256
+    read_workers: int = 4
+    # Search index: flat (exact), ivf, hnsw or ivfpq (compressed vectors)
+    index_type: str = "flat"
+    # IVF lists; 0 picks about 4 * sqrt(number of chunks)
+    ivf_nlist: int = 0
+    hnsw_m: int = 32
+    hnsw_ef_construction: int = 200
+    # IVF-PQ sub-quantizers (must divide the embedding size) and bits per code
+    pq_m: int = 16
+    pq_nbits: int = 8
+
+
+@dataclass
+class IngestReport:
+    full_rebuild: bool
+    files_added: int = 0
+    files_changed: int = 0
+    files_removed: int = 0
+    files_unchanged: int = 0
+    chunks_embedded: int = 0
+    chunks_deleted: int = 0
+    chunks_reused: int = 0
+    reasons: list[str] = field(default_factory=list)
 
 
 # Add Documents
 def load_kb_documents(kb_dir: str) -> list[Document]:
-    docs: list[Document] = []
-    base = Path(kb_dir)
-    if not base.exists():
-        raise RuntimeError(f"KB directory not found: {kb_dir}")
+    return list(iter_kb_documents(kb_dir))
 
-    for path in base.rglob("*"):
-        if not path.is_file():
-            continue
-        if path.suffix.lower() not in {".md", ".txt"}:
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _embedding_model(embeddings) -> str:
+    return str(getattr(embeddings, "model", type(embeddings).__name__))
+
+
+def _splitter(config: KBIngestConfig) -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
+        chunk_size=config.chunk_size,
+        chunk_overlap=config.chunk_overlap,
+    )
+
+
+def _iter_file_chunks(
+    documents: Iterable[Document],
+    config: KBIngestConfig,
+    skip: Callable[[str, str], bool] | None = None,
+) -> Iterator[tuple[str, str, list[Document], list[str]]]:
+    """Split documents one at a time, yielding (source, file hash, chunks, ids).
+
+    Chunk ids are content-addressed: an unchanged chunk keeps its id (and
+    vector) when other parts of its file change. Repeated text within a file
+    gets a per-occurrence suffix so ids stay unique; a file's documents
+    (pages, segments) arrive consecutively, so the count spans all of them.
+
+    When skip(source, file hash) is true for a file's first document, the
+    file is yielded once with no chunks and none of its documents are split.
+    """
+    splitter = _splitter(config)
+    source = None
+    skipped = False
+    seen: dict[str, int] = {}
+    for doc in documents:
+        new_file = doc.metadata["source"] != source
+        if skipped and not new_file:
             continue
-        text = path.read_text(encoding="utf-8")
-        docs.append(Document(page_content=text, metadata={"source": str(path)}))
-    return docs
+        file_hash = doc.metadata.get("file_hash") or _sha256(doc.page_content)
+        if new_file:
+            source = doc.metadata["source"]
+            seen = {}
+            skipped = skip is not None and skip(source, file_hash)
+            if skipped:
+                yield source, file_hash, [], []
+                continue
+        metadata = {key: value for key, value in doc.metadata.items() if key != "file_hash"}
+        chunks = splitter.split_documents([Document(page_content=doc.page_content, metadata=metadata)])
+        ids = []
+        for chunk in chunks:
+            base = _sha256(f"{source}\0{chunk.page_content}")
+            count = seen.get(base, 0)
+            seen[base] = count + 1
+            ids.append(base if count == 0 else f"{base}-{count}")
+        yield source, file_hash, chunks, ids
+
+
+class _BatchIndexer:
+    """Embeds and adds chunks to the vectorstore in batches of batch_size"""
+
+    def __init__(
+        self,
+        embeddings,
+        batch_size: int,
+        vectorstore: FAISS | None = None,
+        bm25: BM25Index | None = None,
+    ) -> None:
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.vectorstore = vectorstore
+        self.bm25 = bm25 if bm25 is not None else BM25Index()
+        self.added = 0
+        self._docs: list[Document] = []
+        self._ids: list[str] = []
+
+    def add(self, chunks: list[Document], ids: list[str]) -> None:
+        self._docs.extend(chunks)
+        self._ids.extend(ids)
+        if len(self._docs) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._docs:
+            return
+        if self.vectorstore is None:
+            self.vectorstore = FAISS.from_documents(self._docs, self.embeddings, ids=self._ids)
+        else:
+            self.vectorstore.add_documents(self._docs, ids=self._ids)
+        self.bm25.add(self._ids, (doc.page_content for doc in self._docs))
+        self.added += len(self._docs)
+        self._docs, self._ids = [], []
+
+
+def _manifest_path(vectorstore_dir: str) -> Path:
+    return Path(vectorstore_dir) / MANIFEST_FILE
+
+
+def load_manifest(vectorstore_dir: str) -> dict | None:
+    path = _manifest_path(vectorstore_dir)
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _write_manifest(vectorstore_dir: str, manifest: dict) -> None:
+    # Written after the index, via rename, so a crash mid-ingest leaves the
+    # previous manifest and the next run rebuilds what is out of date
+    path = _manifest_path(vectorstore_dir)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def vectorstore_version(vectorstore_dir: str) -> tuple[int, int] | None:
+    """Changes whenever ingest finishes writing; the manifest is written last"""
+    try:
+        stat = _manifest_path(vectorstore_dir).stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _save_vectorstore(vectorstore: FAISS, vectorstore_dir: str) -> None:
+    """Save index, pickle and SQLite docstore, each renamed into place.
+
+    A running bot may have index.faiss memory-mapped, so the files are never
+    rewritten in place.
+    """
+    directory = Path(vectorstore_dir)
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        vectorstore.save_local(tmp)
+        for name in ("index.faiss", "index.pkl"):
+            os.replace(Path(tmp) / name, directory / name)
+    write_docstore(directory / DOCSTORE_FILE, vectorstore.docstore, vectorstore.index_to_docstore_id)
+
+
+def _new_manifest(embeddings, config: KBIngestConfig) -> dict:
+    return {
+        "version": MANIFEST_VERSION,
+        "embedding_model": _embedding_model(embeddings),
+        "chunk_size": config.chunk_size,
+        "chunk_overlap": config.chunk_overlap,
+        "files": {},
+    }
+
+
+def _manifest_mismatch(manifest: dict | None, embeddings, config: KBIngestConfig) -> str | None:
+    """Why an existing manifest cannot be updated incrementally, if it can't"""
+    if manifest is None:
+        return "no manifest"
+    expected = _new_manifest(embeddings, config)
+    for key in ("version", "embedding_model", "chunk_size", "chunk_overlap"):
+        if manifest.get(key) != expected[key]:
+            return f"{key} changed ({manifest.get(key)!r} -> {expected[key]!r})"
+    return None
 
 # Create Vector Store
 def build_vectorstore(
@@ -38,27 +238,292 @@ def build_vectorstore(
     embeddings,
     config: KBIngestConfig,
 ) -> FAISS:
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=config.chunk_size,
-        chunk_overlap=config.chunk_overlap,
-    )
-    chunks = splitter.split_documents(list(documents))
+    """Build the vectorstore from scratch.
 
-    if not chunks:
+    documents may be a lazy iterator (see iter_kb_documents); they are split,
+    embedded and indexed batch by batch, so only one batch of chunks is held
+    in memory besides the index itself.
+    """
+    manifest = _new_manifest(embeddings, config)
+    indexer = _BatchIndexer(embeddings, config.batch_size)
+    for source, file_hash, chunks, ids in _iter_file_chunks(documents, config):
+        entry = manifest["files"].setdefault(source, {"hash": file_hash, "chunks": []})
+        entry["chunks"].extend(ids)
+        indexer.add(chunks, ids)
+    indexer.flush()
+
+    if indexer.vectorstore is None:
         raise RuntimeError("No KB chunks found; add documents to the KB directory")
 
-    vectorstore = FAISS.from_documents(chunks, embeddings)
+    vectorstore = indexer.vectorstore
     Path(config.vectorstore_dir).mkdir(parents=True, exist_ok=True)
-    vectorstore.save_local(config.vectorstore_dir)
+    _save_vectorstore(vectorstore, config.vectorstore_dir)
+    indexer.bm25.save(config.vectorstore_dir)
+    manifest["index"] = _save_ann_index(vectorstore, config)
+    _write_manifest(config.vectorstore_dir, manifest)
     return vectorstore
 
+
+def update_vectorstore(
+    documents: Iterable[Document],
+    embeddings,
+    config: KBIngestConfig,
+) -> tuple[FAISS, IngestReport]:
+    """Bring the saved vectorstore in line with documents, embedding only
+    chunks that are new or changed and deleting vectors of removed chunks.
+
+    Like build_vectorstore, documents are consumed lazily. Falls back to a
+    full build when there is no usable manifest or the embedding model or
+    chunking settings changed.
+    """
+    manifest = load_manifest(config.vectorstore_dir)
+    reason = _manifest_mismatch(manifest, embeddings, config)
+    index_file = Path(config.vectorstore_dir) / "index.faiss"
+    if reason is None and not index_file.exists():
+        reason = "index missing"
+    if reason is not None:
+        vectorstore = build_vectorstore(documents, embeddings, config)
+        files = load_manifest(config.vectorstore_dir)["files"]
+        report = IngestReport(
+            full_rebuild=True,
+            files_added=len(files),
+            chunks_embedded=sum(len(entry["chunks"]) for entry in files.values()),
+            reasons=[reason],
+        )
+        return vectorstore, report
+
+    report = IngestReport(full_rebuild=False)
+    old_files: dict = manifest["files"]
+    new_files: dict = {}
+    existing_ids = {chunk_id for entry in old_files.values() for chunk_id in entry["chunks"]}
+    keep_ids: set[str] = set()
+    vectorstore = load_vectorstore(config.vectorstore_dir, embeddings, exact=True)
+    bm25 = BM25Index.load(config.vectorstore_dir)
+    bm25_missing = bm25 is None
+    if bm25_missing:
+        bm25 = build_bm25_from_docstore(vectorstore)
+    indexer = _BatchIndexer(embeddings, config.batch_size, vectorstore, bm25)
+
+    def unchanged(source: str, file_hash: str) -> bool:
+        old = old_files.get(source)
+        return old is not None and old["hash"] == file_hash
+
+    for source, file_hash, chunks, ids in _iter_file_chunks(documents, config, skip=unchanged):
+        old = old_files.get(source)
+        if source not in new_files:
+            if old is not None and old["hash"] == file_hash:
+                new_files[source] = old
+                keep_ids.update(old["chunks"])
+                report.files_unchanged += 1
+                report.chunks_reused += len(old["chunks"])
+                continue
+            new_files[source] = {"hash": file_hash, "chunks": []}
+            if old is None:
+                report.files_added += 1
+            else:
+                report.files_changed += 1
+
+        new_files[source]["chunks"].extend(ids)
+        new_chunks, new_ids = [], []
+        for chunk, chunk_id in zip(chunks, ids):
+            keep_ids.add(chunk_id)
+            if chunk_id in existing_ids:
+                report.chunks_reused += 1
+            else:
+                new_chunks.append(chunk)
+                new_ids.append(chunk_id)
+        indexer.add(new_chunks, new_ids)
+
+    report.files_removed = len(set(old_files) - set(new_files))
+    removed_ids = sorted(existing_ids - keep_ids)
+
+    if not keep_ids:
+        raise RuntimeError("No KB chunks found; add documents to the KB directory")
+
+    if removed_ids:
+        vectorstore.delete(removed_ids)
+        bm25.remove(removed_ids)
+    indexer.flush()
+    report.chunks_deleted = len(removed_ids)
+    report.chunks_embedded = indexer.added
+
+    docstore_missing = not (Path(config.vectorstore_dir) / DOCSTORE_FILE).exists()
+    if removed_ids or indexer.added or docstore_missing:
+        _save_vectorstore(vectorstore, config.vectorstore_dir)
+    if removed_ids or indexer.added or bm25_missing:
+        bm25.save(config.vectorstore_dir)
+    # The derived index is rebuilt (no re-embedding) when vectors changed
+    # or the index settings did
+    index_entry = manifest.get("index") or {}
+    if removed_ids or indexer.added or index_entry.get("params") != _index_params(config):
+        manifest["index"] = _save_ann_index(vectorstore, config)
+    manifest["files"] = new_files
+    _write_manifest(config.vectorstore_dir, manifest)
+    return vectorstore, report
+
+def _index_params(config: KBIngestConfig) -> dict:
+    index_type = config.index_type.lower()
+    if index_type not in INDEX_TYPES:
+        raise RuntimeError(f"FAISS_INDEX_TYPE must be one of {', '.join(INDEX_TYPES)}")
+    params: dict = {"type": index_type}
+    if index_type in ("ivf", "ivfpq"):
+        params["nlist"] = config.ivf_nlist
+    if index_type == "ivfpq":
+        params.update(pq_m=config.pq_m, pq_nbits=config.pq_nbits)
+    if index_type == "hnsw":
+        params.update(m=config.hnsw_m, ef_construction=config.hnsw_ef_construction)
+    return params
+
+
+def create_faiss_index(vectors: np.ndarray, config: KBIngestConfig) -> tuple[faiss.Index, str]:
+    """Build the configured index type over vectors (L2, like the flat index).
+
+    Returns the index and the type actually built: IVF types fall back to
+    flat when there are too few vectors to train their centroids/codebooks.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, dim = vectors.shape
+    index_type = _index_params(config)["type"]
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, config.hnsw_m)
+        index.hnsw.efConstruction = config.hnsw_ef_construction
+        index.add(vectors)
+        return index, "hnsw"
+
+    if index_type in ("ivf", "ivfpq"):
+        nlist = config.ivf_nlist or max(1, int(4 * n ** 0.5))
+        # k-means wants a few dozen points per centroid
+        nlist = max(1, min(nlist, n // 39))
+        min_points = 39 * nlist if index_type == "ivf" else max(39 * nlist, 2 ** config.pq_nbits)
+        if n < min_points:
+            logger.warning("%d vectors are too few to train %s; using a flat index", n, index_type)
+            index = faiss.IndexFlatL2(dim)
+            index.add(vectors)
+            return index, "flat"
+
+        quantizer = faiss.IndexFlatL2(dim)
+        if index_type == "ivf":
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+        else:
+            pq_m = max(m for m in range(1, min(config.pq_m, dim) + 1) if dim % m == 0)
+            if pq_m != config.pq_m:
+                logger.warning("pq_m=%d does not divide dimension %d; using %d", config.pq_m, dim, pq_m)
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, config.pq_nbits)
+        index.train(vectors)
+        index.add(vectors)
+        return index, index_type
+
+    index = faiss.IndexFlatL2(dim)
+    index.add(vectors)
+    return index, "flat"
+
+
+def _save_ann_index(vectorstore: FAISS, config: KBIngestConfig) -> dict:
+    """Derive the configured index from the flat one and save it; returns
+    the manifest entry describing what was built"""
+    params = _index_params(config)
+    ann_path = Path(config.vectorstore_dir) / ANN_INDEX_FILE
+    built = "flat"
+    if params["type"] != "flat":
+        vectors = vectorstore.index.reconstruct_n(0, vectorstore.index.ntotal)
+        index, built = create_faiss_index(vectors, config)
+        if built != "flat":
+            tmp = ann_path.with_suffix(".tmp")
+            faiss.write_index(index, str(tmp))
+            os.replace(tmp, ann_path)
+    if built == "flat" and ann_path.exists():
+        ann_path.unlink()
+    return {"params": params, "built": built, "ntotal": vectorstore.index.ntotal}
+
+
+def configure_search(index: faiss.Index, nprobe: int | None = None, ef_search: int | None = None) -> None:
+    """Apply query-time knobs: nprobe for IVF indexes, efSearch for HNSW"""
+    if nprobe:
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            ivf.nprobe = nprobe
+    if ef_search and hasattr(index, "hnsw"):
+        index.hnsw.efSearch = ef_search
+
+
+def build_bm25_from_docstore(vectorstore: FAISS) -> BM25Index:
+    """BM25 index over every chunk in a vectorstore's docstore"""
+    bm25 = BM25Index()
+    ids = list(vectorstore.index_to_docstore_id.values())
+    bm25.add(ids, (vectorstore.docstore.search(chunk_id).page_content for chunk_id in ids))
+    return bm25
+
+
+def load_bm25(vectorstore_dir: str, vectorstore: FAISS) -> BM25Index:
+    """Load the BM25 index saved at ingest, or build it from the docstore
+    for vectorstores ingested before it existed"""
+    bm25 = BM25Index.load(vectorstore_dir)
+    return bm25 if bm25 is not None else build_bm25_from_docstore(vectorstore)
+
 # Read Vector DB
-def load_vectorstore(vectorstore_dir: str, embeddings) -> FAISS:
+def load_vectorstore(
+    vectorstore_dir: str,
+    embeddings,
+    nprobe: int | None = None,
+    ef_search: int | None = None,
+    exact: bool = False,
+    mmap: bool = False,
+) -> FAISS:
+    """Load the vectorstore, searching the derived IVF/HNSW/IVF-PQ index when
+    ingest built one (unless exact=True) and the flat index otherwise.
+
+    With mmap=True the index is memory-mapped read-only and chunk text is
+    read from the SQLite docstore on lookup, so startup does not load the
+    KB into memory. Such a store cannot be modified; ingest uses mmap=False.
+    """
     path = Path(vectorstore_dir)
     if not path.exists():
         raise RuntimeError(
             "Vectorstore not found. Run ingest_kb.py to build it before starting the bot."
         )
-    return FAISS.load_local(
-        vectorstore_dir, embeddings, allow_dangerous_deserialization=True
-    )
\ No newline at end of file
+
+    if mmap and (path / DOCSTORE_FILE).exists():
+        docstore = SQLiteDocstore(path / DOCSTORE_FILE)
+        index_to_docstore_id = docstore.index_to_docstore_id()
+    else:
+        if mmap:
+            logger.warning("%s not found; re-run ingest to create it. Loading index.pkl", DOCSTORE_FILE)
+        with open(path / "index.pkl", "rb") as handle:
+            docstore, index_to_docstore_id = pickle.load(handle)
+
+    flags = _MMAP_FLAGS if mmap else 0
+    index = None
+    ann_path = path / ANN_INDEX_FILE
+    if not exact and ann_path.exists():
+        index = faiss.read_index(str(ann_path), flags)
+        if index.ntotal != len(index_to_docstore_id):
+            logger.warning("%s is out of date with the docstore; using the flat index", ann_path)
+            index = None
+    if index is None:
+        index = faiss.read_index(str(path / "index.faiss"), flags)
+    configure_search(index, nprobe, ef_search)
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+
+def check_mmap_consistency(vectorstore_dir: str, embeddings, samples: int = 20, k: int = 4) -> int:
+    """Search both loading paths with stored chunk vectors and count queries
+    whose result ids differ between mmap=True (SQLite docstore) and
+    mmap=False (index.pkl). No embedding calls are made."""
+    plain = load_vectorstore(vectorstore_dir, embeddings)
+    mapped = load_vectorstore(vectorstore_dir, embeddings, mmap=True)
+    flat = faiss.read_index(str(Path(vectorstore_dir) / "index.faiss"))
+    try:
+        mismatches = 0
+        step = max(1, flat.ntotal // samples)
+        for position in range(0, flat.ntotal, step)[:samples]:
+            vector = flat.reconstruct(position).tolist()
+            expected = [doc.id for doc in plain.similarity_search_by_vector(vector, k=k)]
+            found = [doc.id for doc in mapped.similarity_search_by_vector(vector, k=k)]
+            if found != expected or None in found:
+                mismatches += 1
+                logger.warning("mmap search returned %s, expected %s", found, expected)
+        return mismatches
+    finally:
+        if isinstance(mapped.docstore, SQLiteDocstore):
+            mapped.docstore.close()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import zlib
+
+from langchain_community.docstore.base import Docstore
+from langchain_core.documents import Document
+
+DOCSTORE_FILE = "docstore.sqlite"
+
+
+def write_docstore(path: str | Path, docstore, index_to_docstore_id: dict[int, str]) -> None:
+    """Export an in-memory docstore and the FAISS position -> id map to SQLite.
+
+    Written to a temporary file and renamed into place, so a bot that has
+    the previous file open keeps reading a consistent snapshot.
+    """
+    path = Path(path)
+    tmp = path.with_suffix(".tmp")
+    tmp.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript(
+            "CREATE TABLE chunks (id TEXT PRIMARY KEY, body BLOB NOT NULL) WITHOUT ROWID;"
+            "CREATE TABLE positions (position INTEGER PRIMARY KEY, id TEXT NOT NULL);"
+        )
+        conn.executemany(
+            "INSERT INTO positions (position, id) VALUES (?, ?)",
+            index_to_docstore_id.items(),
+        )
+        conn.executemany(
+            "INSERT INTO chunks (id, body) VALUES (?, ?)",
+            (
+                (chunk_id, _encode(docstore.search(chunk_id)))
+                for chunk_id in index_to_docstore_id.values()
+            ),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+
+
+def _encode(doc: Document) -> bytes:
+    return zlib.compress(
+        json.dumps({"text": doc.page_content, "metadata": doc.metadata}).encode("utf-8")
+    )
+
+
+def _decode(chunk_id: str, body: bytes) -> Document:
+    data = json.loads(zlib.decompress(body))
+    # FAISS only sets ids on documents returned by InMemoryDocstore, and the
+    # retriever keys everything on doc.id
+    return Document(id=chunk_id, page_content=data["text"], metadata=data["metadata"])
+
+
+class SQLiteDocstore(Docstore):
+    """Read-only docstore that fetches chunk text from disk on lookup.
+
+    Only the chunks a query actually returns are read and decoded, so the
+    bot no longer holds the whole KB text in memory.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._conn = sqlite3.connect(
+            f"file:{self.path}?mode=ro", uri=True, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+
+    def search(self, search: str) -> Document | str:
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM chunks WHERE id = ?", (search,)).fetchone()
+        if row is None:
+            return f"ID {search} not found."
+        return _decode(search, row[0])
+
+    def index_to_docstore_id(self) -> dict[int, str]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT position, id FROM positions"))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
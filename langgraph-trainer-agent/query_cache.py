@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import logging
+from pathlib import Path
+import re
+import threading
+import time
+from typing import Any, Callable, Hashable
+
+import numpy as np
+
+from kb_store import MANIFEST_FILE
+
+
+logger = logging.getLogger("trainer-retrieval")
+
+
+def normalise_question(question: str) -> str:
+    """Case, whitespace and trailing punctuation don't change the question"""
+    text = " ".join(question.lower().split())
+    return re.sub(r"[\s?!.]+$", "", text)
+
+
+class LRUTTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl_seconds"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class QueryCache:
+    """Caches question -> query embedding and (embedding, k) -> chunk ids.
+
+    Both caches are cleared when the vectorstore on disk changes, detected
+    from the mtimes of the FAISS index and the ingest manifest.
+    """
+
+    def __init__(
+        self,
+        vectorstore_dir: str,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600.0,
+        log_every: int = 50,
+    ) -> None:
+        self.vectorstore_dir = Path(vectorstore_dir)
+        self.embeddings = LRUTTLCache(max_entries, ttl_seconds)
+        self.results = LRUTTLCache(max_entries, ttl_seconds)
+        self.log_every = log_every
+        self.invalidations = 0
+        self._lookups = 0
+        self._lock = threading.Lock()
+        self._version = self._index_version()
+
+    def _index_version(self) -> tuple:
+        version = []
+        for name in ("index.faiss", MANIFEST_FILE):
+            try:
+                stat = (self.vectorstore_dir / name).stat()
+                version.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                version.append(None)
+        return tuple(version)
+
+    def check_version(self) -> None:
+        version = self._index_version()
+        with self._lock:
+            if version == self._version:
+                return
+            self._version = version
+            self.invalidations += 1
+        self.embeddings.clear()
+        self.results.clear()
+        logger.info("Vectorstore changed on disk; query caches cleared")
+
+    def embedding(self, question: str, compute: Callable[[str], list[float]]) -> list[float]:
+        key = normalise_question(question)
+        vector = self.embeddings.get(key)
+        if vector is None:
+            vector = compute(question)
+            self.embeddings.set(key, vector)
+        return vector
+
+    def chunk_ids(self, vector: list[float], k: int, compute: Callable[[], list[str]]) -> list[str]:
+        key = (hashlib.sha1(np.asarray(vector, dtype=np.float32).tobytes()).hexdigest(), k)
+        ids = self.results.get(key)
+        if ids is None:
+            ids = compute()
+            self.results.set(key, ids)
+        self._maybe_log()
+        return ids
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "embedding_hit_ratio": round(self.embeddings.hit_ratio, 3),
+            "embedding_entries": len(self.embeddings),
+            "result_hit_ratio": round(self.results.hit_ratio, 3),
+            "result_entries": len(self.results),
+            "invalidations": self.invalidations,
+        }
+
+    def _maybe_log(self) -> None:
+        with self._lock:
+            self._lookups += 1
+            due = self.log_every and self._lookups % self.log_every == 0
+        if due:
+            stats = self.stats()
+            logger.info(
+                "Query cache: embedding hit ratio %.0f%% (%d entries), "
+                "retrieval hit ratio %.0f%% (%d entries), %d invalidations",
+                stats["embedding_hit_ratio"] * 100,
+                stats["embedding_entries"],
+                stats["result_hit_ratio"] * 100,
+                stats["result_entries"],
+                stats["invalidations"],
+            )
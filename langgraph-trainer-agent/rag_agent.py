@@ -1,16 +1,24 @@
 from __future__ import annotations
 
 import json
+import logging
+import threading
+import time
 from typing import Literal, TypedDict
 
 from langchain_core.documents import Document
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langgraph.graph import END, StateGraph
+from langgraph.graph import END, START, StateGraph
 
 from config import Settings
-from kb_store import load_vectorstore
+from kb_store import load_bm25, load_vectorstore
+from query_cache import QueryCache
+from retrieval import HybridRetriever
+from topic_classifier import TopicClassifier, TopicGate
 
 
+logger = logging.getLogger("trainer-agent")
+
 AGENTIC_KEYWORDS = {
     "agentic",
     "agent",
@@ -55,6 +63,10 @@ class AgentState(TypedDict, total=False):
     topic: Literal["agentic_ai", "python", "other"]
     docs: list[Document]
     answer: str
+    classify_ms: float
+    retrieve_ms: float
+    # Speculative retrieval failure, handled by gate once classify decides
+    retrieve_error: Exception
 
 
 def _precheck(text: str) -> bool:
@@ -70,6 +82,53 @@ def _precheck(text: str) -> bool:
     return False
 
 
+class SpeculationStats:
+    """What running retrieval alongside the classifier gains and wastes.
+
+    For an allowed question the sequential graph would have taken
+    classify + retrieve; in parallel it takes the longer of the two, so the
+    shorter one is saved. For a question the classifier rejects, the whole
+    retrieval was wasted work (though not added latency).
+    """
+
+    def __init__(self, log_every: int = 50) -> None:
+        self.log_every = log_every
+        self.allowed = 0
+        self.rejected = 0
+        self.saved_ms = 0.0
+        self.wasted_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, allowed: bool, classify_ms: float, retrieve_ms: float) -> None:
+        with self._lock:
+            if allowed:
+                self.allowed += 1
+                self.saved_ms += min(classify_ms, retrieve_ms)
+            else:
+                self.rejected += 1
+                self.wasted_ms += retrieve_ms
+            due = self.log_every and (self.allowed + self.rejected) % self.log_every == 0
+        if due:
+            stats = self.stats()
+            logger.info(
+                "Speculative retrieval: %.0f ms saved per allowed question (%d), "
+                "%.0f ms of retrieval wasted per rejected question (%d)",
+                stats["saved_ms_per_allowed"],
+                stats["allowed"],
+                stats["wasted_ms_per_rejected"],
+                stats["rejected"],
+            )
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+                "saved_ms_per_allowed": self.saved_ms / self.allowed if self.allowed else 0.0,
+                "wasted_ms_per_rejected": self.wasted_ms / self.rejected if self.rejected else 0.0,
+            }
+
+
 def _safe_json_loads(text: str) -> dict:
     try:
         return json.loads(text)
@@ -77,12 +136,52 @@ def _safe_json_loads(text: str) -> dict:
         return {}
 
 
+def llm_classify(classifier_llm, question: str) -> tuple[bool, str]:
+    """The LLM topic gate: (allowed, topic)"""
+    messages = [
+        (
+            "system",
+            "You are a strict topic filter. Reply with JSON only: "
+            '{"allowed": true|false, "topic": "agentic_ai"|"python"|"other"}. '
+            "Allow only agentic AI and Python questions. If uncertain, set allowed false.",
+        ),
+        (
+            "human",
+            f"Message: {question}",
+        ),
+    ]
+    response = classifier_llm.invoke(messages)
+    data = _safe_json_loads(response.content.strip())
+    topic = data.get("topic", "other")
+    allowed = bool(data.get("allowed")) and topic in {"agentic_ai", "python"}
+    return allowed, topic
+
+
 def build_graph(settings: Settings):
     embeddings = OpenAIEmbeddings(
         api_key=settings.openai_api_key,
         model=settings.openai_embedding_model,
     )
-    vectorstore = load_vectorstore(settings.vectorstore_dir, embeddings)
+    vectorstore = load_vectorstore(
+        settings.vectorstore_dir,
+        embeddings,
+        nprobe=settings.faiss_nprobe,
+        ef_search=settings.faiss_ef_search,
+        mmap=settings.vectorstore_mmap,
+    )
+    retriever = HybridRetriever(
+        vectorstore,
+        load_bm25(settings.vectorstore_dir, vectorstore),
+        top_k=settings.top_k,
+        mode=settings.retrieval_mode,
+        rrf_k=settings.rrf_k,
+        fast_path_confidence=settings.bm25_fast_path_confidence,
+        query_cache=QueryCache(
+            settings.vectorstore_dir,
+            max_entries=settings.query_cache_size,
+            ttl_seconds=settings.query_cache_ttl_seconds,
+        ) if settings.query_cache_size > 0 else None,
+    )
 
     classifier_llm = ChatOpenAI(
         api_key=settings.openai_api_key,
@@ -95,33 +194,49 @@ def build_graph(settings: Settings):
         temperature=0.2,
     )
 
+    topic_gate = TopicGate(
+        TopicClassifier.load(settings.topic_classifier_path),
+        lambda question: llm_classify(classifier_llm, question),
+        allow_threshold=settings.classifier_allow_threshold,
+        reject_threshold=settings.classifier_reject_threshold,
+        log_path=settings.classifier_log_path or None,
+    )
+    speculation = SpeculationStats()
+
     def classify(state: AgentState) -> AgentState:
         question = state.get("question", "").strip()
         if not _precheck(question):
             return {"allowed": False, "topic": "other"}
-
-        messages = [
-            (
-                "system",
-                "You are a strict topic filter. Reply with JSON only: "
-                '{"allowed": true|false, "topic": "agentic_ai"|"python"|"other"}. '
-                "Allow only agentic AI and Python questions. If uncertain, set allowed false.",
-            ),
-            (
-                "human",
-                f"Message: {question}",
-            ),
-        ]
-        response = classifier_llm.invoke(messages)
-        data = _safe_json_loads(response.content.strip())
-        topic = data.get("topic", "other")
-        allowed = bool(data.get("allowed")) and topic in {"agentic_ai", "python"}
-        return {"allowed": allowed, "topic": topic}
+        start = time.perf_counter()
+        verdict = topic_gate.classify(question)
+        return {**verdict, "classify_ms": (time.perf_counter() - start) * 1000}
 
     def retrieve(state: AgentState) -> AgentState:
         question = state.get("question", "")
-        docs = vectorstore.similarity_search(question, k=settings.top_k)
-        return {"docs": docs}
+        if settings.speculative_retrieval and not _precheck(question.strip()):
+            # classify rejects these without asking the LLM
+            return {"docs": []}
+        start = time.perf_counter()
+        try:
+            docs = retriever.retrieve(question)
+        except Exception as exc:
+            if not settings.speculative_retrieval:
+                raise
+            # A rejected question never needed these docs, so the error
+            # only matters if classify allows it; gate decides
+            return {"docs": [], "retrieve_error": exc}
+        return {"docs": docs, "retrieve_ms": (time.perf_counter() - start) * 1000}
+
+    def gate(state: AgentState) -> AgentState:
+        if "classify_ms" in state and "retrieve_ms" in state:
+            speculation.record(bool(state.get("allowed")), state["classify_ms"], state["retrieve_ms"])
+        error = state.get("retrieve_error")
+        if error is None or not state.get("allowed"):
+            return {}
+        # Retry once now that the docs are known to be needed; a second
+        # failure propagates as it would without speculation
+        logger.warning("Speculative retrieval failed, retrying: %s", error)
+        return {"docs": retriever.retrieve(state.get("question", ""))}
 
     def answer(state: AgentState) -> AgentState:
         question = state.get("question", "")
@@ -155,16 +270,33 @@ def build_graph(settings: Settings):
     graph.add_node("classify", classify)
     graph.add_node("answer", answer)
 
-    graph.set_entry_point("classify")
+    if settings.speculative_retrieval:
+        # classify and retrieve run in parallel; gate waits for both and
+        # drops the retrieved docs if the question was rejected
+        graph.add_node("gate", gate)
+        graph.add_edge(START, "classify")
+        graph.add_edge(START, "retrieve")
+        graph.add_edge(["classify", "retrieve"], "gate")
+
+        def route(state: AgentState) -> str:
+            return "answer" if state.get("allowed") else "end"
+
+        graph.add_conditional_edges("gate", route, {"answer": "answer", "end": END})
+    else:
+        graph.set_entry_point("classify")
 
-    def route(state: AgentState) -> str:
-        return "retrieve" if state.get("allowed") else "end"
+        def route(state: AgentState) -> str:
+            return "retrieve" if state.get("allowed") else "end"
 
-    graph.add_conditional_edges("classify", route, {"retrieve": "retrieve", "end": END})
-    graph.add_edge("retrieve", "answer")
+        graph.add_conditional_edges("classify", route, {"retrieve": "retrieve", "end": END})
+        graph.add_edge("retrieve", "answer")
     graph.add_edge("answer", END)
 
-    return graph.compile()
+    compiled = graph.compile()
+    compiled.speculation = speculation
+    # Kept so a hot reload can release the old store's files
+    compiled.vectorstore = vectorstore
+    return compiled
 
 
 def answer_question(graph, question: str) -> str | None:
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import logging
+import threading
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from bm25_index import BM25Index
+from query_cache import QueryCache
+
+
+logger = logging.getLogger("trainer-retrieval")
+
+RETRIEVAL_MODES = ("hybrid", "vector", "bm25")
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[str]:
+    """Fuse ranked id lists: each id scores sum(1 / (k + rank)) over the lists"""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking, start=1):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda chunk_id: scores[chunk_id], reverse=True)
+
+
+class HybridRetriever:
+    """BM25 + vector retrieval fused by reciprocal rank.
+
+    Exact identifiers and error strings ("KeyError", "asyncio.gather") are
+    found by BM25 even when the embedding misses them. When the BM25 match
+    is confident enough on its own, its hits are returned directly and the
+    query embedding call is skipped.
+    """
+
+    def __init__(
+        self,
+        vectorstore: FAISS,
+        bm25: BM25Index,
+        top_k: int,
+        mode: str = "hybrid",
+        rrf_k: int = 60,
+        fast_path_confidence: float = 0.75,
+        candidates: int | None = None,
+        query_cache: QueryCache | None = None,
+    ) -> None:
+        if mode not in RETRIEVAL_MODES:
+            raise RuntimeError(f"RETRIEVAL_MODE must be one of {', '.join(RETRIEVAL_MODES)}")
+        self.vectorstore = vectorstore
+        self.bm25 = bm25
+        self.top_k = top_k
+        self.mode = mode
+        self.rrf_k = rrf_k
+        self.fast_path_confidence = fast_path_confidence
+        self.candidates = candidates or max(3 * top_k, 10)
+        self.query_cache = query_cache
+        self._lock = threading.Lock()
+        self.counts = {"bm25_fast_path": 0, "hybrid": 0, "vector": 0, "bm25": 0}
+
+    def _count(self, path: str) -> None:
+        with self._lock:
+            self.counts[path] += 1
+
+    def _documents(self, ids: list[str]) -> list[Document]:
+        docs = []
+        for chunk_id in ids:
+            doc = self.vectorstore.docstore.search(chunk_id)
+            if isinstance(doc, Document):
+                doc.id = chunk_id
+                docs.append(doc)
+        return docs
+
+    def _vector_ids(self, question: str, k: int) -> list[str]:
+        if self.query_cache is None:
+            return [doc.id for doc in self.vectorstore.similarity_search(question, k=k)]
+
+        embed_query = self.vectorstore.embeddings.embed_query
+        vector = self.query_cache.embedding(question, embed_query)
+        return self.query_cache.chunk_ids(
+            vector,
+            k,
+            lambda: [doc.id for doc in self.vectorstore.similarity_search_by_vector(vector, k=k)],
+        )
+
+    def retrieve(self, question: str) -> list[Document]:
+        if self.query_cache is not None:
+            self.query_cache.check_version()
+
+        if self.mode == "vector":
+            self._count("vector")
+            return self._documents(self._vector_ids(question, self.top_k))
+
+        lexical = self.bm25.search(question, self.candidates)
+        if self.mode == "bm25":
+            self._count("bm25")
+            return self._documents([chunk_id for chunk_id, _ in lexical[:self.top_k]])
+
+        confidence = self.bm25.confidence(question, lexical)
+        if confidence >= self.fast_path_confidence:
+            self._count("bm25_fast_path")
+            logger.debug("BM25 fast path (confidence %.2f)", confidence)
+            return self._documents([chunk_id for chunk_id, _ in lexical[:self.top_k]])
+
+        self._count("hybrid")
+        fused = reciprocal_rank_fusion(
+            [[chunk_id for chunk_id, _ in lexical], self._vector_ids(question, self.candidates)],
+            k=self.rrf_k,
+        )
+        return self._documents(fused[:self.top_k])
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
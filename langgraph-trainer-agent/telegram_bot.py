@@ -5,9 +5,11 @@ import logging
 
 from dotenv import load_dotenv
 from telegram import Update
-from telegram.ext import ApplicationBuilder, ContextTypes, MessageHandler, filters
+from telegram.ext import Application, ApplicationBuilder, ContextTypes, MessageHandler, filters
 
+from chat_queue import ChatWorkerPool
 from config import load_settings
+from hot_reload import VectorstoreWatcher
 from rag_agent import answer_question, build_graph
 
 
@@ -26,10 +28,7 @@ def _is_group_chat(update: Update) -> bool:
 
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-
-
-    print(update.effective_chat.id, update.message)
-
+    logger.debug("Chat %s: %s", update.effective_chat.id, update.message)
 
     # if update.message is None or update.message.from_user is None:
     #     return
@@ -50,14 +49,49 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     if not text.strip():
         return
 
-    graph = context.bot_data["graph"]
-    answer = await asyncio.to_thread(answer_question, graph, text)
-    if not answer:
+    message = update.message
+
+    async def respond(answer: str | None) -> None:
+        if not answer:
+            return
+        logger.debug("Chat %s: replying %r", message.chat_id, answer)
+        await message.reply_text(answer)
+
+    context.bot_data["chat_pool"].submit(update.effective_chat.id, text, respond)
+
+
+async def _post_init(application: Application) -> None:
+    settings = application.bot_data["settings"]
+    bot_data = application.bot_data
+    pool = ChatWorkerPool(
+        # The graph is looked up per message so hot reloads take effect
+        lambda text: answer_question(bot_data["graph"], text),
+        workers=settings.chat_workers,
+        chat_queue_size=settings.chat_queue_size,
+        max_pending=settings.chat_max_pending,
+        max_wait_seconds=settings.chat_max_wait_seconds,
+    )
+    pool.start()
+    bot_data["chat_pool"] = pool
+
+    if settings.vectorstore_reload_seconds <= 0:
         return
-    
-    print(answer)
+    watcher = VectorstoreWatcher(
+        settings,
+        application.bot_data,
+        build_graph,
+        interval=settings.vectorstore_reload_seconds,
+    )
+    application.bot_data["watcher_task"] = asyncio.create_task(watcher.run())
+
 
-    await update.message.reply_text(answer)
+async def _post_shutdown(application: Application) -> None:
+    task = application.bot_data.pop("watcher_task", None)
+    if task is not None:
+        task.cancel()
+    pool = application.bot_data.pop("chat_pool", None)
+    if pool is not None:
+        await pool.stop()
 
 
 def main() -> None:
@@ -68,6 +102,8 @@ def main() -> None:
     application = (
         ApplicationBuilder()
         .token(settings.telegram_bot_token)
+        .post_init(_post_init)
+        .post_shutdown(_post_shutdown)
         .build()
     )
 
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+from pathlib import Path
+import threading
+from typing import Callable, Iterable
+
+import numpy as np
+
+from bm25_index import tokenize
+
+
+logger = logging.getLogger("trainer-agent")
+
+TOPICS = ("agentic_ai", "python", "other")
+ALLOWED_TOPICS = frozenset({"agentic_ai", "python"})
+
+
+def features(text: str) -> list[str]:
+    """Unigrams and bigrams of BM25 tokens plus a few shape flags"""
+    tokens = tokenize(text)
+    feats = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if "```" in text:
+        feats.append("<code>")
+    if "?" in text:
+        feats.append("<question>")
+    if "Traceback" in text or "Error:" in text:
+        feats.append("<traceback>")
+    return feats
+
+
+def label_of(row: dict) -> str:
+    """Training label of a labelled-log row: its topic when allowed, else other"""
+    topic = row.get("topic", "other")
+    if row.get("allowed", topic in ALLOWED_TOPICS) and topic in ALLOWED_TOPICS:
+        return topic
+    return "other"
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class TopicClassifier:
+    """Multinomial logistic regression over sparse text features.
+
+    Probabilities are calibrated with a temperature fitted on held-out
+    labelled messages, so p_allowed can be compared against fixed
+    thresholds to decide when the LLM gate is still needed.
+    """
+
+    def __init__(
+        self,
+        vocab: dict[str, int],
+        weights: np.ndarray,
+        bias: np.ndarray,
+        temperature: float = 1.0,
+    ) -> None:
+        self.vocab = vocab
+        self.weights = weights
+        self.bias = bias
+        self.temperature = temperature
+
+    def _rows(self, texts: Iterable[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """CSR-style feature indices with 1/sqrt(n) values per row"""
+        indices: list[int] = []
+        indptr = [0]
+        for text in texts:
+            ids = sorted({self.vocab[f] for f in features(text) if f in self.vocab})
+            indices.extend(ids)
+            indptr.append(len(indices))
+        indptr_arr = np.asarray(indptr, dtype=np.int64)
+        counts = np.diff(indptr_arr)
+        values = np.repeat(1.0 / np.sqrt(np.maximum(counts, 1)), counts).astype(np.float32)
+        return np.asarray(indices, dtype=np.int64), indptr_arr, values
+
+    def _logits(self, rows: tuple[np.ndarray, np.ndarray, np.ndarray]) -> np.ndarray:
+        indices, indptr, values = rows
+        n = len(indptr) - 1
+        logits = np.tile(self.bias, (n, 1))
+        row_of = np.repeat(np.arange(n), np.diff(indptr))
+        np.add.at(logits, row_of, self.weights[indices] * values[:, None])
+        return logits
+
+    def predict_proba(self, texts: list[str]) -> np.ndarray:
+        """Calibrated class probabilities, columns in TOPICS order"""
+        return _softmax(self._logits(self._rows(texts)) / self.temperature)
+
+    def known_features(self, text: str) -> int:
+        return sum(1 for feat in set(features(text)) if feat in self.vocab)
+
+    def predict(self, text: str) -> tuple[float, str]:
+        """(probability the message is on-topic, most likely allowed topic)"""
+        probs = self.predict_proba([text])[0]
+        p_allowed = float(probs[0] + probs[1])
+        return p_allowed, TOPICS[int(np.argmax(probs[:2]))]
+
+    @classmethod
+    def train(
+        cls,
+        texts: list[str],
+        labels: list[str],
+        min_count: int = 2,
+        l2: float = 1e-4,
+        epochs: int = 300,
+        learning_rate: float = 2.0,
+    ) -> "TopicClassifier":
+        counts: dict[str, int] = {}
+        for text in texts:
+            for feat in set(features(text)):
+                counts[feat] = counts.get(feat, 0) + 1
+        vocab = {feat: i for i, feat in enumerate(sorted(f for f, c in counts.items() if c >= min_count))}
+
+        model = cls(vocab, np.zeros((len(vocab), len(TOPICS)), dtype=np.float32), np.zeros(len(TOPICS), dtype=np.float32))
+        rows = model._rows(texts)
+        indices, indptr, values = rows
+        row_of = np.repeat(np.arange(len(texts)), np.diff(indptr))
+        target = np.zeros((len(texts), len(TOPICS)), dtype=np.float32)
+        target[np.arange(len(texts)), [TOPICS.index(label) for label in labels]] = 1.0
+
+        # Full-batch gradient descent; the loss is convex and the data small
+        for _ in range(epochs):
+            error = (_softmax(model._logits(rows)) - target) / len(texts)
+            grad = np.zeros_like(model.weights)
+            np.add.at(grad, indices, error[row_of] * values[:, None])
+            model.weights -= learning_rate * (grad + l2 * model.weights)
+            model.bias -= learning_rate * error.sum(axis=0)
+        return model
+
+    def calibrate(self, texts: list[str], labels: list[str]) -> float:
+        """Fit the softmax temperature that minimises log loss on held-out data"""
+        logits = self._logits(self._rows(texts))
+        target = np.asarray([TOPICS.index(label) for label in labels])
+
+        def nll(temperature: float) -> float:
+            probs = _softmax(logits / temperature)
+            return float(-np.log(probs[np.arange(len(target)), target] + 1e-12).mean())
+
+        self.temperature = min(np.exp(np.linspace(math.log(0.05), math.log(20), 200)), key=nll)
+        return self.temperature
+
+    def save(self, path: str) -> None:
+        tmp = Path(path).with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({
+                "topics": TOPICS,
+                "vocab": self.vocab,
+                "weights": self.weights.round(5).tolist(),
+                "bias": self.bias.tolist(),
+                "temperature": self.temperature,
+            }),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TopicClassifier | None":
+        if not path or not Path(path).exists():
+            return None
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(
+            data["vocab"],
+            np.asarray(data["weights"], dtype=np.float32).reshape(-1, len(TOPICS)),
+            np.asarray(data["bias"], dtype=np.float32),
+            data["temperature"],
+        )
+
+
+class TopicGate:
+    """Decides allowed/topic locally and asks the LLM only when unsure.
+
+    Messages with p_allowed >= allow_threshold are allowed and those with
+    p_allowed <= reject_threshold rejected without an LLM call; the band in
+    between, and messages sharing no features with the training data, go to
+    llm_classify. LLM verdicts are appended to log_path (if set) as
+    labelled rows for the next train_classifier.py run.
+    """
+
+    def __init__(
+        self,
+        classifier: TopicClassifier | None,
+        llm_classify: Callable[[str], tuple[bool, str]],
+        allow_threshold: float = 0.9,
+        reject_threshold: float = 0.1,
+        log_path: str | None = None,
+        log_every: int = 100,
+    ) -> None:
+        self.classifier = classifier
+        self.llm_classify = llm_classify
+        self.allow_threshold = allow_threshold
+        self.reject_threshold = reject_threshold
+        self.log_path = log_path
+        self.log_every = log_every
+        self.counts = {"local_allowed": 0, "local_rejected": 0, "llm": 0}
+        self._lock = threading.Lock()
+
+    def classify(self, question: str) -> dict:
+        p_allowed = None
+        # Messages with no words the model has seen are left to the LLM
+        if self.classifier is not None and self.classifier.known_features(question):
+            p_allowed, topic = self.classifier.predict(question)
+            if p_allowed >= self.allow_threshold:
+                self._count("local_allowed")
+                return {"allowed": True, "topic": topic}
+            if p_allowed <= self.reject_threshold:
+                self._count("local_rejected")
+                return {"allowed": False, "topic": "other"}
+
+        allowed, topic = self.llm_classify(question)
+        self._count("llm")
+        if self.log_path:
+            self._log_label(question, allowed, topic, p_allowed)
+        return {"allowed": allowed, "topic": topic}
+
+    def _log_label(self, question: str, allowed: bool, topic: str, p_allowed: float | None) -> None:
+        row = {"question": question, "allowed": allowed, "topic": topic, "p_allowed": p_allowed}
+        with self._lock, open(self.log_path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(row) + "\n")
+
+    def _count(self, path: str) -> None:
+        with self._lock:
+            self.counts[path] += 1
+            total = sum(self.counts.values())
+            due = self.log_every and total % self.log_every == 0
+            counts = dict(self.counts)
+        if due:
+            logger.info(
+                "Topic gate: %d allowed and %d rejected locally, %d sent to the LLM (%.0f%% of %d)",
+                counts["local_allowed"],
+                counts["local_rejected"],
+                counts["llm"],
+                100 * counts["llm"] / total,
+                total,
+            )
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+
+def read_labelled(paths: Iterable[str]) -> tuple[list[str], list[str]]:
+    """Questions and labels from JSONL files of {"question", "topic", "allowed"?} rows"""
+    texts: list[str] = []
+    labels: list[str] = []
+    for path in paths:
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                texts.append(row["question"])
+                labels.append(label_of(row))
+    return texts, labels
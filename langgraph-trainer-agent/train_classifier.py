@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+import random
+
+import numpy as np
+
+from topic_classifier import TOPICS, TopicClassifier, read_labelled
+
+# Train the local topic classifier from labelled JSONL rows, e.g. the LLM
+# gate verdicts written to CLASSIFIER_LOG_PATH plus any hand-labelled set:
+#
+#   python train_classifier.py --data classifier_log.jsonl labelled.jsonl
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the local topic classifier")
+    parser.add_argument("--data", nargs="+", required=True, help="labelled JSONL files")
+    parser.add_argument("--out", default="topic_classifier.json")
+    parser.add_argument("--holdout", type=float, default=0.2, help="share used to calibrate")
+    parser.add_argument("--min-count", type=int, default=2, help="drop rarer features")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    texts, labels = read_labelled(args.data)
+    rows = list(zip(texts, labels))
+    random.Random(args.seed).shuffle(rows)
+    cut = int(len(rows) * (1 - args.holdout))
+    train, held_out = rows[:cut], rows[cut:]
+    if not train or not held_out:
+        raise SystemExit("Need enough labelled rows for both training and calibration")
+
+    print(f"{len(rows)} labelled messages: {dict(Counter(labels))}")
+    model = TopicClassifier.train(
+        [text for text, _ in train],
+        [label for _, label in train],
+        min_count=args.min_count,
+    )
+    held_texts = [text for text, _ in held_out]
+    held_labels = [label for _, label in held_out]
+    temperature = model.calibrate(held_texts, held_labels)
+
+    probs = model.predict_proba(held_texts)
+    predicted = [TOPICS[i] for i in np.argmax(probs, axis=1)]
+    accuracy = np.mean([p == label for p, label in zip(predicted, held_labels)])
+    print(
+        f"{len(model.vocab)} features, temperature {temperature:.2f}, "
+        f"held-out accuracy {accuracy:.3f} on {len(held_out)} messages"
+    )
+    model.save(args.out)
+    print(f"Saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()